@@ -1,38 +1,28 @@
 import sys
-import unittest
 import os
+import time
+from datetime import datetime, timedelta
 
-# Attempt to import necessary project modules.
-# These modules are essential for the application's core functionality.
-try:
-    from app.models.customer import Customer
-    from app.models.equipment import Equipment
-    from app.models.job import Job
-    from app.models.administrator import Administrator
-    from app.models.technician import Technician
-    from app.db.db import DB
-    from app.models.supplier import Supplier
-except ImportError as e:
-    # If critical modules are missing, the application cannot proceed.
-    # Log this critical error and exit.
-    print(f"[CRITICAL ERROR] Essential application modules failed to import: {e}")
-    print("Please ensure all 'app.models' and 'app.db' modules are correctly installed and accessible.")
-    print("The application will now terminate.")
-    sys.exit(1) # Exit with an error code
+# Models and services are imported where they are first used, so the menu comes up
+# without loading the database layer, and a broken optional feature only fails its own
+# menu entry instead of stopping the application.
 
 
 class AppAction:
     def __init__(self):
         self.active_user = None
-        try:
-            # Initialize the database connection.
-            self.data_store = DB()
-        except Exception as e:
-            print(f"[CRITICAL ERROR] Failed to initialize database connection: {e}")
-            sys.exit("Application cannot start without a database connection.")
+
+    @property
+    def data_store(self):
+        """The database, connected (and migrated if its schema is behind) on first use."""
+        from app.db.db import DB
+        return DB()
 
     def start(self):
         """Main application loop to present user options and handle selections."""
+        from app.models.customer import Customer
+        from app.models.administrator import Administrator
+        from app.models.technician import Technician
         while True:
             try:
                 print("\n--- Tech Solutions Portal ---")
@@ -107,6 +97,7 @@ class AppAction:
 
     def _admin_operations(self):
         """Handles operations available to an administrator."""
+        from app.models.administrator import Administrator
         if not isinstance(self.active_user, Administrator):
             print("[ERROR] No administrator logged in or invalid session. Returning to main menu.")
             return
@@ -121,7 +112,13 @@ class AppAction:
                     "4": "Add New Technician Account",
                     "5": "Review Completed Requests & Finalize Cost",
                     "6": "Manage Parts Suppliers",
-                    "7": "Logout from Admin Console"
+                    "7": "Search Records",
+                    "8": "Performance Diagnostics",
+                    "9": "Export Reports",
+                    "10": "Dashboard Metrics",
+                    "11": "Auto-Assign Unassigned Requests",
+                    "12": "Walk-in Intake (Queued for Peak Hours)",
+                    "13": "Logout from Admin Console"
                 }
                 for key, value in actions.items():
                     print(f"{key}. {value}")
@@ -137,7 +134,13 @@ class AppAction:
                 elif task == '4': self._create_technician_account()
                 elif task == '5': self._review_completed_requests_add_cost()
                 elif task == '6': self._manage_parts_suppliers()
-                elif task == '7':
+                elif task == '7': self._search_records()
+                elif task == '8': self._performance_diagnostics()
+                elif task == '9': self._export_reports()
+                elif task == '10': self._view_dashboard_metrics()
+                elif task == '11': self._assign_request_backlog()
+                elif task == '12': self._queue_walk_in_intake()
+                elif task == '13':
                     print("Logging out from Admin Console.")
                     self.active_user = None # Clear active user session on logout.
                     break
@@ -152,8 +155,83 @@ class AppAction:
             except Exception as e:
                 print(f"[ERROR] An unexpected error occurred in administrator operations: {e}")
 
+    def _performance_diagnostics(self):
+        """Query profiler controls plus connection pool and cache statistics."""
+        from app.db.instrumentation import profiler
+        from app.services.intake_queue import intake_queue
+        from app.utils.cache import cache_stats
+        while True:
+            try:
+                state = "ON" if profiler.enabled else "OFF"
+                print(f"\n--- Performance Diagnostics (query profiling: {state}) ---")
+                diagnostic_options = {
+                    "1": "Turn Query Profiling On/Off",
+                    "2": "Show Heaviest Queries",
+                    "3": "Show Slow Query Log",
+                    "4": "Show Connection Pool, Cache & Intake Queue Statistics",
+                    "5": "Write Profile to File (once or on a timer)",
+                    "6": "Reset Profile Statistics",
+                    "7": "Back to Admin Menu"
+                }
+                for key, value in diagnostic_options.items():
+                    print(f"{key}. {value}")
+                diagnostic_choice = input("Select diagnostic action: ").strip()
+
+                if diagnostic_choice == '1':
+                    if profiler.enabled:
+                        profiler.disable()
+                        print("Query profiling disabled.")
+                    else:
+                        threshold_str = input(f"Slow query threshold in ms [{profiler.slow_threshold_ms}]: ").strip()
+                        profiler.enable(float(threshold_str) if threshold_str else None)
+                        print("Query profiling enabled.")
+                elif diagnostic_choice == '2':
+                    print(profiler.report())
+                elif diagnostic_choice == '3':
+                    if not profiler.slow_queries:
+                        print("No slow queries recorded.")
+                    for entry in profiler.slow_queries:
+                        print(f"{entry['elapsed_ms']:.2f} ms, {entry['rows']} rows, {entry['call_site']}: {entry['sql'][:120]}")
+                elif diagnostic_choice == '4':
+                    print("Connection pool:")
+                    for key, value in self.data_store.pool_stats().items():
+                        print(f"  {key}: {value}")
+                    print("Read-only pool" + (f" (snapshot {self.data_store.snapshot_path})"
+                                              if self.data_store.snapshot_path else "") + ":")
+                    for key, value in self.data_store.read_pool_stats().items():
+                        print(f"  {key}: {value}")
+                    for name, stats in cache_stats().items():
+                        print(f"Cache {name}: " + ", ".join(f"{key}={value}" for key, value in stats.items()))
+                    print("Intake queue: " + ", ".join(f"{key}={value}" for key, value in intake_queue.stats().items()))
+                elif diagnostic_choice == '5':
+                    dump_path = input("File to write [query_profile.json]: ").strip() or "query_profile.json"
+                    interval_str = input("Repeat every N seconds (Enter for once): ").strip()
+                    if interval_str:
+                        profiler.start_periodic_dump(dump_path, float(interval_str))
+                        print(f"Writing profile to {dump_path} every {interval_str} seconds.")
+                    else:
+                        profiler.dump(dump_path)
+                        print(f"Profile written to {dump_path}.")
+                elif diagnostic_choice == '6':
+                    profiler.reset()
+                    print("Profile statistics cleared.")
+                elif diagnostic_choice == '7':
+                    break
+                else:
+                    print("Invalid diagnostic option. Please select a number from the menu.")
+            except ValueError:
+                print("[ERROR] Please enter a numeric value.")
+            except KeyboardInterrupt:
+                print("\nAction interrupted. Returning to diagnostics menu.")
+            except EOFError:
+                print("\nEOF signal received. Returning to admin menu.")
+                break
+            except Exception as e:
+                print(f"[ERROR] An unexpected error occurred in performance diagnostics: {e}")
+
     def _remove_parts_suppliers(self):
         """Handles removal of parts suppliers by their IDs."""
+        from app.models.supplier import Supplier
         supplier_ids_input = input("Enter IDs of suppliers to remove (comma-separated, e.g., 1,2,3): ").strip()
         if not supplier_ids_input:
             print("No supplier IDs provided for removal.")
@@ -172,23 +250,32 @@ class AppAction:
                 return
 
             # Delegate removal to the Supplier model.
-            Supplier.remove_suppliers_by_ids(supplier_ids_to_remove)
-            print(f"Attempted to remove suppliers with IDs: {supplier_ids_to_remove}. Check system logs for details.")
+            removed, missing, in_use = Supplier.remove_suppliers_by_ids(supplier_ids_to_remove)
+            if removed:
+                print(f"Removed suppliers with IDs: {removed}.")
+            if missing:
+                print(f"No supplier found for IDs: {missing}.")
+            if in_use:
+                print(f"Kept suppliers {in_use}: they still hold stock or reserved parts.")
         except ValueError:
             print("[ERROR] Invalid input format for supplier IDs. Please use comma-separated numbers.")
         except Exception as e:
             print(f"[ERROR] Encountered an issue while removing suppliers: {e}")
 
     def _manage_parts_suppliers(self):
-        """Provides interface for managing parts suppliers (add, list, remove)."""
+        """Provides interface for managing parts suppliers, the parts catalog and stock."""
+        from app.models.supplier import Supplier
         while True:
             try:
-                print("\n--- Parts Supplier Management ---")
+                print("\n--- Parts Supplier & Stock Management ---")
                 supplier_options = {
                     "1": "Add New Supplier",
                     "2": "List All Suppliers",
                     "3": "Remove Suppliers",
-                    "4": "Back to Admin Menu"
+                    "4": "Add Part to Catalog",
+                    "5": "Record Stock Movements",
+                    "6": "List Parts Below Reorder Level",
+                    "7": "Back to Admin Menu"
                 }
                 for key, value in supplier_options.items():
                     print(f"{key}. {value}")
@@ -211,14 +298,20 @@ class AppAction:
                     suppliers_list = Supplier.get_all()
                     if suppliers_list:
                         print("\n--- Current Suppliers ---")
-                        for supplier_data in suppliers_list: # Iterates over supplier data tuples/objects.
-                            print(f"ID: {supplier_data[0]}, Name: {supplier_data[1]}, Parts: {supplier_data[2]}, Location: {supplier_data[3]}")
+                        for supplier in suppliers_list:
+                            print(f"ID: {supplier.id}, Name: {supplier.name}, Parts: {supplier.part_type}, Location: {supplier.location}")
                         print("--- End of List ---")
                     else:
                         print("No suppliers are currently listed in the system.")
                 elif supplier_choice == '3':
                     self._remove_parts_suppliers()
                 elif supplier_choice == '4':
+                    self._add_catalog_part()
+                elif supplier_choice == '5':
+                    self._record_stock_movements()
+                elif supplier_choice == '6':
+                    self._list_parts_below_reorder()
+                elif supplier_choice == '7':
                     break # Exit supplier management and return to admin menu.
                 else:
                     print("Invalid supplier option. Please select a number from the menu.")
@@ -231,8 +324,68 @@ class AppAction:
                 print(f"[ERROR] An unexpected error occurred in supplier management: {e}")
 
 
+    def _add_catalog_part(self):
+        """Adds a part to the catalog; stock is recorded per supplier afterwards."""
+        from app.models.part import Part
+        sku = input("Enter part SKU: ").strip()
+        name = input("Enter part name: ").strip()
+        part_type = input("Enter part type: ").strip()
+        threshold_input = input("Enter reorder threshold (default 0, no reordering): ").strip() or "0"
+        if not all([sku, name, part_type]):
+            print("[ERROR] SKU, name and part type are mandatory.")
+            return
+        if not threshold_input.isdigit():
+            print("[ERROR] The reorder threshold must be a whole number.")
+            return
+        if Part.find_by_sku(sku):
+            print(f"[ERROR] A part with SKU '{sku}' already exists.")
+            return
+        part_id = Part(sku, name, part_type, int(threshold_input)).save()
+        print(f"Part '{name}' added to the catalog (Part ID: {part_id}).")
+
+    def _record_stock_movements(self):
+        """Applies stock deliveries and write-offs, one 'part_id,supplier_id,quantity' per line."""
+        from app.services.supplier_manager import SupplierManager
+        from app.utils.exceptions import InsufficientStockException
+        print("Enter movements as 'part_id,supplier_id,quantity' (negative to remove stock); blank line to finish.")
+        movements = []
+        while True:
+            line = input("> ").strip()
+            if not line:
+                break
+            fields = [field.strip() for field in line.split(",")]
+            try:
+                part_id, supplier_id, quantity = (int(field) for field in fields)
+            except ValueError:
+                print(f"Warning: '{line}' is not in 'part_id,supplier_id,quantity' form and will be ignored.")
+                continue
+            movements.append((part_id, supplier_id, quantity))
+        if not movements:
+            print("No stock movements entered.")
+            return
+        try:
+            changed = SupplierManager.adjust_stock(movements)
+            print(f"Applied {len(movements)} movements to {changed} stock records.")
+        except InsufficientStockException as e:
+            print(f"No movements were applied. {e}")
+        except ValueError as e:
+            print(f"[ERROR] No movements were applied. {e}")
+
+    def _list_parts_below_reorder(self):
+        from app.services.supplier_manager import SupplierManager
+        parts = SupplierManager.below_reorder()
+        if not parts:
+            print("All parts are above their reorder level.")
+            return
+        print("\n--- Parts to Reorder ---")
+        for part in parts:
+            print(f"Part ID: {part.part_id}, SKU: {part.sku}, Name: {part.name}, Type: {part.part_type}, "
+                  f"Available: {part.available}, Reorder Level: {part.reorder_threshold}")
+        print("--- End of List ---")
+
     def _create_technician_account(self):
         """Handles the creation of a new technician account."""
+        from app.models.technician import Technician
         try:
             tech_name = input("Enter technician's full name: ").strip()
             tech_email = input("Enter technician's email address: ").strip()
@@ -256,6 +409,8 @@ class AppAction:
 
     def _register_new_customer(self):
         """Handles the registration of a new customer and their equipment."""
+        from app.models.customer import Customer
+        from app.services.serial_registry import serial_registry
         try:
             customer_name = input("Enter customer's name: ").strip()
             customer_email = input("Enter customer's email: ").strip()
@@ -272,68 +427,252 @@ class AppAction:
 
             # It is good practice to check if a customer with this email already exists.
             # This logic would typically be in the Customer model or a service layer.
-            new_customer = Customer(customer_name, customer_email)
-            customer_id = new_customer.save() # Customer model's save method, returns ID.
-            
-            if customer_id: # Confirms customer was saved.
-                new_equipment = Equipment(customer_id, equipment_type, serial_number)
-                new_equipment.save() # Equipment model's save method.
-                print(f"Customer '{customer_name}' and their equipment '{equipment_type}' registered successfully.")
-            else:
-                print("[ERROR] Failed to save new customer profile. Equipment registration aborted.")
+            # Customer and equipment share one transaction so a failure leaves neither behind.
+            with self.data_store.transaction():
+                new_customer = Customer(customer_name, customer_email)
+                customer_id = new_customer.save() # Customer model's save method, returns ID.
+                # Rejects a serial number already registered to another customer.
+                serial_registry.register(customer_id, equipment_type, serial_number)
+            print(f"Customer '{customer_name}' and their equipment '{equipment_type}' registered successfully.")
 
         except Exception as e:
             print(f"[ERROR] An error occurred during customer registration: {e}")
 
-    def _view_all_service_requests(self):
-        """Displays all service requests currently in the system."""
-        try:
-            all_jobs = Job.get_all()
-            if all_jobs:
-                print("\n--- All Service Requests ---")
-                for job_details in all_jobs: # Iterates over job data.
-                    # Defensive access to tuple/list elements.
-                    job_id = job_details[0] if len(job_details) > 0 else "N/A"
-                    customer_name = job_details[6] if len(job_details) > 6 else "N/A" # Example index
-                    issue = job_details[3] if len(job_details) > 3 else "N/A" # Example index
-                    status = job_details[4] if len(job_details) > 4 else "N/A" # Example index
-                    cost = job_details[5] if len(job_details) > 5 else "Not set" # Example index
-                    print(f"Request ID: {job_id}, Customer: {customer_name}, Issue: {issue}, Status: {status}, Estimated Cost: {cost}")
-                print("--- End of List ---")
+    def _queue_walk_in_intake(self):
+        """Takes walk-ins one after another without waiting for the database.
+
+        Each walk-in gets a ticket at once; the records are committed in the background
+        and the outcome of every ticket is shown when the desk is done.
+        """
+        from app.services.intake_queue import intake_queue
+        from app.utils.exceptions import IntakeQueueFullException
+        tickets = []
+        print("Enter each walk-in; leave the name blank to finish.")
+        while True:
+            customer_name = input("Customer name: ").strip()
+            if not customer_name:
+                break
+            record = {
+                "name": customer_name,
+                "email": input("Customer email: ").strip(),
+                "equipment_type": input("Equipment type: ").strip(),
+                "serial_number": input("Serial number: ").strip(),
+                "description": input("Issue (leave blank to open no request yet): ").strip(),
+            }
+            try:
+                ticket = intake_queue.enqueue(record, timeout=5.0)
+                tickets.append(ticket)
+                print(f"Ticket {ticket} issued for {customer_name}.")
+            except ValueError as e:
+                print(f"[ERROR] {e}")
+            except IntakeQueueFullException as e:
+                print(f"[ERROR] {e}")
+            except RuntimeError as e:
+                print(f"[ERROR] {e}")
+                break
+        if not tickets:
+            return
+        if not intake_queue.flush(timeout=30):
+            if intake_queue.error is not None:
+                print(f"[ERROR] The intake writer stopped ({intake_queue.error}); queued records are kept for the next start.")
             else:
-                print("No service requests are currently in the system.")
+                print("Some records are still being saved; they stay queued and will be committed shortly.")
+        print("\n--- Intake Results ---")
+        for ticket in tickets:
+            row = intake_queue.resolve(ticket)
+            if row is None:
+                print(f"Ticket {ticket}: still queued.")
+            elif row.error:
+                print(f"Ticket {ticket}: rejected: {row.error}")
+            else:
+                request = f", Request ID: {row.job_id}" if row.job_id else ""
+                print(f"Ticket {ticket}: Customer ID: {row.customer_id}, Equipment ID: {row.equipment_id}{request}")
+        stats = intake_queue.stats()
+        print(f"--- {stats['committed']} saved in {stats['batches']} commits, "
+              f"{stats['records_per_second']} records/s ---")
+
+    def _read_job_filters(self):
+        """Prompts for optional service request filters; blank answers are ignored."""
+        from app.models.job_status import JobStatus
+        filters = {}
+        if input("Apply filters? (y/N): ").strip().lower() != 'y':
+            return filters
+        status = input("Status (e.g., Job Created, Job Assessed) [any]: ").strip()
+        technician_id = input("Technician ID [any]: ").strip()
+        customer_id = input("Customer ID [any]: ").strip()
+        created_since = input("Created on or after (YYYY-MM-DD) [any]: ").strip()
+        created_until = input("Created on or before (YYYY-MM-DD) [any]: ").strip()
+        if status:
+            try:
+                filters["status"] = JobStatus.parse(status)
+            except ValueError:
+                print(f"Warning: unknown status '{status}' ignored.")
+        if technician_id.isdigit():
+            filters["technician_id"] = int(technician_id)
+        if customer_id.isdigit():
+            filters["customer_id"] = int(customer_id)
+        try:
+            if created_since:
+                filters["created_since"] = datetime.strptime(created_since, "%Y-%m-%d").strftime("%Y-%m-%d")
+            if created_until:
+                # Stored timestamps include a time, so the inclusive end is the next midnight.
+                until = datetime.strptime(created_until, "%Y-%m-%d") + timedelta(days=1)
+                filters["created_before"] = until.strftime("%Y-%m-%d")
+        except ValueError:
+            print("Warning: invalid date format ignored. Use YYYY-MM-DD.")
+        return filters
+
+    def _view_all_service_requests(self, page_size=20):
+        """Displays service requests one page at a time."""
+        from app.models.job import Job
+        from app.models.job_status import JobStatus
+        try:
+            filters = self._read_job_filters()
+            after_id = None
+            shown = 0
+            while True:
+                page, after_id = Job.get_page(after_id=after_id, limit=page_size, **filters)
+                if not page and shown == 0:
+                    print("No service requests are currently in the system.")
+                    return
+                if shown == 0:
+                    print("\n--- All Service Requests ---")
+                for job in page:
+                    print(f"Request ID: {job.id}, Customer: {job.customer_name}, Issue: {job.description}, Status: {JobStatus(job.status).label}, Estimated Cost: {job.job_cost}")
+                shown += len(page)
+                if after_id is None:
+                    print("--- End of List ---")
+                    return
+                if input(f"Shown {shown} requests. Press Enter for the next page or 'q' to stop: ").strip().lower() == 'q':
+                    return
         except Exception as e:
             print(f"[ERROR] Could not retrieve service requests: {e}")
 
+    def _view_dashboard_metrics(self):
+        """Shows job counts, revenue and technician load from the summary tables."""
+        from app.services.metrics_service import MetricsService
+        try:
+            summary = MetricsService.summary()
+            print("\n--- Dashboard Metrics ---")
+            for status, count in summary["jobs_by_status"].items():
+                print(f"{status}: {count}")
+            print(f"Total Jobs: {summary['total_jobs']}, Open Backlog: {summary['backlog']}, "
+                  f"Revenue (completed): {summary['revenue']:.2f}")
+            turnaround = MetricsService.turnaround()
+            if turnaround["jobs"]:
+                print(f"Turnaround (created to completed) over {turnaround['jobs']} jobs: "
+                      f"median {turnaround['median_hours']:.1f} h, 95th percentile {turnaround['p95_hours']:.1f} h")
+            print("\n--- Technician Load ---")
+            for load in MetricsService.technician_load():
+                print(f"Technician ID: {load.technician_id}, Name: {load.name}, Open: {load.open_jobs}, "
+                      f"Completed: {load.completed_jobs}, Revenue: {load.revenue:.2f}")
+        except Exception as e:
+            print(f"[ERROR] Could not load dashboard metrics: {e}")
+
+    def _export_reports(self):
+        """Writes finance reports to files without listing them on screen."""
+        from app.services.exporter import EXPORT_FORMATS, REPORTS, export_many
+        try:
+            names = list(REPORTS)
+            for index, name in enumerate(names, start=1):
+                print(f"{index}. {name.replace('_', ' ').title()}")
+            picks = input("Reports to export (e.g., 1,3) [all]: ").strip()
+            selected = [names[int(pick) - 1] for pick in picks.split(",") if pick.strip()] if picks else names
+            file_format = input(f"Format ({', '.join(EXPORT_FORMATS)}) [csv]: ").strip().lower() or "csv"
+            if file_format not in EXPORT_FORMATS:
+                print(f"Unsupported format '{file_format}'.")
+                return
+            output_dir = input("Output directory [.]: ").strip() or "."
+            filters = self._read_job_filters()
+            filters.pop("technician_id", None)  # Exports cover every technician and customer
+            filters.pop("customer_id", None)
+
+            extension = "columnar.jsonl" if file_format == "columnar" else file_format
+            jobs = [dict(filters, report=name, file_format=file_format,
+                         output=os.path.join(output_dir, f"{name}.{extension}"))
+                    for name in selected]
+            for result in export_many(jobs):
+                print(f"Exported {result['rows']} rows to {result['output']} in {result['elapsed_seconds']:.2f}s.")
+        except (ValueError, IndexError):
+            print("[ERROR] Invalid report selection. Enter numbers from the list.")
+        except Exception as e:
+            print(f"[ERROR] Export failed: {e}")
+
+    def _search_records(self):
+        """Finds service requests and records by fragments of issue text, names or serials."""
+        from app.models.job_status import JobStatus
+        from app.services.search_service import SearchService
+        try:
+            search_text = input("Search for (issue text, customer name/email, serial number, supplier): ").strip()
+            if not search_text:
+                print("No search text entered.")
+                return
+
+            started = time.perf_counter()
+            matching_jobs = SearchService.search_jobs(search_text)
+            other_matches = SearchService.search(search_text, kinds=("customer", "equipment", "supplier"))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            if not matching_jobs and not other_matches:
+                print(f"No records match '{search_text}'.")
+                return
+            if matching_jobs:
+                print("\n--- Matching Service Requests ---")
+                for job in matching_jobs:
+                    print(f"Request ID: {job.id}, Customer: {job.customer_name}, Issue: {job.description}, Status: {JobStatus(job.status).label}")
+            if other_matches:
+                print("\n--- Other Matching Records ---")
+                for match in other_matches:
+                    print(f"{match.kind.title()} ID: {match.ref_id}, {match.title} ({match.body})")
+            print(f"--- Search completed in {elapsed_ms:.1f} ms ---")
+        except Exception as e:
+            print(f"[ERROR] Search failed: {e}")
+
     def _assign_request_to_technician(self):
-        """Assigns a service request (Job) to a technician."""
+        """Creates a service request (Job) for a technician, chosen automatically if none is given."""
+        from app.models.technician import Technician
+        from app.services.scheduler import scheduler
         try:
             device_id_str = input("Enter Equipment ID for the service request: ").strip()
-            tech_id_str = input("Enter Technician ID to assign: ").strip()
+            tech_id_str = input("Enter Technician ID to assign (Enter to match by expertise and load): ").strip()
             issue_description = input("Enter a brief description of the issue: ").strip()
 
-            if not all([device_id_str, tech_id_str, issue_description]):
-                print("[ERROR] Equipment ID, Technician ID, and issue description are all mandatory.")
+            if not all([device_id_str, issue_description]):
+                print("[ERROR] Equipment ID and issue description are mandatory.")
                 return
 
             try:
                 device_id = int(device_id_str)
-                tech_id = int(tech_id_str)
+                tech_id = int(tech_id_str) if tech_id_str else None
             except ValueError:
                 print("[ERROR] Equipment ID and Technician ID must be valid numbers.")
                 return
 
-            # Validations for existence of Equipment ID and Technician ID should be performed,
-            # ideally before creating the Job object or within the Job model's save logic.
-            new_job = Job(description=issue_description, technician_id=tech_id, equipment_id=device_id)
-            job_id = new_job.save() # Job model's save method, returns new job ID.
-            if job_id:
-                print(f"Service request created successfully with ID: {job_id} and assigned to Technician ID: {tech_id}.")
-            else:
-                print("[ERROR] Failed to create and assign service request. Please verify details.")
+            if tech_id is not None and Technician.get_by_id(tech_id) is None:
+                print(f"[ERROR] Technician ID {tech_id} does not exist.")
+                return
+
+            job_id, tech_id = scheduler.create_job(issue_description, device_id, tech_id)
+            print(f"Service request created successfully with ID: {job_id} and assigned to Technician ID: {tech_id}.")
+        except ValueError as e:
+            print(f"[ERROR] {e}")
         except Exception as e:
             print(f"[ERROR] An error occurred while assigning the service request: {e}")
 
+    def _assign_request_backlog(self):
+        """Assigns every unassigned service request in one batch."""
+        from app.services.scheduler import scheduler
+        try:
+            assignments = scheduler.assign_backlog()
+            if not assignments:
+                print("There are no unassigned service requests.")
+                return
+            for job_id, tech_id in assignments:
+                print(f"Request ID: {job_id} -> Technician ID: {tech_id}")
+            print(f"--- {len(assignments)} requests assigned ---")
+        except Exception as e:
+            print(f"[ERROR] Could not assign the request backlog: {e}")
+
     def _technician_actions(self):
         """Handles operations available to a logged-in technician."""
         if not self.active_user or not hasattr(self.active_user, 'email'): # Verifies active user is a technician.
@@ -346,7 +685,9 @@ class AppAction:
                 tech_options = {
                     "1": "View My Assigned Service Requests",
                     "2": "Update Status of Service Request",
-                    "3": "Logout from Technician Interface"
+                    "3": "Check Parts Availability",
+                    "4": "Reserve Parts for a Service Request",
+                    "5": "Logout from Technician Interface"
                 }
                 for key, value in tech_options.items():
                     print(f"{key}. {value}")
@@ -361,6 +702,10 @@ class AppAction:
                 elif tech_choice == '2':
                     self._update_service_request_status()
                 elif tech_choice == '3':
+                    self._check_parts_availability()
+                elif tech_choice == '4':
+                    self._reserve_parts_for_request()
+                elif tech_choice == '5':
                     print("Logging out from Technician Interface.")
                     self.active_user = None # Clear active user session.
                     break
@@ -378,6 +723,8 @@ class AppAction:
 
     def _view_assigned_service_requests(self):
         """Displays service requests assigned to the currently logged-in technician."""
+        from app.models.job import Job
+        from app.models.job_status import JobStatus
         if not self.active_user or not hasattr(self.active_user, 'get_id'):
             print("[ERROR] Cannot retrieve jobs: No active technician user session.")
             return
@@ -386,14 +733,9 @@ class AppAction:
             assigned_jobs = Job.get_by_technician(technician_identifier)
             if assigned_jobs:
                 print("\n--- Your Assigned Service Requests ---")
-                for job_info in assigned_jobs: # Iterates over job data.
-                    job_id = job_info[0] if len(job_info) > 0 else "N/A"
-                    issue = job_info[1] if len(job_info) > 1 else "N/A"
-                    status = job_info[2] if len(job_info) > 2 else "N/A"
-                    equipment_type = job_info[3] if len(job_info) > 3 else "N/A"
-                    serial_num = job_info[4] if len(job_info) > 4 else "N/A"
-                    print(f"\nRequest ID: {job_id}, Issue: {issue}, Status: {status}")
-                    print(f"  Equipment: {equipment_type}, Serial: {serial_num}")
+                for job in assigned_jobs:
+                    print(f"\nRequest ID: {job.id}, Issue: {job.description}, Status: {JobStatus(job.status).label}")
+                    print(f"  Equipment: {job.equipment_type}, Serial: {job.serial_number}")
                 print("--- End of List ---")
             else:
                 print("No service requests are currently assigned to you.")
@@ -404,6 +746,7 @@ class AppAction:
 
     def _update_service_request_status(self):
         """Allows a technician to update the status of one or more service requests."""
+        from app.models.job import Job
         if not self.active_user or not hasattr(self.active_user, 'get_id'):
             print("[ERROR] Cannot update status: No active technician user session.")
             return
@@ -428,11 +771,12 @@ class AppAction:
 
             technician_id = self.active_user.get_id()
             # Job model's method to update status for specific jobs by a technician.
-            success = Job.update_status_for_technician(job_identifiers_to_update, technician_id)
-            if success: 
-                print(f"Status of service requests {job_identifiers_to_update} updated to 'Assessed'.")
-            else:
-                print("Failed to update status for some or all selected requests. They may not exist or are not assigned to you.")
+            updated_ids, skipped_ids = Job.update_status_for_technician(job_identifiers_to_update, technician_id)
+            if updated_ids:
+                print(f"Status of service requests {updated_ids} updated to 'Assessed'.")
+                self._print_cost_suggestions(updated_ids)
+            if skipped_ids:
+                print(f"Skipped requests {skipped_ids}: they do not exist, are not assigned to you or are already past 'Created'.")
         except ValueError: 
             print("[ERROR] Invalid input. Please enter numeric Request IDs separated by commas.")
         except AttributeError:
@@ -440,6 +784,62 @@ class AppAction:
         except Exception as e:
             print(f"[ERROR] An error occurred while updating service request status: {e}")
 
+    def _print_cost_suggestions(self, job_ids):
+        """Prints the suggested final cost of newly assessed jobs, from comparable past jobs."""
+        from app.services.cost_estimator import cost_estimator
+        try:
+            for job_id, estimate in sorted(cost_estimator.estimate_jobs(job_ids).items()):
+                if estimate is None:
+                    print(f"Request ID {job_id}: no comparable completed jobs to suggest a cost from.")
+                else:
+                    print(f"Request ID {job_id}: suggested cost {estimate.suggested:.2f} (usually {estimate.low:.2f}-{estimate.high:.2f}, from {estimate.samples} {estimate.basis}).")
+        except Exception as e:
+            print(f"[ERROR] Could not suggest costs: {e}")
+
+    def _check_parts_availability(self):
+        """Shows stock of a part type (optionally at one location) across suppliers."""
+        from app.services.supplier_manager import SupplierManager
+        part_type = input("Enter part type (e.g., Battery): ").strip()
+        if not part_type:
+            print("[ERROR] A part type is required.")
+            return
+        location = input("Enter location (leave blank for all): ").strip() or None
+        try:
+            stock = SupplierManager.availability(part_type=part_type, location=location)
+            if not stock:
+                print(f"No '{part_type}' parts are stocked{f' in {location}' if location else ''}.")
+                return
+            print(f"\n--- '{part_type}' Parts in Stock ---")
+            for row in stock:
+                print(f"Part ID: {row.part_id}, SKU: {row.sku}, Name: {row.name}, Supplier ID: {row.supplier_id} "
+                      f"({row.supplier_name}, {row.location}), Available: {row.available} of {row.on_hand}")
+            print("--- End of List ---")
+        except Exception as e:
+            print(f"[ERROR] Could not check parts availability: {e}")
+
+    def _reserve_parts_for_request(self):
+        """Holds parts for one of the technician's service requests until it is completed."""
+        from app.services.supplier_manager import SupplierManager
+        from app.utils.exceptions import InsufficientStockException
+        job_input = input("Enter Request ID: ").strip()
+        part_input = input("Enter Part ID: ").strip()
+        quantity_input = input("Enter quantity (default 1): ").strip() or "1"
+        if not (job_input.isdigit() and part_input.isdigit() and quantity_input.isdigit()):
+            print("[ERROR] Request ID, Part ID and quantity must be numbers.")
+            return
+        location = input("Preferred supplier location (leave blank for any): ").strip() or None
+        try:
+            reservation_id = SupplierManager.reserve(int(job_input), int(part_input), int(quantity_input),
+                                                     location=location, technician_id=self.active_user.get_id())
+            print(f"Reserved {quantity_input} of part {part_input} for request {job_input} "
+                  f"(Reservation ID: {reservation_id}).")
+        except InsufficientStockException as e:
+            print(f"Could not reserve parts. {e}")
+        except ValueError as e:
+            print(f"[ERROR] {e}")
+        except Exception as e:
+            print(f"[ERROR] Failed to reserve parts: {e}")
+
     def _customer_interactions(self):
         """Handles operations available to a logged-in customer."""
         if not self.active_user or not hasattr(self.active_user, 'email'): # Verifies active user is a customer.
@@ -483,6 +883,9 @@ class AppAction:
 
     def _submit_equipment_for_repair(self):
         """Allows a customer to submit their equipment for repair."""
+        from app.models.job_status import JobStatus
+        from app.services.serial_registry import serial_registry
+        from app.utils.exceptions import DuplicateSerialException
         if not self.active_user or not hasattr(self.active_user, 'get_id'):
             print("[ERROR] Cannot submit equipment: No active customer user session.")
             return
@@ -495,11 +898,19 @@ class AppAction:
                 return
 
             customer_identifier = self.active_user.get_id()
-            # Equipment object is instantiated with customer ID and device details.
-            equipment_record = Equipment(customer_id=customer_identifier, type=device_type, serial_number=device_serial)
-            equipment_id = equipment_record.save() # Equipment model's save method.
+            # The registry reuses the device's record if it has been in before.
+            try:
+                equipment_id, history = serial_registry.register(customer_identifier, device_type, device_serial)
+            except DuplicateSerialException:
+                print(f"[ERROR] Serial number {device_serial} is registered to another customer. "
+                      "Please contact the service desk.")
+                return
 
-            if equipment_id: 
+            if history:
+                print(f"Welcome back: this {history.type} has been in for repair {len(history.jobs)} time(s) before.")
+                for job in history.jobs:
+                    print(f"  Request ID: {job.id}, Issue: {job.description}, Status: {JobStatus(job.status).label}")
+            if equipment_id:
                 print(f"Equipment '{device_type}' (Serial: {device_serial}) submitted successfully for repair.")
                 # A new Job should typically be created here or flagged for admin review.
             else:
@@ -511,6 +922,9 @@ class AppAction:
 
     def _review_completed_requests_add_cost(self):
         """Allows an administrator to review assessed jobs and add final costs."""
+        from app.models.job import Job
+        from app.models.job_status import JobStatus
+        from app.services.cost_estimator import cost_estimator
         try:
             # Retrieves jobs that are assessed and may be pending final cost.
             assessed_jobs = Job.get_assessed_jobs()
@@ -519,23 +933,13 @@ class AppAction:
                 return
 
             print("\n--- Assessed Service Requests Awaiting Final Cost ---")
-            job_dict = {} # Used for quick lookup of a job by its ID.
-            for job_details in assessed_jobs:
-                job_id = job_details[0] if len(job_details) > 0 else None
-                if job_id is None: continue # Skip entry if job_id is missing.
-
-                equipment_id = job_details[1] if len(job_details) > 1 else "N/A"
-                tech_id = job_details[2] if len(job_details) > 2 else "N/A"
-                issue = job_details[3] if len(job_details) > 3 else "N/A"
-                status = job_details[4] if len(job_details) > 4 else "N/A"
-                cost = job_details[5] if len(job_details) > 5 and job_details[5] is not None else "Not Yet Added"
-                
-                job_dict[job_id] = job_details # Store job details for easy access.
-                print(f"Request ID: {job_id}, Equipment ID: {equipment_id}, Technician ID: {tech_id}, Issue: {issue}, Status: {status}, Final Cost: {cost}")
-            
-            if not job_dict: # No valid jobs were processed.
-                print("No valid assessed jobs found to process for cost addition.")
-                return
+            job_dict = {job.id: job for job in assessed_jobs} # Used for quick lookup of a job by its ID.
+            estimates = cost_estimator.estimate_jobs(job_dict)
+            for job in assessed_jobs:
+                cost = job.job_cost if job.job_cost is not None else "Not Yet Added"
+                estimate = estimates.get(job.id)
+                suggested = f"{estimate.suggested:.2f} ({estimate.low:.2f}-{estimate.high:.2f})" if estimate else "None"
+                print(f"Request ID: {job.id}, Equipment ID: {job.equipment_id}, Technician ID: {job.technician_id}, Issue: {job.description}, Status: {JobStatus(job.status).label}, Final Cost: {cost}, Suggested: {suggested}")
 
             selected_job_id_str = input("Enter Request ID to add/update final cost (or press Enter to skip): ").strip()
             if selected_job_id_str:
@@ -548,14 +952,21 @@ class AppAction:
                     print("[ERROR] Invalid Request ID format. Please enter a number.")
                     return
 
-                final_cost_str = input(f"Enter the final cost amount for Request ID {selected_job_id}: ").strip()
+                estimate = estimates.get(selected_job_id)
+                if estimate:
+                    final_cost_str = input(f"Enter the final cost amount for Request ID {selected_job_id} (press Enter for {estimate.suggested:.2f}): ").strip()
+                    final_cost_str = final_cost_str or str(estimate.suggested)
+                else:
+                    final_cost_str = input(f"Enter the final cost amount for Request ID {selected_job_id}: ").strip()
                 try:
                     final_cost = float(final_cost_str)
                     if final_cost < 0:
                         print("[ERROR] Final cost cannot be a negative value.")
                         return
-                    Job.update_cost(selected_job_id, final_cost) # Job model updates cost.
-                    print(f"Final cost updated to {final_cost:.2f} for Request ID {selected_job_id}.")
+                    if Job.update_cost(selected_job_id, final_cost): # Job model updates cost and completes the job.
+                        print(f"Final cost updated to {final_cost:.2f} for Request ID {selected_job_id}.")
+                    else:
+                        print(f"[ERROR] Request ID {selected_job_id} is no longer awaiting a final cost.")
                 except ValueError:
                     print("[ERROR] Invalid cost amount. Please enter a numeric value (e.g., 120.50).")
         except Exception as e:
@@ -605,23 +1016,26 @@ class AppAction:
             sys.path.insert(0, project_root_to_add)
             
         try:
-            test_loader = unittest.TestLoader()
-            test_suite = test_loader.discover(start_dir=tests_directory, pattern='test_*.py')
+            # Modules run in parallel worker processes, each test on a throwaway copy of a
+            # migrated template database, so the application's data is never touched.
+            from app.tests.runner import print_report, run_tests
+            started = time.perf_counter()
+            test_records = run_tests(start_dir=tests_directory, pattern='test_*.py',
+                                     top_level_dir=os.path.abspath(os.path.join(tests_directory, '..', '..')))
 
-            if test_suite.countTestCases() == 0:
+            if not test_records:
                 print("No test cases found in the 'tests' directory (matching 'test_*.py').")
                 print("Ensure test files are named correctly and contain unittest.TestCase classes.")
             else:
-                test_runner = unittest.TextTestRunner(verbosity=2)
-                test_results = test_runner.run(test_suite)
+                passed = print_report(test_records, time.perf_counter() - started)
                 print("\n--- Test Execution Summary ---")
-                if test_results.wasSuccessful():
+                if passed:
                     print("All discovered test cases passed successfully!")
                 else:
                     print("Some test cases FAILED or had ERRORS.")
-                    print(f"  Tests run: {test_results.testsRun}")
-                    print(f"  Failures: {len(test_results.failures)}")
-                    print(f"  Errors: {len(test_results.errors)}")
+                    print(f"  Tests run: {len(test_records)}")
+                    print(f"  Failures: {sum(record['outcome'] == 'FAIL' for record in test_records)}")
+                    print(f"  Errors: {sum(record['outcome'] == 'ERROR' for record in test_records)}")
         except ImportError as ie:
             print(f"[ERROR] Failed to import modules during test discovery or execution: {ie}")
             print("This may be due to incorrect project structure or missing __init__.py files in packages.")
@@ -0,0 +1,565 @@
+import argparse
+import asyncio
+import json
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from app.db.db import DB
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.job_status import JobStatus
+from app.models.part import Part
+from app.models.supplier import Supplier
+from app.models.technician import Technician
+from app.services.cost_estimator import cost_estimator
+from app.services.intake_queue import intake_queue
+from app.services.metrics_service import MetricsService
+from app.services.scheduler import scheduler
+from app.services.search_service import SearchService
+from app.services.serial_registry import serial_registry
+from app.services.supplier_manager import SupplierManager
+from app.utils.exceptions import (
+    DuplicateSerialException, InsufficientStockException, IntakeQueueFullException, PoolExhaustedException,
+)
+
+MAX_HEADER_LINES = 100
+MAX_LINE_BYTES = 8192
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    def __init__(self, method, target, version, headers, body):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path
+        self.query = dict(parse_qsl(url.query))
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.params = {}
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except (ValueError, UnicodeDecodeError):
+            raise ApiError(400, "Request body is not valid JSON.")
+        if not isinstance(data, dict):
+            raise ApiError(400, "Request body must be a JSON object.")
+        return data
+
+
+def _jsonable(value):
+    """Turns row NamedTuples (anywhere in the payload) into JSON objects, statuses into labels."""
+    if hasattr(value, "_asdict"):
+        row = {key: _jsonable(item) for key, item in value._asdict().items()}
+        if "status" in row:
+            row["status"] = JobStatus(row["status"]).label
+        return row
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def _required(data, *fields):
+    missing = [field for field in fields if data.get(field) in (None, "")]
+    if missing:
+        raise ApiError(400, f"Missing required field(s): {', '.join(missing)}.")
+    return [data[field] for field in fields]
+
+
+def _job_status(value):
+    try:
+        return JobStatus.parse(value)
+    except ValueError as error:
+        raise ApiError(400, str(error))
+
+
+def _integer(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"'{name}' must be an integer.")
+
+
+# Handlers run on the database thread pool; each returns ``(status, payload)``.
+
+def health(request):
+    return 200, {"status": "ok", "pool": DB.pool_stats(), "read_pool": DB.read_pool_stats(),
+                 "intake": intake_queue.stats()}
+
+
+def metrics(request):
+    return 200, MetricsService.summary()
+
+
+def register_customer(request):
+    data = request.json()
+    name, email = _required(data, "name", "email")
+    # Checked inside the write transaction (BEGIN IMMEDIATE), so two requests for the
+    # same address cannot both pass the check.
+    with DB().transaction():
+        if Customer.email_registered(email):
+            raise ApiError(409, f"A customer with email '{email}' already exists.")
+        customer_id = Customer(name, email).save()
+        equipment_id = None
+        if data.get("equipment_type") or data.get("serial_number"):
+            equipment_type, serial = _required(data, "equipment_type", "serial_number")
+            equipment_id, _ = serial_registry.register(customer_id, equipment_type, serial)
+    return 201, {"customer_id": customer_id, "equipment_id": equipment_id}
+
+
+def find_customer(request):
+    email, = _required(request.query, "email")
+    customer = Customer.find_by_email(email)
+    if customer is None:
+        raise ApiError(404, "Customer not found.")
+    return 200, {"id": customer.id, "name": customer.name, "email": customer.email}
+
+
+def customer_equipment(request):
+    return 200, {"equipment": Equipment.get_by_customer(_integer(request.params["id"], "id"))}
+
+
+def equipment_by_serial(request):
+    serial, = _required(request.query, "serial")
+    history = serial_registry.lookup(serial)
+    if history is None:
+        raise ApiError(404, "No equipment with that serial number.")
+    return 200, history
+
+
+def queue_intake(request):
+    try:
+        ticket = intake_queue.enqueue(request.json(), timeout=1.0)
+    except ValueError as error:
+        raise ApiError(400, str(error))
+    except RuntimeError as error:
+        raise ApiError(503, str(error))
+    return 202, {"ticket": ticket}
+
+
+def intake_ticket(request):
+    ticket = request.params["ticket"]
+    if intake_queue.pending(ticket):
+        return 202, {"ticket": ticket, "pending": True}
+    row = intake_queue.resolve(ticket)
+    if row is None:
+        raise ApiError(404, "Unknown intake ticket.")
+    return 200, row
+
+
+def list_jobs(request):
+    query = request.query
+    filters = {key: query[key] for key in ("created_since", "created_before") if key in query}
+    if "status" in query:
+        filters["status"] = _job_status(query["status"])
+    for key in ("technician_id", "customer_id"):
+        if key in query:
+            filters[key] = _integer(query[key], key)
+    after_id = _integer(query["after_id"], "after_id") if "after_id" in query else None
+    limit = min(max(_integer(query.get("limit", 50), "limit"), 1), 500)
+    rows, next_after_id = Job.get_page(after_id=after_id, limit=limit, **filters)
+    return 200, {"jobs": rows, "next_after_id": next_after_id}
+
+
+def assign_job(request):
+    """Creates a job; without ``technician_id`` the scheduler picks one by expertise and load."""
+    data = request.json()
+    equipment_id, description = _required(data, "equipment_id", "description")
+    technician_id = data.get("technician_id")
+    if technician_id is not None:
+        technician_id = _integer(technician_id, "technician_id")
+        if Technician.get_by_id(technician_id) is None:
+            raise ApiError(404, f"Technician ID {technician_id} does not exist.")
+    try:
+        job_id, technician_id = scheduler.create_job(description, _integer(equipment_id, "equipment_id"),
+                                                     technician_id)
+    except ValueError as error:
+        raise ApiError(422, str(error))
+    return 201, {"job_id": job_id, "technician_id": technician_id}
+
+
+def assign_backlog(request):
+    limit = request.json().get("limit")
+    assignments = scheduler.assign_backlog(None if limit is None else _integer(limit, "limit"))
+    return 200, {"assigned": [{"job_id": job_id, "technician_id": technician_id}
+                              for job_id, technician_id in assignments]}
+
+
+def technician_jobs(request):
+    return 200, {"jobs": Job.get_by_technician(_integer(request.params["id"], "id"))}
+
+
+def update_job_status(request):
+    data = request.json()
+    job_ids, = _required(data, "job_ids")
+    if not isinstance(job_ids, list):
+        raise ApiError(400, "'job_ids' must be a list.")
+    job_ids = [_integer(job_id, "job_ids") for job_id in job_ids]
+    updated, skipped = Job.update_status_for_technician(job_ids, _integer(request.params["id"], "id"),
+                                                        _job_status(data.get("status") or JobStatus.ASSESSED))
+    return 200, {"updated": updated, "skipped": skipped}
+
+
+def finalize_cost(request):
+    cost, = _required(request.json(), "cost")
+    try:
+        cost = float(cost)
+    except (TypeError, ValueError):
+        raise ApiError(400, "'cost' must be a number.")
+    if cost < 0:
+        raise ApiError(400, "'cost' cannot be negative.")
+    job_id = _integer(request.params["id"], "id")
+    if not Job.update_cost(job_id, cost):
+        raise ApiError(409, f"Job {job_id} does not exist or is not awaiting a final cost.")
+    return 200, {"job_id": job_id, "job_cost": cost, "status": JobStatus.COMPLETED.label}
+
+
+def job_estimate(request):
+    """Suggested final cost from completed jobs on the same equipment type and issue."""
+    job_id = _integer(request.params["id"], "id")
+    estimates = cost_estimator.estimate_jobs([job_id])
+    if job_id not in estimates:
+        raise ApiError(404, "Job not found.")
+    return 200, {"job_id": job_id, "estimate": estimates[job_id]}
+
+
+def job_history(request):
+    events = Job.history(_integer(request.params["id"], "id"))
+    if not events:
+        raise ApiError(404, "Job not found.")
+    return 200, {"events": events}
+
+
+def list_suppliers(request):
+    return 200, {"suppliers": Supplier.get_all()}
+
+
+def add_supplier(request):
+    name, part_type, location = _required(request.json(), "name", "part_type", "location")
+    return 201, {"supplier_id": Supplier(name, part_type, location).save()}
+
+
+def remove_suppliers(request):
+    data = request.json()
+    supplier_ids, = _required(data, "ids")
+    if not isinstance(supplier_ids, list):
+        raise ApiError(400, "'ids' must be a list.")
+    supplier_ids = [_integer(supplier_id, "ids") for supplier_id in supplier_ids]
+    removed, missing, in_use = Supplier.remove_suppliers_by_ids(supplier_ids, soft=not data.get("hard"))
+    return 200, {"removed": removed, "missing": missing, "in_use": in_use}
+
+
+def list_parts(request):
+    query = request.query
+    stock = SupplierManager.availability(part_type=query.get("part_type"), location=query.get("location"),
+                                         sku=query.get("sku"))
+    return 200, {"stock": stock}
+
+
+def add_part(request):
+    data = request.json()
+    sku, name, part_type = _required(data, "sku", "name", "part_type")
+    threshold = _integer(data.get("reorder_threshold", 0), "reorder_threshold")
+    return 201, {"part_id": Part(sku, name, part_type, threshold).save()}
+
+
+def adjust_stock(request):
+    movements, = _required(request.json(), "movements")
+    if not isinstance(movements, list):
+        raise ApiError(400, "'movements' must be a list.")
+    rows = []
+    for movement in movements:
+        if not isinstance(movement, dict):
+            raise ApiError(400, "Each movement must be an object with part_id, supplier_id and quantity.")
+        part_id, supplier_id, quantity = _required(movement, "part_id", "supplier_id", "quantity")
+        rows.append((_integer(part_id, "part_id"), _integer(supplier_id, "supplier_id"), _integer(quantity, "quantity")))
+    try:
+        changed = SupplierManager.adjust_stock(rows)
+    except ValueError as error:
+        raise ApiError(400, str(error))
+    return 200, {"movements": len(rows), "stock_rows_changed": changed}
+
+
+def parts_to_reorder(request):
+    return 200, {"parts": SupplierManager.below_reorder()}
+
+
+def reserve_parts(request):
+    data = request.json()
+    part_id, = _required(data, "part_id")
+    supplier_id, technician_id = data.get("supplier_id"), data.get("technician_id")
+    try:
+        reservation_id = SupplierManager.reserve(
+            _integer(request.params["id"], "id"), _integer(part_id, "part_id"),
+            _integer(data.get("quantity", 1), "quantity"),
+            supplier_id=None if supplier_id is None else _integer(supplier_id, "supplier_id"),
+            location=data.get("location"),
+            technician_id=None if technician_id is None else _integer(technician_id, "technician_id"),
+        )
+    except ValueError as error:
+        raise ApiError(400, str(error))
+    return 201, {"reservation_id": reservation_id}
+
+
+def job_parts(request):
+    return 200, {"reservations": SupplierManager.reservations_for_job(_integer(request.params["id"], "id"))}
+
+
+def release_reservation(request):
+    if not SupplierManager.release(_integer(request.params["id"], "id")):
+        raise ApiError(404, "No open reservation with that id.")
+    return 200, {"released": True}
+
+
+def search(request):
+    text, = _required(request.query, "q")
+    kinds = request.query.get("kinds")
+    return 200, {"results": SearchService.search(text, kinds=kinds.split(",") if kinds else None)}
+
+
+ROUTES = [
+    ("GET", r"/health", health),
+    ("GET", r"/metrics", metrics),
+    ("POST", r"/customers", register_customer),
+    ("GET", r"/customers", find_customer),
+    ("GET", r"/customers/(?P<id>\d+)/equipment", customer_equipment),
+    ("GET", r"/equipment", equipment_by_serial),
+    ("POST", r"/intake", queue_intake),
+    ("GET", r"/intake/(?P<ticket>[0-9a-f]+)", intake_ticket),
+    ("GET", r"/jobs", list_jobs),
+    ("POST", r"/jobs", assign_job),
+    ("POST", r"/jobs/assign-backlog", assign_backlog),
+    ("POST", r"/jobs/(?P<id>\d+)/cost", finalize_cost),
+    ("GET", r"/jobs/(?P<id>\d+)/estimate", job_estimate),
+    ("GET", r"/jobs/(?P<id>\d+)/history", job_history),
+    ("GET", r"/jobs/(?P<id>\d+)/parts", job_parts),
+    ("POST", r"/jobs/(?P<id>\d+)/parts", reserve_parts),
+    ("GET", r"/technicians/(?P<id>\d+)/jobs", technician_jobs),
+    ("POST", r"/technicians/(?P<id>\d+)/jobs/status", update_job_status),
+    ("GET", r"/suppliers", list_suppliers),
+    ("POST", r"/suppliers", add_supplier),
+    ("POST", r"/suppliers/remove", remove_suppliers),
+    ("GET", r"/parts", list_parts),
+    ("POST", r"/parts", add_part),
+    ("POST", r"/parts/stock", adjust_stock),
+    ("GET", r"/parts/reorder", parts_to_reorder),
+    ("POST", r"/parts/reservations/(?P<id>\d+)/release", release_reservation),
+    ("GET", r"/search", search),
+]
+
+
+class ApiServer:
+    """HTTP/1.1 JSON API over the models, built on asyncio streams.
+
+    The event loop only parses requests and writes responses; every handler runs on a
+    thread pool sized to the connection pool, so a slow query never stalls other
+    clients. Connections are kept alive between requests until ``keep_alive_timeout``.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, workers=None, keep_alive_timeout=15.0,
+                 max_body_bytes=1 << 20):
+        self.host = host
+        self.port = port
+        self.workers = workers or DB.pool_size
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_body_bytes = max_body_bytes
+        self.routes = [(method, re.compile(pattern + r"/?\Z"), handler) for method, pattern, handler in ROUTES]
+        self.executor = None
+        self.server = None
+        self._connections = {}  # Handler task -> its stream writer
+        self.requests = 0
+        self.connections = 0
+        self.open_connections = 0
+        self.errors = 0
+
+    async def start(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api-db")
+        await asyncio.get_running_loop().run_in_executor(self.executor, DB)  # Migrate before serving
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                 limit=MAX_LINE_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            # Closing the transports hands idle keep-alive handlers an EOF so they exit cleanly.
+            for writer in list(self._connections.values()):
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self.server.wait_closed()
+            self.server = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def stats(self):
+        return {"requests": self.requests, "errors": self.errors, "connections": self.connections,
+                "open_connections": self.open_connections, "workers": self.workers}
+
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        self.open_connections += 1
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.keep_alive_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except ApiError as error:
+                    await self._respond(writer, error.status, {"error": error.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                status, payload = await self._dispatch(request)
+                await self._respond(writer, status, payload, request.keep_alive)
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.open_connections -= 1
+            self._connections.pop(task, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        try:
+            line = await reader.readline()
+        except ValueError:  # Longer than the stream limit
+            raise ApiError(414, "Request line too long.")
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            raise ApiError(400, "Malformed request line.")
+        method, target, version = parts
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            try:
+                line = await reader.readline()
+            except ValueError:
+                raise ApiError(431, "Header line too long.")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise ApiError(431, "Too many headers.")
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise ApiError(501, "Chunked request bodies are not supported; send Content-Length.")
+        # Only plain ASCII digits: int() would also take "-5", "1_0" and other digit scripts.
+        raw_length = headers.get("content-length", "0")
+        if not (raw_length.isascii() and raw_length.isdigit()):
+            raise ApiError(400, "Invalid Content-Length.")
+        length = int(raw_length)
+        if length > self.max_body_bytes:
+            raise ApiError(413, "Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version, headers, body)
+
+    async def _dispatch(self, request):
+        self.requests += 1
+        allowed = False
+        for method, pattern, handler in self.routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            request.params = match.groupdict()
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self.executor, handler, request)
+            except ApiError as error:
+                return error.status, {"error": error.message}
+            except (PoolExhaustedException, IntakeQueueFullException) as error:
+                self.errors += 1
+                return 503, {"error": str(error)}
+            except (sqlite3.IntegrityError, DuplicateSerialException, InsufficientStockException) as error:
+                return 409, {"error": str(error)}
+            except Exception as error:
+                self.errors += 1
+                print(f"[ERROR] {request.method} {request.path} failed: {error}")
+                return 500, {"error": "Internal server error."}
+        if allowed:
+            return 405, {"error": f"Method {request.method} not allowed on {request.path}."}
+        return 404, {"error": f"No route for {request.path}."}
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(_jsonable(payload)).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"Date: {time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime())}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the EDD models over an HTTP JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, help="Database threads (defaults to the pool size).")
+    args = parser.parse_args(argv)
+
+    server = ApiServer(args.host, args.port, workers=args.workers)
+
+    async def serve():
+        await server.start()
+        print(f"Serving on http://{server.host}:{server.port} with {server.workers} database threads.")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    print(server.stats())
+
+
+if __name__ == "__main__":
+    main()
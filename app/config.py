@@ -0,0 +1,74 @@
+import json
+import os
+
+# Every setting, its default and the environment variable that overrides it. A JSON file
+# named by EDD_CONFIG may set the same keys; the environment wins over the file.
+DEFAULTS = {
+    "database_path": "edd_system_app.db",
+    "pool_size": 5,
+    "read_pool_size": 3,
+    "busy_timeout_ms": 5000,
+    "cache_size": -16000,  # Negative is KiB: 16 MB of page cache per connection
+    "mmap_size": 64 * 1024 * 1024,
+    "synchronous": "NORMAL",  # With WAL, NORMAL only risks the last commits on power loss
+    "temp_store": "MEMORY",
+}
+ENVIRONMENT = {name: "EDD_" + name.upper() for name in DEFAULTS}
+ENVIRONMENT["database_path"] = "EDD_DB_PATH"
+
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+TEMP_STORE_MODES = ("DEFAULT", "FILE", "MEMORY")
+
+
+class Settings:
+    """Validated application settings; see ``DEFAULTS`` for the names."""
+
+    def __init__(self, **values):
+        unknown = set(values) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown setting(s): {', '.join(sorted(unknown))}.")
+        merged = dict(DEFAULTS, **values)
+        self.database_path = os.path.expanduser(os.path.expandvars(str(merged["database_path"])))
+        for name in ("pool_size", "read_pool_size", "busy_timeout_ms", "cache_size", "mmap_size"):
+            try:
+                setattr(self, name, int(merged[name]))
+            except (TypeError, ValueError):
+                raise ValueError(f"Setting '{name}' must be an integer, got {merged[name]!r}.")
+        if self.pool_size < 1 or self.read_pool_size < 1:
+            raise ValueError("Pool sizes must be at least 1.")
+        self.synchronous = self._choice("synchronous", merged["synchronous"], SYNCHRONOUS_MODES)
+        self.temp_store = self._choice("temp_store", merged["temp_store"], TEMP_STORE_MODES)
+
+    @staticmethod
+    def _choice(name, value, choices):
+        value = str(value).upper()
+        if value not in choices:
+            raise ValueError(f"Setting '{name}' must be one of {', '.join(choices)}, got {value!r}.")
+        return value
+
+    @property
+    def pragmas(self):
+        """PRAGMAs applied to every new connection, in order."""
+        return {
+            "cache_size": self.cache_size,
+            "mmap_size": self.mmap_size,
+            "synchronous": self.synchronous,
+            "temp_store": self.temp_store,
+        }
+
+
+def load_settings(environ=None):
+    """Builds Settings from the defaults, the EDD_CONFIG file and EDD_* variables."""
+    environ = os.environ if environ is None else environ
+    values = {}
+    config_file = environ.get("EDD_CONFIG")
+    if config_file:
+        with open(config_file, encoding="utf-8") as handle:
+            values.update(json.load(handle))
+    for name, variable in ENVIRONMENT.items():
+        if environ.get(variable, "") != "":
+            values[name] = environ[variable]
+    return Settings(**values)
+
+
+settings = load_settings()
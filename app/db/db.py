@@ -1,66 +1,192 @@
+import atexit
+import os
 import sqlite3
+import threading
+import time
+
+from app.config import settings
+from app.db.migrations import Migrator
+from app.db.pool import ConnectionPool
+from app.utils.cache import clear_caches
+
+
+def read_only_uri(path, immutable=False):
+    """``file:`` URI that opens ``path`` read-only (``immutable`` also skips locking)."""
+    uri = "file:" + os.path.abspath(path).replace("?", "%3f").replace("#", "%23") + "?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
 
 class DB:
-    connection = None  # Singleton connection for single database connection at all time
+    # Defaults come from app.config (environment variables or an EDD_CONFIG file).
+    path = settings.database_path
+    pool_size = settings.pool_size
+    busy_timeout = settings.busy_timeout_ms
+    pragmas = settings.pragmas
+    max_bound_parameters = 999  # SQLite's lowest default SQLITE_MAX_VARIABLE_NUMBER
+    pool = None  # Connection pool shared by every model
+    _pool_lock = threading.Lock()
+
+    # Long reads and reports use their own read-only pool, so they never hold one of the
+    # writers' connections. By default it reads the live file (WAL lets readers and the
+    # writer run side by side); use_snapshot() points it at a periodically refreshed copy.
+    read_pool_size = settings.read_pool_size
+    read_pool = None
+    snapshot_path = None
+    snapshot_max_age = 300.0
+    _snapshot_taken_at = None
+    _read_lock = threading.Lock()
 
     def __init__(self):
-        if DB.connection is None:
-            DB.connection = sqlite3.connect("edd_system_app.db")
-            self.db_migration()
-
-    def db_migration(self):
-        cursor = DB.connection.cursor()
-        
-        # Create customers table
-        cursor.execute('''CREATE TABLE IF NOT EXISTS customers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT NOT NULL
-        )''')
-        
-        # Create equipment table
-        cursor.execute('''CREATE TABLE IF NOT EXISTS equipment (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            customer_id INTEGER,
-            type TEXT NOT NULL,
-            serial_number TEXT NOT NULL,
-            FOREIGN KEY(customer_id) REFERENCES customers(id)
-        )''')
-
-        # Create jobs table (with equipment_id, technician_id, and job_cost)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                equipment_id INTEGER NOT NULL,
-                technician_id INTEGER,
-                description TEXT NOT NULL,
-                status TEXT NOT NULL,
-                job_cost REAL DEFAULT 0,
-                FOREIGN KEY(equipment_id) REFERENCES equipment(id),
-                FOREIGN KEY(technician_id) REFERENCES technicians(id)
-            )
-        ''')
-        
-        # Create technicians table
-        cursor.execute('''CREATE TABLE IF NOT EXISTS technicians (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT NOT NULL UNIQUE,
-            expertise TEXT NOT NULL
-        )''')
-
-        # Create suppliers table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS suppliers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                part_type TEXT NOT NULL,
-                location TEXT NOT NULL
-            )
-        ''')
-
-
-        DB.connection.commit()
+        if DB.pool is None:
+            with DB._pool_lock:
+                if DB.pool is None:
+                    pool = ConnectionPool(DB.path, max_size=DB.pool_size, busy_timeout=DB.busy_timeout,
+                                          pragmas=DB.pragmas)
+                    with pool.connection() as connection:
+                        self.db_migration(connection)
+                    DB.pool = pool
+
+    @classmethod
+    def configure(cls, path=None, pool_size=None):
+        """Points every model at another database; the pool is rebuilt on next use."""
+        with cls._pool_lock:
+            if cls.pool is not None:
+                cls.pool.close()
+                cls.pool = None
+            if path is not None:
+                cls.path = path
+            if pool_size is not None:
+                cls.pool_size = pool_size
+            cls._close_read_pool()
+            cls._snapshot_taken_at = None
+            clear_caches()  # Cached rows belong to the previous database
+
+    @classmethod
+    def use_snapshot(cls, snapshot_path, max_age=300.0):
+        """Sends reporting reads to a copy of the database refreshed every ``max_age`` seconds.
+
+        Pass None to read the live database again. Snapshot reads may lag writes by up to
+        ``max_age`` seconds, but never touch the live file at all.
+        """
+        with cls._read_lock:
+            cls.snapshot_path = snapshot_path
+            cls.snapshot_max_age = max_age
+            cls._snapshot_taken_at = None
+            cls._close_read_pool()
+
+    @classmethod
+    def refresh_snapshot(cls):
+        """Copies the live database to ``snapshot_path`` with SQLite's online backup API."""
+        with cls._read_lock:
+            cls._refresh_snapshot()
+
+    @classmethod
+    def _refresh_snapshot(cls):
+        partial = cls.snapshot_path + ".partial"
+        destination = sqlite3.connect(partial)
+        try:
+            # One step, so the copy is a single consistent read transaction; under WAL
+            # that never blocks the writer.
+            with DB().connection() as source:
+                source.backup(destination)
+            # The copy is only ever read, so it does not need WAL (or its -shm file).
+            destination.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            destination.close()
+        os.replace(partial, cls.snapshot_path)
+        cls._close_read_pool()  # Connections still checked out keep reading the old copy
+        cls._snapshot_taken_at = time.monotonic()
+
+    @classmethod
+    def _close_read_pool(cls):
+        if cls.read_pool is not None:
+            cls.read_pool.close()
+            cls.read_pool = None
+
+    @classmethod
+    def _reader_pool(cls):
+        DB()  # The schema must be current before anything opens it read-only
+        with cls._read_lock:
+            if cls.snapshot_path is not None:
+                if (cls._snapshot_taken_at is None
+                        or time.monotonic() - cls._snapshot_taken_at >= cls.snapshot_max_age):
+                    cls._refresh_snapshot()
+                database = read_only_uri(cls.snapshot_path, immutable=True)
+            else:
+                database = read_only_uri(cls.path)
+            if cls.read_pool is None:
+                cls.read_pool = ConnectionPool(database, max_size=cls.read_pool_size, uri=True, read_only=True,
+                                               busy_timeout=cls.busy_timeout, pragmas=cls.pragmas)
+            return cls.read_pool
+
+    @classmethod
+    def close(cls):
+        """Closes both pools, readers first: only a read-write connection closing last can
+        checkpoint the WAL and remove the -wal and -shm files."""
+        with cls._read_lock:
+            cls._close_read_pool()
+        with cls._pool_lock:
+            if cls.pool is not None:
+                cls.pool.close()
+                cls.pool = None
+
+    @classmethod
+    def pool_stats(cls):
+        return cls.pool.stats() if cls.pool is not None else {}
+
+    @classmethod
+    def read_pool_stats(cls):
+        return cls.read_pool.stats() if cls.read_pool is not None else {}
+
+    def connection(self):
+        """Checks out a pooled connection for the duration of a ``with`` block."""
+        return DB.pool.connection()
+
+    def read_connection(self):
+        """Checks out a read-only connection for a long read or report.
+
+        A thread already holding a writer connection (e.g. inside ``transaction()``) keeps
+        using it, so it still sees its own uncommitted writes.
+        """
+        if DB.pool.held_connection() is not None:
+            return DB.pool.connection()
+        return DB._reader_pool().connection()
+
+    def transaction(self):
+        """Groups every write in the ``with`` block into one atomic commit."""
+        return DB.pool.transaction()
+
+    def after_commit(self, callback):
+        """Defers ``callback`` until the current transaction commits, e.g. cache invalidation."""
+        DB.pool.after_commit(callback)
+
+    def insert_many(self, sql, rows):
+        """Inserts ``rows`` with one executemany in a single transaction; returns the new ids."""
+        rows = list(rows)
+        if not rows:
+            return []
+        with self.transaction() as db:
+            cursor = db.cursor()
+            cursor.executemany(sql, rows)
+            # The write lock is held for the whole batch, so AUTOINCREMENT ids are contiguous.
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
+    def db_migration(self, connection):
+        # Schema changes live in app/db/migrations.py as ordered, versioned steps. A database
+        # already at the latest version is recognised from its header alone and left alone.
+        migrator = Migrator(connection)
+        if migrator.is_current():
+            return []
+        return migrator.migrate()
 
     def get_connection(self):
-        return DB.connection
+        # Kept for older callers: the connection stays pinned to this thread
+        # until release_connection() is called. Prefer ``with DB().connection()``.
+        return DB.pool.thread_connection()
+
+    def release_connection(self):
+        DB.pool.release_thread_connection()
+
+
+atexit.register(DB.close)
@@ -0,0 +1,268 @@
+import bisect
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+HISTOGRAM_BOUNDS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_DB_PACKAGE = os.path.dirname(os.path.abspath(__file__))
+
+
+def fingerprint(sql):
+    """Normalizes a statement so calls differing only in literals or IN-list size group together."""
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _IN_LIST.sub("(...)", sql)
+
+
+def _call_site():
+    """Names the first caller outside app/db, e.g. ``Job.get_by_technician``."""
+    frame = sys._getframe(3)
+    while frame is not None and os.path.dirname(os.path.abspath(frame.f_code.co_filename)) == _DB_PACKAGE:
+        frame = frame.f_back
+    if frame is None:
+        return "<unknown>"
+    return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+
+
+class QueryStats:
+    __slots__ = ("fingerprint", "call_site", "calls", "rows", "total_ms", "max_ms", "vm_steps", "histogram")
+
+    def __init__(self, fingerprint, call_site):
+        self.fingerprint = fingerprint
+        self.call_site = call_site
+        self.calls = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.vm_steps = 0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def as_dict(self):
+        return {
+            "fingerprint": self.fingerprint,
+            "call_site": self.call_site,
+            "calls": self.calls,
+            "rows": self.rows,
+            "total_ms": self.total_ms,
+            "avg_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "max_ms": self.max_ms,
+            "vm_steps": self.vm_steps,
+            "histogram": dict(zip([f"<={b}ms" for b in HISTOGRAM_BOUNDS_MS] + ["inf"], self.histogram)),
+        }
+
+
+class QueryProfiler:
+    """Opt-in per-statement statistics for every pooled connection.
+
+    While disabled the only cost is one attribute check per cursor. When enabled,
+    cursors are timed from execute until their rows are consumed, and a progress
+    handler counts SQLite VM steps (in units of ``progress_interval``) per statement.
+    """
+
+    def __init__(self, slow_threshold_ms=100.0, slow_log_size=200, progress_interval=1000):
+        self.enabled = False
+        self.slow_threshold_ms = slow_threshold_ms
+        self.progress_interval = progress_interval
+        self.slow_queries = deque(maxlen=slow_log_size)
+        self.on_slow_query = None  # Optional callback(entry_dict)
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def enable(self, slow_threshold_ms=None):
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = slow_threshold_ms
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.stop_periodic_dump()
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.slow_queries.clear()
+
+    def record(self, sql, call_site, elapsed_ms, rows, vm_steps):
+        key = (fingerprint(sql), call_site)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = QueryStats(*key)
+            stats.calls += 1
+            stats.rows += max(rows, 0)
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.vm_steps += vm_steps
+            stats.histogram[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, elapsed_ms)] += 1
+        if elapsed_ms >= self.slow_threshold_ms:
+            entry = {"sql": sql.strip(), "call_site": call_site, "elapsed_ms": elapsed_ms,
+                     "rows": rows, "at": time.time()}
+            self.slow_queries.append(entry)
+            if self.on_slow_query is not None:
+                self.on_slow_query(entry)
+
+    def snapshot(self, order_by="total_ms"):
+        with self._lock:
+            queries = [stats.as_dict() for stats in self._stats.values()]
+        queries.sort(key=lambda q: q[order_by], reverse=True)
+        return {"enabled": self.enabled, "slow_threshold_ms": self.slow_threshold_ms,
+                "queries": queries, "slow_queries": list(self.slow_queries)}
+
+    def report(self, top=15, order_by="total_ms"):
+        """Plain-text summary of the heaviest statements, for the admin console."""
+        queries = self.snapshot(order_by)["queries"][:top]
+        if not queries:
+            return "No queries recorded."
+        lines = [f"{'calls':>7} {'total ms':>10} {'avg ms':>8} {'max ms':>8} {'rows':>8}  call site / statement"]
+        for q in queries:
+            lines.append(f"{q['calls']:>7} {q['total_ms']:>10.2f} {q['avg_ms']:>8.3f} {q['max_ms']:>8.2f} "
+                         f"{q['rows']:>8}  {q['call_site']}")
+            lines.append(f"{'':>45}{q['fingerprint'][:100]}")
+        lines.append(f"Slow queries (>= {self.slow_threshold_ms} ms) logged: {len(self.slow_queries)}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.snapshot(), handle, indent=2)
+
+    def start_periodic_dump(self, path, interval=60.0):
+        """Writes a JSON snapshot to ``path`` every ``interval`` seconds until stopped."""
+        self.stop_periodic_dump()
+
+        def tick():
+            self.dump(path)
+            self._timer = threading.Timer(interval, tick)
+            self._timer.daemon = True
+            self._timer.start()
+
+        self._timer = threading.Timer(interval, tick)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def stop_periodic_dump(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+profiler = QueryProfiler()
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Times each statement from execute until its rows are consumed or the cursor is dropped."""
+
+    _pending = None
+
+    def _finish(self):
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            sql, call_site, started, rows = pending
+            connection = self.connection
+            vm_steps = connection._vm_ticks * profiler.progress_interval
+            connection._vm_ticks = 0
+            rows = rows if rows or self.rowcount < 0 else self.rowcount
+            profiler.record(sql, call_site, (time.perf_counter() - started) * 1000, rows, vm_steps)
+
+    def _start(self, sql):
+        self._finish()
+        self.connection._vm_ticks = 0
+        self._pending = [sql, _call_site(), time.perf_counter(), 0]
+
+    def execute(self, sql, parameters=()):
+        self._start(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._start(sql)
+        result = super().executemany(sql, seq_of_parameters)
+        self._finish()
+        return result
+
+    def _count(self, rows):
+        if self._pending is not None:
+            self._pending[3] += rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is None:
+            self._finish()
+        else:
+            self._count(1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._count(len(rows))
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._count(len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._finish()
+            raise
+        self._count(1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection that hands out ProfilingCursors only while profiling is enabled."""
+
+    _vm_ticks = 0
+    _progress_installed = False
+
+    def _tick(self):
+        self._vm_ticks += 1
+        return 0  # Never abort the statement
+
+    def cursor(self, factory=None):
+        if not profiler.enabled:
+            if self._progress_installed:
+                self.set_progress_handler(None, 0)
+                self._progress_installed = False
+            return super().cursor(factory) if factory else super().cursor()
+        if not self._progress_installed:
+            self.set_progress_handler(self._tick, profiler.progress_interval)
+            self._progress_installed = True
+        return super().cursor(factory or ProfilingCursor)
+
+    # Connection.execute() runs statements without calling the cursor's execute(), so route
+    # the shortcuts through a cursor while profiling.
+    def execute(self, sql, parameters=()):
+        if not profiler.enabled:
+            return super().execute(sql, parameters)
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not profiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,482 @@
+from datetime import datetime, timezone
+
+from app.models.job_status import JobStatus
+from app.utils.utils import Utils
+
+
+def add_column(cursor, table, column, declaration):
+    """ALTER TABLE ... ADD COLUMN that is a no-op when the column already exists."""
+    columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+class Migration:
+    """One ordered schema step. Statements must be safe to run twice."""
+
+    def __init__(self, version, description, statements=(), apply=None):
+        self.version = version
+        self.description = description
+        self.statements = list(statements)
+        self.apply = apply
+
+    def run(self, cursor):
+        for statement in self.statements:
+            cursor.execute(statement)
+        if self.apply is not None:
+            self.apply(cursor)
+
+
+def _add_job_created_at(cursor):
+    add_column(cursor, "jobs", "created_at", "TEXT")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)")
+
+
+# Full-text search: one FTS5 table holds a document per customer, equipment, job and
+# supplier. A document's rowid is ``ref_id * 4 + kind code`` so triggers can replace it
+# without an extra lookup index.
+SEARCH_DOCUMENTS = {
+    # table: (kind code, kind, title column, body column, columns whose change reindexes)
+    "customers": (0, "customer", "name", "email", "name, email"),
+    "equipment": (1, "equipment", "serial_number", "type", "type, serial_number"),
+    "jobs": (2, "job", "description", "''", "description"),
+    "suppliers": (3, "supplier", "name", "part_type", "name, part_type"),
+}
+
+
+def search_trigger_statements(table):
+    code, kind, title, body, watched = SEARCH_DOCUMENTS[table]
+    title_new, body_new = _qualify(title, "NEW"), _qualify(body, "NEW")
+    insert = (
+        f"INSERT INTO search_index (rowid, kind, ref_id, title, body) "
+        f"VALUES (NEW.id * 4 + {code}, '{kind}', NEW.id, {title_new}, {body_new});"
+    )
+    delete = f"DELETE FROM search_index WHERE rowid = OLD.id * 4 + {code};"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE OF {watched} ON {table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def search_backfill_statement(table, where=None):
+    code, kind, title, body, _ = SEARCH_DOCUMENTS[table]
+    return (
+        f"INSERT OR REPLACE INTO search_index (rowid, kind, ref_id, title, body) "
+        f"SELECT id * 4 + {code}, '{kind}', id, {title}, {body} FROM {table}"
+        + (f" WHERE {where}" if where else "")
+    )
+
+
+def _qualify(column, alias):
+    return column if column.startswith("'") else f"{alias}.{column}"
+
+
+def _add_search_index(cursor):
+    cursor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "kind UNINDEXED, ref_id UNINDEXED, title, body, prefix = '2 3', tokenize = 'unicode61')"
+    )
+    for table in SEARCH_DOCUMENTS:
+        for statement in search_trigger_statements(table):
+            cursor.execute(statement)
+        cursor.execute(search_backfill_statement(table))
+
+
+# Dashboard metrics: per-status job counts and revenue, and per-technician load, kept
+# current by triggers on jobs so reading them never touches the jobs table. ``completed``
+# is the SQL literal of the completed status: text before migration 8, an integer after.
+COMPLETED_STATUS = str(JobStatus.COMPLETED.value)
+
+
+def _metrics_delta(alias, sign, completed):
+    """Statements that add (sign 1) or remove (sign -1) one job row's contribution."""
+    cost = f"{sign} * COALESCE({alias}.job_cost, 0)"
+    completed = f"({alias}.status = {completed})"
+    return (
+        f"INSERT INTO job_status_counts (status, jobs, revenue) "
+        f"VALUES ({alias}.status, {sign}, {cost}) "
+        f"ON CONFLICT(status) DO UPDATE SET jobs = jobs + excluded.jobs, revenue = revenue + excluded.revenue; "
+        f"INSERT INTO technician_load (technician_id, open_jobs, completed_jobs, revenue) "
+        f"SELECT {alias}.technician_id, {sign} * NOT {completed}, {sign} * {completed}, {cost} "
+        f"WHERE {alias}.technician_id IS NOT NULL "
+        f"ON CONFLICT(technician_id) DO UPDATE SET open_jobs = open_jobs + excluded.open_jobs, "
+        f"completed_jobs = completed_jobs + excluded.completed_jobs, revenue = revenue + excluded.revenue;"
+    )
+
+
+def metrics_trigger_statements(completed=COMPLETED_STATUS):
+    added, removed = _metrics_delta("NEW", 1, completed), _metrics_delta("OLD", -1, completed)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS jobs_metrics_ai AFTER INSERT ON jobs BEGIN {added} END",
+        f"CREATE TRIGGER IF NOT EXISTS jobs_metrics_ad AFTER DELETE ON jobs BEGIN {removed} END",
+        "CREATE TRIGGER IF NOT EXISTS jobs_metrics_au AFTER UPDATE OF status, job_cost, technician_id ON jobs "
+        f"BEGIN {removed} {added} END",
+    ]
+
+
+def metrics_backfill_statements(completed=COMPLETED_STATUS):
+    return [
+        "DELETE FROM job_status_counts",
+        "DELETE FROM technician_load",
+        "INSERT INTO job_status_counts (status, jobs, revenue) "
+        "SELECT status, COUNT(*), TOTAL(job_cost) FROM jobs GROUP BY status",
+        "INSERT INTO technician_load (technician_id, open_jobs, completed_jobs, revenue) "
+        f"SELECT technician_id, SUM(status != {completed}), SUM(status = {completed}), TOTAL(job_cost) "
+        "FROM jobs WHERE technician_id IS NOT NULL GROUP BY technician_id",
+    ]
+
+
+def _add_metrics_tables(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS job_status_counts (
+        status TEXT PRIMARY KEY NOT NULL,
+        jobs INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0
+    )''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS technician_load (
+        technician_id INTEGER PRIMARY KEY,
+        open_jobs INTEGER NOT NULL DEFAULT 0,
+        completed_jobs INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0
+    )''')
+    for statement in metrics_trigger_statements("'Job Completed'"):
+        cursor.execute(statement)
+    for statement in metrics_backfill_statements("'Job Completed'"):
+        cursor.execute(statement)
+
+
+JOBS_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_jobs_technician_id ON jobs (technician_id)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_equipment_id ON jobs (equipment_id)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)",
+]
+
+
+def _store_job_status_as_integer(cursor):
+    # SQLite cannot change a column's type in place, so jobs is copied into a new table.
+    # Dropping the old one drops its indexes and triggers, which are recreated below.
+    sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'jobs'").fetchone()
+    cursor.execute('''CREATE TABLE jobs_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        equipment_id INTEGER NOT NULL,
+        technician_id INTEGER,
+        description TEXT NOT NULL,
+        status INTEGER NOT NULL DEFAULT 1,
+        job_cost REAL DEFAULT 0,
+        created_at TEXT,
+        FOREIGN KEY(equipment_id) REFERENCES equipment(id),
+        FOREIGN KEY(technician_id) REFERENCES technicians(id)
+    )''')
+    cursor.execute(
+        "INSERT INTO jobs_new (id, equipment_id, technician_id, description, status, job_cost, created_at) "
+        "SELECT id, equipment_id, technician_id, description, "
+        "CASE status WHEN 'Job Assessed' THEN 2 WHEN 'Job Completed' THEN 3 ELSE 1 END, job_cost, created_at "
+        "FROM jobs"
+    )
+    cursor.execute("DROP TABLE jobs")
+    cursor.execute("ALTER TABLE jobs_new RENAME TO jobs")
+    if sequence:
+        # Keep AUTOINCREMENT from reusing the ids of jobs deleted before the copy.
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'jobs'", sequence)
+    for statement in JOBS_INDEXES + search_trigger_statements("jobs"):
+        cursor.execute(statement)
+
+    cursor.execute("DROP TABLE job_status_counts")
+    cursor.execute('''CREATE TABLE job_status_counts (
+        status INTEGER PRIMARY KEY,
+        jobs INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0
+    )''')
+    for statement in metrics_trigger_statements("3") + metrics_backfill_statements("3"):
+        cursor.execute(statement)
+
+
+# Seconds since the epoch, as REAL, evaluated by SQLite.
+SQL_NOW = "((julianday('now') - 2440587.5) * 86400.0)"
+
+
+def job_event_trigger_statements():
+    return [
+        "CREATE TRIGGER IF NOT EXISTS jobs_events_ai AFTER INSERT ON jobs BEGIN "
+        f"INSERT INTO job_events (job_id, status, at) VALUES (NEW.id, NEW.status, {SQL_NOW}); END",
+        "CREATE TRIGGER IF NOT EXISTS jobs_events_au AFTER UPDATE OF status ON jobs "
+        "WHEN NEW.status IS NOT OLD.status BEGIN "
+        f"INSERT INTO job_events (job_id, status, at) VALUES (NEW.id, NEW.status, {SQL_NOW}); END",
+        "CREATE TRIGGER IF NOT EXISTS job_events_no_update BEFORE UPDATE ON job_events BEGIN "
+        "SELECT RAISE(ABORT, 'job_events is append-only'); END",
+        "CREATE TRIGGER IF NOT EXISTS job_events_no_delete BEFORE DELETE ON job_events BEGIN "
+        "SELECT RAISE(ABORT, 'job_events is append-only'); END",
+    ]
+
+
+def _add_job_events(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS job_events (
+        id INTEGER PRIMARY KEY,
+        job_id INTEGER NOT NULL,
+        status INTEGER NOT NULL,
+        at REAL NOT NULL,
+        FOREIGN KEY(job_id) REFERENCES jobs(id)
+    )''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_events_job_status ON job_events (job_id, status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_events_status_at ON job_events (status, at)")
+    # Earlier history was overwritten: existing jobs get a creation event at created_at and,
+    # if they have moved on, one for their current status at migration time.
+    cursor.execute(
+        "INSERT INTO job_events (job_id, status, at) "
+        f"SELECT id, 1, COALESCE(CAST(strftime('%s', created_at) AS REAL), {SQL_NOW}) FROM jobs"
+    )
+    cursor.execute(f"INSERT INTO job_events (job_id, status, at) SELECT id, status, {SQL_NOW} FROM jobs WHERE status != 1")
+    for statement in job_event_trigger_statements():
+        cursor.execute(statement)
+
+
+def _add_serial_registry(cursor):
+    add_column(cursor, "equipment", "serial_key", "TEXT")
+    rows = cursor.execute("SELECT id, serial_number FROM equipment").fetchall()
+    cursor.executemany("UPDATE equipment SET serial_key = ? WHERE id = ?",
+                       [(Utils.normalize_serial(serial), equipment_id) for equipment_id, serial in rows])
+    # Resubmitted devices became one row per submission: keep each customer's first
+    # registration, move every job onto it and drop the copies.
+    duplicates = cursor.execute(
+        "SELECT id, keep_id FROM (SELECT id, MIN(id) OVER (PARTITION BY serial_key, customer_id) AS keep_id "
+        "FROM equipment WHERE serial_key IS NOT NULL) WHERE id != keep_id"
+    ).fetchall()
+    cursor.executemany("UPDATE jobs SET equipment_id = ? WHERE equipment_id = ?",
+                       [(keep_id, duplicate_id) for duplicate_id, keep_id in duplicates])
+    cursor.executemany("DELETE FROM equipment WHERE id = ?", [(duplicate_id,) for duplicate_id, _ in duplicates])
+    # A serial registered to several customers cannot be told apart after the fact, so
+    # nothing is merged across owners: the first owned registration keeps the key and the
+    # others get Utils.owner_serial_key ('#' never occurs in a normalized key), which
+    # Equipment.save and find_by_serial still match for that owner. Unowned devices (one
+    # per key after the merge above) give way to owned ones and get "<key>#".
+    cursor.execute(
+        "UPDATE equipment SET serial_key = serial_key || '#' || COALESCE(customer_id, '') WHERE id IN ("
+        "SELECT id FROM (SELECT id, FIRST_VALUE(id) OVER (PARTITION BY serial_key "
+        "ORDER BY customer_id IS NULL, id) AS first_id "
+        "FROM equipment WHERE serial_key IS NOT NULL) WHERE id != first_id)"
+    )
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_equipment_serial_key ON equipment (serial_key)")
+
+
+def parts_consumption_trigger_statements():
+    """Completing a job turns its open reservations into stock that has left the shelf."""
+    open_reservation = ("part_reservations.job_id = NEW.id AND part_reservations.consumed_at IS NULL "
+                        "AND part_reservations.released_at IS NULL")
+    reserved_here = (f"SELECT TOTAL(quantity) FROM part_reservations WHERE {open_reservation} "
+                     "AND part_reservations.part_id = part_stock.part_id "
+                     "AND part_reservations.supplier_id = part_stock.supplier_id")
+    return [
+        "CREATE TRIGGER IF NOT EXISTS jobs_parts_consume AFTER UPDATE OF status ON jobs "
+        "WHEN NEW.status = 3 AND OLD.status IS NOT 3 BEGIN "
+        f"UPDATE part_stock SET on_hand = on_hand - CAST(({reserved_here}) AS INTEGER), "
+        f"reserved = reserved - CAST(({reserved_here}) AS INTEGER) "
+        "WHERE (part_id, supplier_id) IN (SELECT part_id, supplier_id FROM part_reservations "
+        f"WHERE {open_reservation}); "
+        f"UPDATE part_reservations SET consumed_at = {SQL_NOW} WHERE {open_reservation}; END",
+    ]
+
+
+def _add_parts_catalog(cursor):
+    # NOCASE columns let "battery" find "Battery" through the same indexes.
+    cursor.execute('''CREATE TABLE IF NOT EXISTS parts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        sku TEXT NOT NULL UNIQUE COLLATE NOCASE,
+        name TEXT NOT NULL,
+        part_type TEXT NOT NULL COLLATE NOCASE,
+        reorder_threshold INTEGER NOT NULL DEFAULT 0 CHECK (reorder_threshold >= 0)
+    )''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS part_stock (
+        part_id INTEGER NOT NULL,
+        supplier_id INTEGER NOT NULL,
+        on_hand INTEGER NOT NULL DEFAULT 0 CHECK (on_hand >= 0),
+        reserved INTEGER NOT NULL DEFAULT 0 CHECK (reserved >= 0 AND reserved <= on_hand),
+        PRIMARY KEY (part_id, supplier_id),
+        FOREIGN KEY(part_id) REFERENCES parts(id),
+        FOREIGN KEY(supplier_id) REFERENCES suppliers(id)
+    ) WITHOUT ROWID''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS part_reservations (
+        id INTEGER PRIMARY KEY,
+        job_id INTEGER NOT NULL,
+        part_id INTEGER NOT NULL,
+        supplier_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL CHECK (quantity > 0),
+        reserved_at REAL NOT NULL,
+        consumed_at REAL,
+        released_at REAL,
+        FOREIGN KEY(job_id) REFERENCES jobs(id),
+        FOREIGN KEY(part_id, supplier_id) REFERENCES part_stock(part_id, supplier_id)
+    )''')
+    for statement in [
+        "CREATE INDEX IF NOT EXISTS idx_parts_part_type ON parts (part_type)",
+        "CREATE INDEX IF NOT EXISTS idx_part_stock_supplier ON part_stock (supplier_id)",
+        "CREATE INDEX IF NOT EXISTS idx_part_reservations_job ON part_reservations (job_id)",
+        "CREATE INDEX IF NOT EXISTS idx_suppliers_part_type ON suppliers (part_type COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_suppliers_location ON suppliers (location COLLATE NOCASE)",
+    ] + parts_consumption_trigger_statements():
+        cursor.execute(statement)
+
+
+
+# Rows of a table that are live rather than tombstoned, for tables with soft deletes.
+LIVE_ROWS = {"suppliers": "deleted_at IS NULL"}
+
+
+def _add_supplier_tombstones(cursor):
+    add_column(cursor, "suppliers", "deleted_at", "REAL")
+    # Listings read the live rows through the first index and the purge finds tombstones
+    # through the second; each only holds the rows it is for.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_suppliers_live ON suppliers (id) WHERE deleted_at IS NULL")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_suppliers_deleted ON suppliers (deleted_at) WHERE deleted_at IS NOT NULL"
+    )
+    code = SEARCH_DOCUMENTS["suppliers"][0]
+    cursor.execute(
+        "CREATE TRIGGER IF NOT EXISTS suppliers_search_tombstone AFTER UPDATE OF deleted_at ON suppliers "
+        f"WHEN NEW.deleted_at IS NOT NULL BEGIN DELETE FROM search_index WHERE rowid = OLD.id * 4 + {code}; END"
+    )
+
+MIGRATIONS = [
+    Migration(1, "Create base tables", [
+        '''CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL
+        )''',
+        '''CREATE TABLE IF NOT EXISTS equipment (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            customer_id INTEGER,
+            type TEXT NOT NULL,
+            serial_number TEXT NOT NULL,
+            FOREIGN KEY(customer_id) REFERENCES customers(id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            equipment_id INTEGER NOT NULL,
+            technician_id INTEGER,
+            description TEXT NOT NULL,
+            status TEXT NOT NULL,
+            job_cost REAL DEFAULT 0,
+            FOREIGN KEY(equipment_id) REFERENCES equipment(id),
+            FOREIGN KEY(technician_id) REFERENCES technicians(id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS technicians (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            expertise TEXT NOT NULL
+        )''',
+        '''CREATE TABLE IF NOT EXISTS suppliers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            part_type TEXT NOT NULL,
+            location TEXT NOT NULL
+        )''',
+    ]),
+    Migration(2, "Add secondary indexes for model lookups", [
+        "CREATE INDEX IF NOT EXISTS idx_customers_email ON customers (email)",
+        "CREATE INDEX IF NOT EXISTS idx_equipment_customer_id ON equipment (customer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_equipment_serial_number ON equipment (serial_number)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_technician_id ON jobs (technician_id)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_equipment_id ON jobs (equipment_id)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)",
+    ]),
+    Migration(3, "Record job creation time for date-filtered listings", apply=_add_job_created_at),
+    Migration(4, "Add the notification outbox", [
+        '''CREATE TABLE IF NOT EXISTS notification_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            recipient TEXT NOT NULL,
+            message TEXT NOT NULL,
+            dedupe_key TEXT UNIQUE,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            sent_at REAL,
+            last_error TEXT
+        )''',
+        "CREATE INDEX IF NOT EXISTS idx_outbox_due ON notification_outbox (status, next_attempt_at)",
+    ]),
+    Migration(5, "Add the full-text search index and its sync triggers", apply=_add_search_index),
+    Migration(6, "Track bulk import progress for resumable imports", [
+        '''CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT PRIMARY KEY,
+            records_done INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )''',
+    ]),
+    Migration(7, "Add trigger-maintained dashboard metrics", apply=_add_metrics_tables),
+    Migration(8, "Store job status as a small integer", apply=_store_job_status_as_integer),
+    Migration(9, "Add the append-only job event log", apply=_add_job_events),
+    Migration(10, "Register each serial number once and merge duplicate equipment", apply=_add_serial_registry),
+    Migration(11, "Add the parts catalog with per-supplier stock and job reservations", apply=_add_parts_catalog),
+    Migration(12, "Soft-delete suppliers with tombstones", apply=_add_supplier_tombstones),
+    Migration(13, "Record the outcome of each queued intake ticket", [
+        '''CREATE TABLE IF NOT EXISTS intake_tickets (
+            ticket TEXT PRIMARY KEY,
+            customer_id INTEGER,
+            equipment_id INTEGER,
+            job_id INTEGER,
+            error TEXT,
+            committed_at REAL NOT NULL
+        ) WITHOUT ROWID''',
+    ]),
+    Migration(14, "Index customer emails case-insensitively", [
+        "CREATE INDEX IF NOT EXISTS idx_customers_email_lower ON customers (lower(email))",
+    ]),
+    Migration(15, "Index part reservations by supplier for supplier purges", [
+        "CREATE INDEX IF NOT EXISTS idx_part_reservations_supplier ON part_reservations (supplier_id)",
+    ]),
+]
+
+
+class Migrator:
+    """Applies pending migrations in order, recording each in ``schema_version``."""
+
+    def __init__(self, connection, migrations=None):
+        self.connection = connection
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+
+    def current_version(self):
+        self.connection.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )''')
+        row = self.connection.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        return row[0] or 0
+
+    def latest_version(self):
+        return self.migrations[-1].version if self.migrations else 0
+
+    def is_current(self):
+        """True if the file header says every migration has run.
+
+        ``migrate()`` mirrors the version into ``PRAGMA user_version``, which SQLite keeps in
+        the header, so this check reads no tables and creates nothing.
+        """
+        return self.connection.execute("PRAGMA user_version").fetchone()[0] == self.latest_version()
+
+    def migrate(self):
+        """Runs every migration newer than the recorded version; returns the versions applied."""
+        applied = []
+        current = self.current_version()
+        cursor = self.connection.cursor()
+        for migration in self.migrations:
+            if migration.version <= current:
+                continue
+            cursor.execute("BEGIN")
+            try:
+                migration.run(cursor)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (migration.version, migration.description, datetime.now(timezone.utc).isoformat())
+                )
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            applied.append(migration.version)
+        self.connection.execute(f"PRAGMA user_version = {max(current, self.latest_version())}")
+        return applied
@@ -0,0 +1,221 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from app.db.instrumentation import ProfiledConnection
+from app.utils.exceptions import PoolExhaustedException
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared by every model.
+
+    Connections are checked out for the duration of a ``connection()`` block and
+    handed back afterwards. A thread that re-enters ``connection()`` while it
+    already holds a connection gets the same one back, so nested model calls
+    never deadlock waiting on the pool.
+
+    A ``read_only`` pool opens its connections with ``PRAGMA query_only``; pass a
+    ``mode=ro`` URI as ``database`` (with ``uri=True``) to have SQLite enforce it too.
+    ``pragmas`` (name -> value, e.g. ``{"cache_size": -16000}``) are set on every new connection.
+    """
+
+    def __init__(self, database, max_size=5, timeout=10.0, busy_timeout=5000, uri=False, read_only=False,
+                 pragmas=None):
+        if max_size < 1:
+            raise ValueError("Connection pool size must be at least 1.")
+        self.database = database
+        self.max_size = max_size
+        self.timeout = timeout
+        self.busy_timeout = busy_timeout
+        self.uri = uri
+        self.read_only = read_only
+        self.pragmas = dict(pragmas or {})
+
+        self._idle = []
+        self._created = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._local = threading.local()
+
+        # Pool metrics, guarded by self._condition.
+        self._checkouts = 0
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _connect(self):
+        connection = sqlite3.connect(
+            self.database,
+            timeout=self.busy_timeout / 1000,
+            check_same_thread=False,  # Connections move between threads, never shared at once.
+            uri=self.uri,
+            factory=ProfiledConnection,
+        )
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        if self.read_only:
+            connection.execute("PRAGMA query_only = ON")
+        else:
+            connection.execute("PRAGMA journal_mode = WAL")
+        for name, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def acquire(self):
+        """Checks out a connection, waiting up to ``timeout`` seconds for one to free up."""
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolExhaustedException("Connection pool has been closed.")
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._created < self.max_size:
+                    connection = self._connect()
+                    self._created += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolExhaustedException(
+                        f"No database connection became available within {self.timeout} seconds "
+                        f"({self.max_size} connections in use)."
+                    )
+                self._condition.wait(remaining)
+
+            waited = time.perf_counter() - started
+            self._checkouts += 1
+            self._in_use += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return connection
+
+    def release(self, connection):
+        """Returns a connection to the pool, rolling back any transaction left open."""
+        if connection.in_transaction:
+            connection.rollback()
+        with self._condition:
+            self._in_use -= 1
+            if self._closed:
+                connection.close()
+                self._created -= 1
+            else:
+                self._idle.append(connection)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """Yields the calling thread's connection, checking one out if it holds none."""
+        held = getattr(self._local, "connection", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        connection = self.acquire()
+        self._local.connection = connection
+        self._local.depth = 1
+        try:
+            yield connection
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self._local.connection = None
+                self.release(connection)
+
+    @contextmanager
+    def transaction(self):
+        """Runs the block in one transaction, committed on success and rolled back on error.
+
+        Nested ``transaction()`` blocks on the same thread join the outermost one.
+        """
+        with self.connection() as connection:
+            if getattr(self._local, "transaction_depth", 0) > 0:
+                self._local.transaction_depth += 1
+                try:
+                    yield connection
+                finally:
+                    self._local.transaction_depth -= 1
+                return
+
+            if not connection.in_transaction:
+                # Take the write lock up front so the busy timeout applies, rather than
+                # failing on a read-to-write lock upgrade halfway through.
+                connection.execute("BEGIN IMMEDIATE")
+            self._local.transaction_depth = 1
+            self._local.after_commit = []
+            try:
+                yield connection
+            except BaseException:
+                connection.rollback()
+                raise
+            else:
+                connection.commit()
+                for callback in self._local.after_commit:
+                    callback()
+            finally:
+                self._local.transaction_depth = 0
+                self._local.after_commit = []
+
+    def after_commit(self, callback):
+        """Runs ``callback`` once the calling thread's transaction commits (now if none is open).
+
+        Callbacks are dropped if the transaction rolls back.
+        """
+        if getattr(self._local, "transaction_depth", 0) > 0:
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+
+    def held_connection(self):
+        """The connection the calling thread has checked out, or None."""
+        return getattr(self._local, "connection", None)
+
+    def thread_connection(self):
+        """Pins a connection to the calling thread until ``release_thread_connection()``."""
+        held = getattr(self._local, "connection", None)
+        if held is not None:
+            return held
+        connection = self.acquire()
+        self._local.connection = connection
+        self._local.depth = 1
+        return connection
+
+    def release_thread_connection(self):
+        held = getattr(self._local, "connection", None)
+        if held is not None:
+            self._local.connection = None
+            self._local.depth = 0
+            self.release(held)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "peak_in_use": self._peak_in_use,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "wait_time_total": self._wait_total,
+                "wait_time_max": self._wait_max,
+                "wait_time_avg": self._wait_total / self._checkouts if self._checkouts else 0.0,
+            }
+
+    def close(self):
+        """Closes idle connections; checked-out ones are closed as they come back."""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._created -= 1
+            self._condition.notify_all()
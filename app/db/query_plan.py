@@ -0,0 +1,82 @@
+import re
+
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: USING (?:COVERING )?INDEX (\w+))?")
+_CHECKED_STATEMENTS = ("SELECT", "UPDATE", "DELETE", "WITH")
+_ROW_REFERENCE = re.compile(r"\b(?:NEW|OLD)\.\w+", re.IGNORECASE)
+
+
+class QueryRecorder:
+    """Captures every statement a connection runs while the ``with`` block is open."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.statements = []
+
+    def __enter__(self):
+        self.connection.set_trace_callback(self.statements.append)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.connection.set_trace_callback(None)
+        return False
+
+
+def explain(connection, sql):
+    """Returns the EXPLAIN QUERY PLAN detail lines for a statement."""
+    return [row[3] for row in connection.execute("EXPLAIN QUERY PLAN " + sql).fetchall()]
+
+
+def full_table_scans(connection, sql):
+    """Returns the tables the planner would read end to end for ``sql``.
+
+    Scans of CTEs, subqueries and FTS virtual tables (which use their own index) are
+    not table scans and are ignored, and neither are scans of a partial index, which
+    only holds the rows its WHERE clause selects.
+    """
+    tables = {row[0] for row in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'"
+    )}
+    scans = []
+    for detail in explain(connection, sql):
+        match = _FULL_SCAN.match(detail)
+        if not match or match.group(1) not in tables or "VIRTUAL TABLE" in detail:
+            continue
+        table, index = match.groups()
+        if index is None or not _is_partial(connection, table, index):
+            scans.append(table)
+    return scans
+
+
+def _is_partial(connection, table, index):
+    return any(row[1] == index and row[4] for row in connection.execute(f"PRAGMA index_list({table})"))
+
+
+def trigger_statements(connection, table):
+    """Returns the body statements of ``table``'s triggers, ready for check_query_plans().
+
+    EXPLAIN QUERY PLAN does not show what a trigger runs, so each statement is planned on
+    its own with its NEW and OLD references replaced by a constant.
+    """
+    statements = []
+    for (sql,) in connection.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+                                     (table,)):
+        body = sql[sql.upper().index(" BEGIN ") + len(" BEGIN "):sql.upper().rindex("END")]
+        statements += [_ROW_REFERENCE.sub("0", statement) for statement in body.split(";") if statement.strip()]
+    return statements
+
+
+def check_query_plans(connection, statements, small_tables=()):
+    """Returns ``(sql, tables)`` for every filtered statement that still scans a table.
+
+    Unfiltered listings (no WHERE clause) are a scan by definition and are skipped, and
+    scans of ``small_tables`` (a handful of rows whatever the data size) are allowed.
+    """
+    violations = []
+    for sql in dict.fromkeys(s.strip() for s in statements):
+        keyword = sql.split(None, 1)[0].upper() if sql else ""
+        if keyword not in _CHECKED_STATEMENTS or " WHERE " not in " ".join(sql.upper().split()):
+            continue
+        scans = [table for table in full_table_scans(connection, sql) if table not in small_tables]
+        if scans:
+            violations.append((sql, scans))
+    return violations
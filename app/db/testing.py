@@ -0,0 +1,79 @@
+import atexit
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from contextlib import contextmanager
+
+from app.db.db import DB
+from app.db.migrations import Migrator
+
+# Where the migrated template lives; set by use_template() or built on first use.
+_template = None
+
+
+def scratch_directory(prefix="edd-test-"):
+    """A new temp directory, on /dev/shm when available so test databases stay in memory."""
+    shared_memory = "/dev/shm"
+    base = shared_memory if os.path.isdir(shared_memory) and os.access(shared_memory, os.W_OK) else None
+    return tempfile.mkdtemp(prefix=prefix, dir=base)
+
+
+def build_template(path):
+    """Creates a fully migrated, empty database at ``path`` for tests to copy."""
+    connection = sqlite3.connect(path)
+    try:
+        Migrator(connection).migrate()
+    finally:
+        connection.close()
+    return path
+
+
+def use_template(path):
+    """Makes every isolated database in this process a copy of ``path``."""
+    global _template
+    _template = path
+
+
+def template_path():
+    """The template database, building one in a scratch directory the first time."""
+    if _template is None:
+        directory = scratch_directory()
+        atexit.register(shutil.rmtree, directory, True)
+        use_template(build_template(os.path.join(directory, "template.db")))
+    return _template
+
+
+def fresh_database(directory):
+    """Copies the template into ``directory``; returns the copy's path."""
+    handle, path = tempfile.mkstemp(suffix=".db", dir=directory)
+    os.close(handle)
+    shutil.copyfile(template_path(), path)
+    return path
+
+
+@contextmanager
+def isolated_database():
+    """Points DB at a private copy of the template for the ``with`` block.
+
+    Copying a migrated file is much faster than migrating a new one, and nothing the
+    block writes reaches the application's database.
+    """
+    original_path = DB.path
+    directory = scratch_directory()
+    try:
+        DB.configure(path=fresh_database(directory))
+        yield DB.path
+    finally:
+        DB.use_snapshot(None)
+        DB.configure(path=original_path)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """TestCase whose every test, setUp and tearDown included, runs on its own database."""
+
+    def run(self, result=None):
+        with isolated_database():
+            return super().run(result)
@@ -1,3 +1,4 @@
+from app.db.db import DB
 from app.models.user import User
 from app.models.roles import Roles
 from app.models.customer import Customer
@@ -12,7 +13,9 @@ class Administrator(User):
         email = input("Enter email: ")
         equipment_type = input("Enter equipment type: ")
         serial = input("Enter serial number: ")
-        customer = Customer(name, email)
-        customer_id = customer.save()
-        Equipment.save(customer_id, equipment_type, serial)
+        # Customer and equipment are committed together or not at all.
+        with DB().transaction():
+            customer = Customer(name, email)
+            customer_id = customer.save()
+            Equipment(customer_id, equipment_type, serial).save()
         print("Walk-in customer and equipment recorded successfully.")
@@ -1,35 +1,71 @@
 from app.db.db import DB
+from app.models.rows import CustomerRow, row_factory
+from app.utils.cache import LRUCache, MISSING
 
 class Customer:
+    cache = LRUCache("customers.by_email", maxsize=4096, ttl=300)
+
     def __init__(self, name, email, id=None):
         self.name = name
         self.email = email
         self.id = id
 
     def save(self):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("INSERT INTO customers (name, email) VALUES (?, ?)", (self.name, self.email))
-        db.commit()
-        self.id = cursor.lastrowid
+        with DB().transaction() as db:
+            cursor = db.cursor()
+            cursor.execute("INSERT INTO customers (name, email) VALUES (?, ?)", (self.name, self.email))
+            self.id = cursor.lastrowid
+            DB().after_commit(lambda: Customer.cache.invalidate(self.email))
         return self.id
-    
+
+    @staticmethod
+    def save_many(customers):
+        customers = list(customers)
+        ids = DB().insert_many(
+            "INSERT INTO customers (name, email) VALUES (?, ?)",
+            [(customer.name, customer.email) for customer in customers]
+        )
+        for customer, customer_id in zip(customers, ids):
+            customer.id = customer_id
+        emails = [customer.email for customer in customers]
+        DB().after_commit(lambda: Customer.cache.invalidate(*emails))
+        return ids
+
     @staticmethod
     def get_all():
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM customers")
-        return cursor.fetchall()
+        with DB().read_connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(CustomerRow)
+            cursor.execute("SELECT id, name, email FROM customers")
+            return cursor.fetchall()
 
     @staticmethod
     def find_by_email(email):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("SELECT id, name, email FROM customers WHERE email = ?", (email,))
-        row = cursor.fetchone()
+        row = Customer.cache.get(email)
+        if row is MISSING:
+            generation = Customer.cache.generation()  # Taken first: a save committing mid-read must win
+            with DB().connection() as db:
+                cursor = db.cursor()
+                cursor.row_factory = row_factory(CustomerRow)
+                cursor.execute("SELECT id, name, email FROM customers WHERE email = ?", (email,))
+                row = cursor.fetchone()
+                # Rows read inside an open transaction may still be rolled back.
+                if not db.in_transaction:
+                    Customer.cache.set(email, row, generation)
         if row:
-            return Customer(row[1], row[2], id=row[0])
+            return Customer(row.name, row.email, id=row.id)
         return None
 
+    @staticmethod
+    def email_registered(email):
+        """True if a customer already has ``email``, ignoring case (idx_customers_email_lower).
+
+        Call it inside ``DB().transaction()`` before saving: the write lock is already held,
+        so the answer still holds when the new customer is inserted.
+        """
+        with DB().connection() as db:
+            row = db.execute("SELECT 1 FROM customers WHERE lower(email) = lower(?) LIMIT 1", (email,)).fetchone()
+        return row is not None
+
     def get_id(self):
         return self.id
\ No newline at end of file
@@ -1,6 +1,14 @@
+import sqlite3
+
 from app.db.db import DB
+from app.models.rows import EquipmentRow, JobRow, SerialHistoryRow, row_factory
+from app.utils.cache import LRUCache, MISSING
+from app.utils.exceptions import DuplicateSerialException
+from app.utils.utils import Utils
 
 class Equipment:
+    cache = LRUCache("equipment.by_customer", maxsize=4096, ttl=300)
+
     def __init__(self, customer_id, type=None, serial_number=None, id=None):
         self.customer_id = customer_id
         self.type = type
@@ -8,22 +16,97 @@ class Equipment:
         self.id = id
 
     def save(self):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute(
-            "INSERT INTO equipment (customer_id, type, serial_number) VALUES (?, ?, ?)",
-            (self.customer_id, self.type, self.serial_number)
-        )
-        db.commit()
-        self.id = cursor.lastrowid
+        """Registers the device and returns its id.
+
+        Each serial number is registered once: resubmitting a device the same customer
+        already owns returns the existing id, and a serial owned by another customer
+        raises DuplicateSerialException. A device kept apart under its owner's key when
+        the registry was introduced counts as already owned.
+        """
+        serial_key = Utils.normalize_serial(self.serial_number)
+        with DB().transaction() as db:
+            cursor = db.cursor()
+            try:
+                cursor.execute(
+                    "INSERT INTO equipment (customer_id, type, serial_number, serial_key) VALUES (?, ?, ?, ?)",
+                    (self.customer_id, self.type, self.serial_number, serial_key)
+                )
+            except sqlite3.IntegrityError as error:
+                if "serial_key" not in str(error):
+                    raise
+                # Only the failed statement is undone; the transaction carries on.
+                self.id, owner_id = cursor.execute(
+                    "SELECT id, customer_id FROM equipment WHERE serial_key = ?", (serial_key,)
+                ).fetchone()
+                if owner_id != self.customer_id:
+                    own = cursor.execute(
+                        "SELECT id FROM equipment WHERE serial_key = ?",
+                        (Utils.owner_serial_key(serial_key, self.customer_id),)
+                    ).fetchone()
+                    if own is None:
+                        raise DuplicateSerialException(self.serial_number, owner_id)
+                    self.id = own[0]
+                return self.id
+            self.id = cursor.lastrowid
+            DB().after_commit(lambda: Equipment.cache.invalidate(self.customer_id))
         return self.id
 
     @staticmethod
-    def get_by_customer(customer_id):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute(
-            "SELECT id, type, serial_number FROM equipment WHERE customer_id = ?",
-            (customer_id,)
+    def save_many(equipment_list):
+        """Bulk insert; a serial number already registered fails the whole batch."""
+        equipment_list = list(equipment_list)
+        ids = DB().insert_many(
+            "INSERT INTO equipment (customer_id, type, serial_number, serial_key) VALUES (?, ?, ?, ?)",
+            [(equipment.customer_id, equipment.type, equipment.serial_number,
+              Utils.normalize_serial(equipment.serial_number)) for equipment in equipment_list]
         )
-        return cursor.fetchall()
+        for equipment, equipment_id in zip(equipment_list, ids):
+            equipment.id = equipment_id
+        customer_ids = {equipment.customer_id for equipment in equipment_list}
+        DB().after_commit(lambda: Equipment.cache.invalidate(*customer_ids))
+        return ids
+
+    @staticmethod
+    def find_by_serial(serial_number, customer_id=None):
+        """Returns the device's SerialHistoryRow (owner plus every job), or None.
+
+        One query: the unique serial_key index finds the device, and the jobs come from
+        idx_jobs_equipment_id. With ``customer_id``, that customer's own device is looked
+        up when the migration kept it apart from an earlier owner's (Utils.owner_serial_key).
+        """
+        serial_key = Utils.normalize_serial(serial_number)
+        if serial_key is None:
+            return None
+        if customer_id is not None:
+            serial_key = Utils.owner_serial_key(serial_key, customer_id)
+        with DB().connection() as db:
+            rows = db.execute(
+                "SELECT equipment.id, equipment.type, equipment.serial_number, customers.id, customers.name, "
+                "customers.email, jobs.id, jobs.equipment_id, jobs.technician_id, jobs.description, jobs.status, "
+                "jobs.job_cost, jobs.created_at "
+                "FROM equipment LEFT JOIN customers ON customers.id = equipment.customer_id "
+                "LEFT JOIN jobs ON jobs.equipment_id = equipment.id "
+                "WHERE equipment.serial_key = ? ORDER BY jobs.id", (serial_key,)
+            ).fetchall()
+        if not rows:
+            return None
+        jobs = tuple(JobRow._make(row[6:]) for row in rows if row[6] is not None)
+        return SerialHistoryRow(*rows[0][:6], jobs)
+
+    @staticmethod
+    def get_by_customer(customer_id):
+        rows = Equipment.cache.get(customer_id)
+        if rows is MISSING:
+            generation = Equipment.cache.generation()  # Taken first: a save committing mid-read must win
+            with DB().connection() as db:
+                cursor = db.cursor()
+                cursor.row_factory = row_factory(EquipmentRow)
+                cursor.execute(
+                    "SELECT id, customer_id, type, serial_number FROM equipment WHERE customer_id = ?",
+                    (customer_id,)
+                )
+                rows = tuple(cursor.fetchall())
+                # Rows read inside an open transaction may still be rolled back.
+                if not db.in_transaction:
+                    Equipment.cache.set(customer_id, rows, generation)
+        return list(rows)
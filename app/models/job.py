@@ -1,69 +1,202 @@
 from app.db.db import DB
+from app.models.job_status import JobStatus
+from app.models.rows import JobEventRow, JobListingRow, JobRow, TechnicianJobRow, row_factory
+from app.services.notification_service import NotificationService
+from app.utils.utils import Utils
 
 class Job:
-    def __init__(self, description, status="Job Created", technician_id=None,equipment_id=None, id=None):
+    def __init__(self, description, status=JobStatus.CREATED, technician_id=None,equipment_id=None, id=None):
         self.description = description
-        self.status = status
+        self.status = JobStatus.parse(status)
         self.technician_id = technician_id
         self.equipment_id = equipment_id
         self.id = id
 
     def save(self):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute(
-            "INSERT INTO jobs (description, status, technician_id,equipment_id) VALUES (?, ?, ? ,?)",
-            (self.description, self.status, self.technician_id,self.equipment_id)
-        )
-        db.commit()
-        self.id = cursor.lastrowid
+        with DB().transaction() as db:
+            cursor = db.cursor()
+            cursor.execute(
+                "INSERT INTO jobs (description, status, technician_id,equipment_id, created_at) VALUES (?, ?, ? ,?, CURRENT_TIMESTAMP)",
+                (self.description, self.status, self.technician_id,self.equipment_id)
+            )
+            self.id = cursor.lastrowid
         return self.id
 
+    @staticmethod
+    def save_many(jobs):
+        jobs = list(jobs)
+        ids = DB().insert_many(
+            "INSERT INTO jobs (description, status, technician_id, equipment_id, created_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+            [(job.description, job.status, job.technician_id, job.equipment_id) for job in jobs]
+        )
+        for job, job_id in zip(jobs, ids):
+            job.id = job_id
+        return ids
+
+    # Column order matches JobListingRow.
+    LISTING_COLUMNS = (
+        "jobs.id, jobs.equipment_id, jobs.technician_id, jobs.description, jobs.status, "
+        "jobs.job_cost, customers.name, jobs.created_at"
+    )
+
+    @staticmethod
+    def _listing_query(after_id=None, status=None, technician_id=None, customer_id=None,
+                       created_since=None, created_before=None):
+        conditions = []
+        params = []
+        if after_id is not None:
+            conditions.append("jobs.id > ?")
+            params.append(after_id)
+        if status is not None:
+            conditions.append("jobs.status = ?")
+            params.append(JobStatus.parse(status))
+        if technician_id is not None:
+            conditions.append("jobs.technician_id = ?")
+            params.append(technician_id)
+        if customer_id is not None:
+            conditions.append("equipment.customer_id = ?")
+            params.append(customer_id)
+        if created_since is not None:
+            conditions.append("jobs.created_at >= ?")
+            params.append(created_since)
+        if created_before is not None:
+            conditions.append("jobs.created_at < ?")
+            params.append(created_before)
+        sql = (
+            f"SELECT {Job.LISTING_COLUMNS} FROM jobs "
+            "JOIN equipment ON jobs.equipment_id = equipment.id "
+            "JOIN customers ON customers.id = equipment.customer_id"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return sql + " ORDER BY jobs.id", params
+
     @staticmethod
     def get_all():
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("SELECT jobs.* , customers.name  FROM jobs  JOIN equipment ON jobs.equipment_id = equipment.id JOIN customers ON customers.id = equipment.customer_id")
-        return cursor.fetchall()
+        return list(Job.iter_all())
+
+    @staticmethod
+    def get_page(after_id=None, limit=50, **filters):
+        """Returns ``(rows, next_after_id)`` for the page of jobs following ``after_id``.
+
+        Pages are keyed on ``jobs.id`` so every page costs the same regardless of depth.
+        ``next_after_id`` is None on the last page. Filters: status, technician_id,
+        customer_id, created_since (inclusive) and created_before (exclusive).
+        """
+        sql, params = Job._listing_query(after_id=after_id, **filters)
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(JobListingRow)
+            cursor.execute(sql + " LIMIT ?", (*params, limit + 1))
+            rows = cursor.fetchall()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, rows[-1].id
+        return rows, None
+
+    @staticmethod
+    def iter_all(batch_size=500, **filters):
+        """Streams every matching job, holding at most ``batch_size`` rows in memory.
+
+        Runs on a read-only connection, so a long listing never ties up a writer's.
+        """
+        sql, params = Job._listing_query(**filters)
+        with DB().read_connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(JobListingRow)
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
 
     @staticmethod
     def get_by_technician(technician_id):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute('''
-            SELECT jobs.id, jobs.description, jobs.status, equipment.type, equipment.serial_number
-            FROM jobs
-            JOIN equipment ON jobs.equipment_id = equipment.id
-            WHERE technician_id = ?
-        ''', (technician_id,))
-        return cursor.fetchall()
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(TechnicianJobRow)
+            cursor.execute('''
+                SELECT jobs.id, jobs.description, jobs.status, equipment.type, equipment.serial_number
+                FROM jobs
+                JOIN equipment ON jobs.equipment_id = equipment.id
+                WHERE technician_id = ?
+            ''', (technician_id,))
+            return cursor.fetchall()
     
     @staticmethod
-    def update_status_for_technician(job_ids, technician_id, status="Job Assessed"):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        try:
-            for job_id in job_ids:
-                cursor.execute(
-                    "UPDATE jobs SET status = ? WHERE id = ? AND technician_id = ?",
-                    (status, job_id, technician_id)
-                )
-            db.commit()
-            return True
-        except Exception as e:
-            print(f"[!] Error updating jobs: {e}")
-            return False
+    def _transition(cursor, job_ids, status, technician_id=None, job_cost=None):
+        """Moves the jobs allowed to become ``status`` (see TRANSITIONS); returns the ids moved.
+
+        The caller owns the transaction. Jobs in any other state are left untouched.
+        """
+        sources = JobStatus.sources(status)
+        if not sources:
+            return []
+        moved = []
+        owner = " AND technician_id = ?" if technician_id is not None else ""
+        owner_params = (technician_id,) if technician_id is not None else ()
+        state = f"status IN ({', '.join('?' * len(sources))})"
+        # Two parameters are taken by status and job_cost, one by technician_id.
+        for chunk in Utils.chunked(job_ids, DB.max_bound_parameters - 3 - len(sources)):
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(
+                f"SELECT id FROM jobs WHERE id IN ({placeholders}) AND {state}{owner}",
+                (*chunk, *sources, *owner_params)
+            )
+            matched = [row[0] for row in cursor.fetchall()]
+            if not matched:
+                continue
+            placeholders = ", ".join("?" * len(matched))
+            cursor.execute(
+                f"UPDATE jobs SET status = ?, job_cost = COALESCE(?, job_cost) WHERE id IN ({placeholders})",
+                (status, job_cost, *matched)
+            )
+            # Customer notifications commit (or roll back) with the status change.
+            NotificationService.enqueue_job_status(cursor, matched)
+            moved.extend(matched)
+        return moved
+
+    @staticmethod
+    def update_status_for_technician(job_ids, technician_id, status=JobStatus.ASSESSED):
+        """Moves the given jobs owned by the technician to ``status`` in one transaction.
+
+        Returns ``(updated_ids, skipped_ids)``; ids that do not exist, belong to another
+        technician or cannot move to ``status`` from their current state are skipped.
+        An unknown ``status`` raises ValueError; a database error rolls the whole update
+        back and propagates.
+        """
+        job_ids = list(dict.fromkeys(job_ids))
+        status = JobStatus.parse(status)
+        with DB().transaction() as db:
+            updated = set(Job._transition(db.cursor(), job_ids, status, technician_id=technician_id))
+        return (
+            [job_id for job_id in job_ids if job_id in updated],
+            [job_id for job_id in job_ids if job_id not in updated],
+        )
         
     @staticmethod
     def get_assessed_jobs():
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM jobs WHERE status = 'Job Assessed'")
-        return cursor.fetchall()
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(JobRow)
+            cursor.execute(
+                "SELECT id, equipment_id, technician_id, description, status, job_cost, created_at "
+                "FROM jobs WHERE status = ?", (JobStatus.ASSESSED,)
+            )
+            return cursor.fetchall()
 
     @staticmethod
     def update_cost(job_id, cost):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("UPDATE jobs SET job_cost = ? , status = ?  WHERE id = ?", (cost,'Job Completed', job_id))
-        db.commit()        
+        """Records the final cost and completes an assessed job; False if it is not awaiting one."""
+        with DB().transaction() as db:
+            return bool(Job._transition(db.cursor(), [job_id], JobStatus.COMPLETED, job_cost=cost))
+
+    @staticmethod
+    def history(job_id):
+        """Returns the job's JobEventRows, oldest first."""
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(JobEventRow)
+            cursor.execute("SELECT job_id, status, at FROM job_events WHERE job_id = ? ORDER BY id", (job_id,))
+            return cursor.fetchall()
@@ -0,0 +1,54 @@
+from enum import IntEnum
+
+
+class JobStatus(IntEnum):
+    """Lifecycle states of a job, stored in ``jobs.status`` as small integers."""
+
+    CREATED = 1
+    ASSESSED = 2
+    COMPLETED = 3
+
+    @property
+    def label(self):
+        return LABELS[self]
+
+    @classmethod
+    def parse(cls, value):
+        """Accepts a JobStatus, its number, its name or its label, e.g. ``"Job Assessed"``."""
+        if isinstance(value, int):
+            return cls(value)
+        text = str(value).strip()
+        if text.isdigit():
+            return cls(int(text))
+        for status in cls:
+            if text.lower() in (status.name.lower(), status.label.lower()):
+                return status
+        raise ValueError(f"Unknown job status '{value}'.")
+
+    def can_become(self, status):
+        return status in TRANSITIONS[self]
+
+    @classmethod
+    def sources(cls, status):
+        """The states a job may move to ``status`` from."""
+        return [source for source in cls if source.can_become(status)]
+
+    @classmethod
+    def sql_label(cls, column):
+        """SQL expression that turns a stored status into its label, for reports and messages."""
+        cases = " ".join(f"WHEN {status.value} THEN '{status.label}'" for status in cls)
+        return f"CASE {column} {cases} END"
+
+
+LABELS = {
+    JobStatus.CREATED: "Job Created",
+    JobStatus.ASSESSED: "Job Assessed",
+    JobStatus.COMPLETED: "Job Completed",
+}
+
+# Allowed moves; anything else is rejected and the job is left as it was.
+TRANSITIONS = {
+    JobStatus.CREATED: frozenset({JobStatus.ASSESSED}),
+    JobStatus.ASSESSED: frozenset({JobStatus.COMPLETED}),
+    JobStatus.COMPLETED: frozenset(),
+}
@@ -0,0 +1,59 @@
+from app.db.db import DB
+from app.models.rows import PartRow, row_factory
+
+class Part:
+    """A catalog entry; stock is held per supplier in ``part_stock``."""
+
+    def __init__(self, sku, name, part_type, reorder_threshold=0, id=None):
+        self.id = id
+        self.sku = sku
+        self.name = name
+        self.part_type = part_type
+        self.reorder_threshold = reorder_threshold
+
+    def save(self):
+        with DB().transaction() as db:
+            cursor = db.cursor()
+            cursor.execute(
+                "INSERT INTO parts (sku, name, part_type, reorder_threshold) VALUES (?, ?, ?, ?)",
+                (self.sku, self.name, self.part_type, self.reorder_threshold)
+            )
+            self.id = cursor.lastrowid
+        return self.id
+
+    @staticmethod
+    def save_many(parts):
+        parts = list(parts)
+        ids = DB().insert_many(
+            "INSERT INTO parts (sku, name, part_type, reorder_threshold) VALUES (?, ?, ?, ?)",
+            [(part.sku, part.name, part.part_type, part.reorder_threshold) for part in parts]
+        )
+        for part, part_id in zip(parts, ids):
+            part.id = part_id
+        return ids
+
+    @staticmethod
+    def find_by_sku(sku):
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(PartRow)
+            cursor.execute("SELECT id, sku, name, part_type, reorder_threshold FROM parts WHERE sku = ?", (sku,))
+            return cursor.fetchone()
+
+    @staticmethod
+    def get_by_type(part_type):
+        """Catalog entries of one type, matched case-insensitively through idx_parts_part_type."""
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(PartRow)
+            cursor.execute(
+                "SELECT id, sku, name, part_type, reorder_threshold FROM parts WHERE part_type = ? ORDER BY sku",
+                (part_type,)
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def set_reorder_threshold(part_id, threshold):
+        with DB().transaction() as db:
+            cursor = db.execute("UPDATE parts SET reorder_threshold = ? WHERE id = ?", (threshold, part_id))
+            return cursor.rowcount > 0
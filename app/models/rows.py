@@ -0,0 +1,170 @@
+from typing import NamedTuple, Optional
+
+# Read-only row types returned by the model queries. NamedTuple classes carry
+# ``__slots__ = ()`` so each row is a plain tuple underneath (smaller than a dict
+# and still indexable), while callers read fields by name.
+
+
+class CustomerRow(NamedTuple):
+    id: int
+    name: str
+    email: str
+
+
+class EquipmentRow(NamedTuple):
+    id: int
+    customer_id: Optional[int]
+    type: str
+    serial_number: str
+
+
+class SerialHistoryRow(NamedTuple):
+    equipment_id: int
+    type: str
+    serial_number: str
+    customer_id: Optional[int]
+    customer_name: Optional[str]
+    customer_email: Optional[str]
+    jobs: tuple  # JobRows, oldest first
+
+
+class JobRow(NamedTuple):
+    id: int
+    equipment_id: int
+    technician_id: Optional[int]
+    description: str
+    status: int
+    job_cost: Optional[float]
+    created_at: Optional[str]
+
+
+class JobListingRow(NamedTuple):
+    id: int
+    equipment_id: int
+    technician_id: Optional[int]
+    description: str
+    status: int
+    job_cost: Optional[float]
+    customer_name: str
+    created_at: Optional[str]
+
+
+class TechnicianJobRow(NamedTuple):
+    id: int
+    description: str
+    status: int
+    equipment_type: str
+    serial_number: str
+
+
+class TechnicianRow(NamedTuple):
+    id: int
+    name: str
+    email: str
+    expertise: str
+
+
+class SupplierRow(NamedTuple):
+    id: int
+    name: str
+    part_type: str
+    location: str
+
+
+class OutboxRow(NamedTuple):
+    id: int
+    recipient: str
+    message: str
+    attempts: int
+    created_at: float
+
+
+class SearchResultRow(NamedTuple):
+    kind: str
+    ref_id: int
+    title: str
+    body: str
+    score: float
+
+
+class TechnicianLoadRow(NamedTuple):
+    technician_id: int
+    name: str
+    open_jobs: int
+    completed_jobs: int
+    revenue: float
+
+
+class JobEventRow(NamedTuple):
+    job_id: int
+    status: int
+    at: float
+
+
+class PartRow(NamedTuple):
+    id: int
+    sku: str
+    name: str
+    part_type: str
+    reorder_threshold: int
+
+
+class StockRow(NamedTuple):
+    part_id: int
+    sku: str
+    name: str
+    part_type: str
+    supplier_id: int
+    supplier_name: str
+    location: str
+    on_hand: int
+    reserved: int
+    available: int
+
+
+class ReservationRow(NamedTuple):
+    id: int
+    job_id: int
+    part_id: int
+    supplier_id: int
+    quantity: int
+    reserved_at: float
+    consumed_at: Optional[float]
+    released_at: Optional[float]
+
+
+class ReorderRow(NamedTuple):
+    part_id: int
+    sku: str
+    name: str
+    part_type: str
+    available: int
+    reorder_threshold: int
+
+
+class IntakeTicketRow(NamedTuple):
+    ticket: str
+    customer_id: Optional[int]
+    equipment_id: Optional[int]
+    job_id: Optional[int]
+    error: Optional[str]
+    committed_at: float
+
+
+class CostEstimateRow(NamedTuple):
+    basis: str  # Which past jobs the figures come from, e.g. "laptop jobs mentioning 'battery'"
+    samples: int
+    suggested: float  # Median
+    low: float  # 25th percentile
+    high: float  # 75th percentile
+    mean: float
+
+
+def row_factory(row_type):
+    """Returns a ``cursor.row_factory`` that builds ``row_type`` as each row is fetched."""
+    make = row_type._make
+
+    def build(cursor, row):
+        return make(row)
+
+    return build
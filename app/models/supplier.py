@@ -1,4 +1,9 @@
+import time
+
 from app.db.db import DB
+from app.db.migrations import SQL_NOW
+from app.models.rows import SupplierRow, row_factory
+from app.utils.utils import Utils
 
 class Supplier:
     def __init__(self, name, part_type, location, id=None):
@@ -8,26 +13,116 @@ class Supplier:
         self.location = location
 
     def save(self):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute(
+        with DB().transaction() as db:
+            cursor = db.cursor()
+            cursor.execute(
+                "INSERT INTO suppliers (name, part_type, location) VALUES (?, ?, ?)",
+                (self.name, self.part_type, self.location)
+            )
+            self.id = cursor.lastrowid
+        return self.id
+
+    @staticmethod
+    def save_many(suppliers):
+        suppliers = list(suppliers)
+        ids = DB().insert_many(
             "INSERT INTO suppliers (name, part_type, location) VALUES (?, ?, ?)",
-            (self.name, self.part_type, self.location)
+            [(supplier.name, supplier.part_type, supplier.location) for supplier in suppliers]
         )
-        db.commit()
-        self.id = cursor.lastrowid
-        return self.id
+        for supplier, supplier_id in zip(suppliers, ids):
+            supplier.id = supplier_id
+        return ids
 
     @staticmethod
     def get_all():
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM suppliers")
-        return cursor.fetchall()
+        with DB().read_connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(SupplierRow)
+            # Served from the partial index idx_suppliers_live, which skips tombstones.
+            cursor.execute("SELECT id, name, part_type, location FROM suppliers WHERE deleted_at IS NULL")
+            return cursor.fetchall()
     
     @staticmethod
-    def remove_suppliers_by_ids(id_list):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.executemany("DELETE FROM suppliers WHERE id = ?", [(i,) for i in id_list])
-        db.commit()
\ No newline at end of file
+    def find(part_type=None, location=None):
+        """Suppliers of a part type and/or at a location, both matched case-insensitively."""
+        conditions, params = ["deleted_at IS NULL"], []
+        if part_type:
+            conditions.append("part_type = ? COLLATE NOCASE")
+            params.append(part_type)
+        if location:
+            conditions.append("location = ? COLLATE NOCASE")
+            params.append(location)
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(SupplierRow)
+            cursor.execute(
+                f"SELECT id, name, part_type, location FROM suppliers WHERE {' AND '.join(conditions)} ORDER BY id",
+                params
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def remove_suppliers_by_ids(id_list, soft=True):
+        """Removes suppliers in one set-based pass; returns ``(removed, missing, in_use)``.
+
+        The ids go into a temp table and every check and write is a single statement
+        joined against it. ``missing`` ids do not exist or were already removed;
+        ``in_use`` suppliers still hold stock or reserved parts and are kept. A soft
+        removal leaves a tombstone (``deleted_at``) that listings skip until
+        purge_deleted() compacts it; ``soft=False`` deletes the rows, with their stock and
+        reservations, at once.
+        """
+        ids = sorted({int(supplier_id) for supplier_id in id_list})
+        if not ids:
+            return [], [], []
+        with DB().transaction() as db:
+            db.execute("CREATE TEMP TABLE IF NOT EXISTS supplier_removals (id INTEGER PRIMARY KEY)")
+            db.execute("DELETE FROM temp.supplier_removals")
+            db.executemany("INSERT INTO temp.supplier_removals (id) VALUES (?)", [(i,) for i in ids])
+            live = ("EXISTS (SELECT 1 FROM suppliers WHERE suppliers.id = supplier_removals.id "
+                    "AND suppliers.deleted_at IS NULL)")
+            stocked = ("EXISTS (SELECT 1 FROM part_stock WHERE part_stock.supplier_id = supplier_removals.id "
+                       "AND (part_stock.on_hand > 0 OR part_stock.reserved > 0))")
+            missing = [row[0] for row in db.execute(f"SELECT id FROM temp.supplier_removals WHERE NOT {live} ORDER BY id")]
+            in_use = [row[0] for row in db.execute(
+                f"SELECT id FROM temp.supplier_removals WHERE {live} AND {stocked} ORDER BY id"
+            )]
+            db.execute(f"DELETE FROM temp.supplier_removals WHERE NOT {live} OR {stocked}")
+            removed = [row[0] for row in db.execute("SELECT id FROM temp.supplier_removals ORDER BY id")]
+            if soft:
+                db.execute(f"UPDATE suppliers SET deleted_at = {SQL_NOW} "
+                           "WHERE id IN (SELECT id FROM temp.supplier_removals)")
+            else:
+                db.execute("DELETE FROM part_stock WHERE supplier_id IN (SELECT id FROM temp.supplier_removals)")
+                db.execute("DELETE FROM part_reservations WHERE supplier_id IN (SELECT id FROM temp.supplier_removals)")
+                db.execute("DELETE FROM suppliers WHERE id IN (SELECT id FROM temp.supplier_removals)")
+            db.execute("DELETE FROM temp.supplier_removals")
+        return removed, missing, in_use
+
+    @staticmethod
+    def purge_deleted(batch_size=500, older_than=0.0, pause=0.0):
+        """Deletes tombstoned suppliers with their empty stock rows and closed reservations
+        (a supplier with open ones cannot be removed); returns how many were purged.
+
+        Each batch of ``batch_size`` commits on its own, so other writers never wait more
+        than one batch for the write lock (``pause`` seconds between batches gives them a
+        turn). Tombstones younger than ``older_than`` seconds are kept.
+        """
+        cutoff = time.time() - older_than
+        purged = 0
+        while True:
+            with DB().transaction() as db:
+                ids = [row[0] for row in db.execute(
+                    "SELECT id FROM suppliers WHERE deleted_at IS NOT NULL AND deleted_at <= ? "
+                    "ORDER BY deleted_at LIMIT ?", (cutoff, batch_size)
+                )]
+                for chunk in Utils.chunked(ids, DB.max_bound_parameters):
+                    placeholders = ", ".join("?" * len(chunk))
+                    db.execute(f"DELETE FROM part_stock WHERE supplier_id IN ({placeholders})", chunk)
+                    db.execute(f"DELETE FROM part_reservations WHERE supplier_id IN ({placeholders})", chunk)
+                    db.execute(f"DELETE FROM suppliers WHERE id IN ({placeholders})", chunk)
+            purged += len(ids)
+            if len(ids) < batch_size:
+                return purged
+            if pause:
+                time.sleep(pause)
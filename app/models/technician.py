@@ -1,6 +1,10 @@
 from app.db.db import DB
+from app.models.rows import TechnicianRow, row_factory
+from app.utils.cache import LRUCache, MISSING
 
 class Technician:
+    cache = LRUCache("technicians.by_email", maxsize=1024, ttl=300)
+
     def __init__(self, name=None, email=None, expertise=None, id=None):
         self.id = id
         self.name = name
@@ -12,31 +16,63 @@ class Technician:
             return self.id
 
     def save(self):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("INSERT INTO technicians (name, email, expertise) VALUES (?, ?, ?)",
-                       (self.name, self.email, self.expertise))
-        db.commit()
-        self.id = cursor.lastrowid
+        with DB().transaction() as db:
+            cursor = db.cursor()
+            cursor.execute("INSERT INTO technicians (name, email, expertise) VALUES (?, ?, ?)",
+                           (self.name, self.email, self.expertise))
+            self.id = cursor.lastrowid
+            DB().after_commit(lambda: Technician.cache.invalidate(self.email))
         return self.id
-    
+
+    @staticmethod
+    def save_many(technicians):
+        technicians = list(technicians)
+        ids = DB().insert_many(
+            "INSERT INTO technicians (name, email, expertise) VALUES (?, ?, ?)",
+            [(technician.name, technician.email, technician.expertise) for technician in technicians]
+        )
+        for technician, technician_id in zip(technicians, ids):
+            technician.id = technician_id
+        emails = [technician.email for technician in technicians]
+        DB().after_commit(lambda: Technician.cache.invalidate(*emails))
+        return ids
+
     @staticmethod
     def get_all():
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("SELECT * FROM technicians")
-        return cursor.fetchall()
+        with DB().read_connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(TechnicianRow)
+            cursor.execute("SELECT id, name, email, expertise FROM technicians")
+            return cursor.fetchall()
     
     
 
+    @staticmethod
+    def get_by_id(technician_id):
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(TechnicianRow)
+            cursor.execute("SELECT id, name, email, expertise FROM technicians WHERE id = ?", (technician_id,))
+            row = cursor.fetchone()
+        if row:
+            return Technician(name=row.name, email=row.email, expertise=row.expertise, id=row.id)
+        return None
+
     @staticmethod
     def find_by_email(email):
-        db = DB().get_connection()
-        cursor = db.cursor()
-        cursor.execute("SELECT id, name, email, expertise FROM technicians WHERE email = ?", (email,))
-        row = cursor.fetchone()
+        row = Technician.cache.get(email)
+        if row is MISSING:
+            generation = Technician.cache.generation()  # Taken first: a save committing mid-read must win
+            with DB().connection() as db:
+                cursor = db.cursor()
+                cursor.row_factory = row_factory(TechnicianRow)
+                cursor.execute("SELECT id, name, email, expertise FROM technicians WHERE email = ?", (email,))
+                row = cursor.fetchone()
+                # Rows read inside an open transaction may still be rolled back.
+                if not db.in_transaction:
+                    Technician.cache.set(email, row, generation)
         if row:
-            return Technician(name=row[1], email=row[2], expertise=row[3], id=row[0])
+            return Technician(name=row.name, email=row.email, expertise=row.expertise, id=row.id)
         return None
     
     
@@ -0,0 +1,246 @@
+import argparse
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from app.db.db import DB
+from app.models.job_status import JobStatus
+from app.models.rows import CostEstimateRow
+from app.services.scheduler import keywords
+from app.utils.sketch import QuantileSketch
+from app.utils.utils import Utils
+
+# Most specific first: a group is used once it has ``min_samples`` past jobs.
+TIERS = ("type_keyword", "type", "keyword", "all")
+
+
+class CostStats:
+    """Running count, mean and variance (Welford) plus a quantile sketch of one group's costs."""
+
+    def __init__(self, relative_accuracy=0.01):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.sketch = QuantileSketch(relative_accuracy)
+        self._quartiles = None
+
+    def add(self, cost, count=1):
+        """Adds ``cost``, ``count`` times (the rebuild adds identical past costs at once)."""
+        self.count += count
+        delta = cost - self.mean
+        self.mean += delta * count / self.count
+        self._m2 += delta * (cost - self.mean) * count
+        self.sketch.add(cost, count)
+        self._quartiles = None
+
+    @property
+    def stdev(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def quartiles(self):
+        """``(p25, median, p75)``, recomputed only after the group has changed."""
+        if self._quartiles is None:
+            self._quartiles = tuple(self.sketch.quantiles([0.25, 0.5, 0.75]))
+        return self._quartiles
+
+
+class CostEstimator:
+    """Suggests a final cost from the costs of completed jobs like this one.
+
+    Costs are grouped by equipment type, by issue keyword (see scheduler.keywords), by
+    both together and overall. A suggestion is the median of the most specific group
+    with at least ``min_samples`` jobs, with its quartiles as the usual range; it costs
+    a few dictionary lookups however long the history is.
+
+    The groups are built once from every completed job with a positive cost, then kept
+    current from the job_events log: each sync reads only the completions logged since
+    the last one (at most ``sync_interval`` seconds ago). Syncs and rebuilds run one at a
+    time, so threads that find the groups stale together add each completion once.
+    """
+
+    def __init__(self, min_samples=5, relative_accuracy=0.01, sync_interval=30.0, clock=time.monotonic):
+        self.min_samples = min_samples
+        self.relative_accuracy = relative_accuracy
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._sync_lock = threading.RLock()  # Held across the read and the update it feeds
+        self._groups = None  # (tier, *values) -> CostStats
+        self._last_event_id = 0
+        self._synced_at = None
+        self._database = None
+        self.rebuilds = 0
+        self.observed = 0
+
+    @staticmethod
+    def _keys(equipment_type, words):
+        equipment = (equipment_type or "").strip().lower()
+        keys = [("all",)]
+        if equipment:
+            keys.append(("type", equipment))
+        for word in sorted(words):
+            keys.append(("keyword", word))
+            if equipment:
+                keys.append(("type_keyword", equipment, word))
+        return keys
+
+    def _observe(self, groups, equipment_type, words, cost, count=1):
+        for key in self._keys(equipment_type, words):
+            stats = groups.get(key)
+            if stats is None:
+                stats = groups[key] = CostStats(self.relative_accuracy)
+            stats.add(cost, count)
+
+    @staticmethod
+    @contextmanager
+    def _snapshot(db):
+        # Reads in one transaction see one state, so no completion is counted twice or missed.
+        if db.in_transaction:
+            yield db
+            return
+        db.execute("BEGIN")
+        try:
+            yield db
+        finally:
+            db.rollback()
+
+    def rebuild(self):
+        """Recomputes every group from the full history in one grouped scan.
+
+        SQLite collapses the history to distinct (type, issue, cost) rows with a count,
+        so repeated jobs are tokenized and added once, weighted by how often they occur.
+        """
+        with self._sync_lock:
+            return self._rebuild()
+
+    def _rebuild(self):
+        groups = {}
+        words = {}
+        with DB().read_connection() as db, self._snapshot(db):
+            last_event_id = db.execute("SELECT COALESCE(MAX(id), 0) FROM job_events").fetchone()[0]
+            rows = db.execute(
+                "SELECT equipment.type, jobs.description, jobs.job_cost, COUNT(*) FROM jobs "
+                "JOIN equipment ON equipment.id = jobs.equipment_id "
+                "WHERE jobs.status = ? AND jobs.job_cost > 0 "
+                "GROUP BY equipment.type, jobs.description, jobs.job_cost", (JobStatus.COMPLETED,)
+            )
+            for equipment_type, description, cost, count in rows:
+                if description not in words:
+                    words[description] = keywords(description)
+                self._observe(groups, equipment_type, words[description], cost, count)
+        with self._lock:
+            self._groups = groups
+            self._last_event_id = last_event_id
+            self._database = DB.path
+            self._synced_at = self.clock()
+            self.rebuilds += 1
+        return len(groups)
+
+    def sync(self):
+        """Adds the jobs completed since the last sync; rebuilds on first use."""
+        with self._sync_lock:
+            self._sync()
+
+    def _sync(self):
+        if self._groups is None or self._database != DB.path:
+            self._rebuild()  # First use, or DB.configure() pointed the models at another database
+            return
+        with DB().connection() as db, self._snapshot(db):
+            last_event_id = db.execute("SELECT COALESCE(MAX(id), 0) FROM job_events").fetchone()[0]
+            completed = db.execute(
+                "SELECT equipment.type, jobs.description, jobs.job_cost FROM job_events "
+                "JOIN jobs ON jobs.id = job_events.job_id JOIN equipment ON equipment.id = jobs.equipment_id "
+                "WHERE job_events.id > ? AND job_events.id <= ? AND job_events.status = ? AND jobs.job_cost > 0",
+                (self._last_event_id, last_event_id, JobStatus.COMPLETED)
+            ).fetchall()
+        with self._lock:
+            for equipment_type, description, cost in completed:
+                self._observe(self._groups, equipment_type, keywords(description), cost)
+            self.observed += len(completed)
+            self._last_event_id = last_event_id
+            self._synced_at = self.clock()
+
+    def _stale(self):
+        return (self._synced_at is None or self._database != DB.path
+                or self.clock() - self._synced_at >= self.sync_interval)
+
+    def _sync_if_stale(self):
+        if self._stale():
+            with self._sync_lock:
+                if self._stale():  # Another thread may have synced while this one waited
+                    self._sync()
+
+    def estimate(self, equipment_type, description):
+        """A CostEstimateRow for a job on this equipment with this issue, or None without history."""
+        self._sync_if_stale()
+        with self._lock:
+            candidates = {}
+            for key in self._keys(equipment_type, keywords(description)):
+                stats = self._groups.get(key)
+                if stats is not None and stats.count >= self.min_samples:
+                    best = candidates.get(key[0])
+                    if best is None or stats.count > best[1].count:
+                        candidates[key[0]] = (key, stats)
+            for tier in TIERS:
+                if tier in candidates:
+                    key, stats = candidates[tier]
+                    low, median, high = stats.quartiles()
+                    return CostEstimateRow(self._basis(key), stats.count, round(median, 2), round(low, 2),
+                                           round(high, 2), round(stats.mean, 2))
+        return None
+
+    @staticmethod
+    def _basis(key):
+        tier, values = key[0], key[1:]
+        if tier == "type_keyword":
+            return f"{values[0]} jobs mentioning '{values[1]}'"
+        if tier == "type":
+            return f"{values[0]} jobs"
+        if tier == "keyword":
+            return f"jobs mentioning '{values[0]}'"
+        return "all completed jobs"
+
+    def estimate_jobs(self, job_ids):
+        """``{job_id: CostEstimateRow or None}`` for existing jobs, read in one query per chunk."""
+        estimates = {}
+        with DB().connection() as db:
+            for chunk in Utils.chunked(list(job_ids), DB.max_bound_parameters):
+                placeholders = ", ".join("?" * len(chunk))
+                rows = db.execute(
+                    "SELECT jobs.id, equipment.type, jobs.description FROM jobs "
+                    f"JOIN equipment ON equipment.id = jobs.equipment_id WHERE jobs.id IN ({placeholders})", chunk
+                ).fetchall()
+                for job_id, equipment_type, description in rows:
+                    estimates[job_id] = self.estimate(equipment_type, description)
+        return estimates
+
+    def stats(self):
+        with self._lock:
+            groups = self._groups or {}
+            return {
+                "groups": len(groups),
+                "jobs": groups[("all",)].count if ("all",) in groups else 0,
+                "rebuilds": self.rebuilds,
+                "observed_since_rebuild": self.observed,
+            }
+
+
+cost_estimator = CostEstimator()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the cost estimator or estimate one job.")
+    parser.add_argument("--equipment-type", default="")
+    parser.add_argument("--issue", default="")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    groups = cost_estimator.rebuild()
+    print(f"Rebuilt {groups} cost groups in {(time.perf_counter() - started) * 1000:.1f} ms.")
+    if args.equipment_type or args.issue:
+        print(cost_estimator.estimate(args.equipment_type, args.issue) or "No comparable completed jobs.")
+
+
+if __name__ == "__main__":
+    main()
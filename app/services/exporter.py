@@ -0,0 +1,239 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+
+from app.db.db import DB, read_only_uri
+from app.models.job_status import JobStatus
+
+EXPORT_FORMATS = ("csv", "jsonl", "columnar")
+COLUMNAR_FORMAT = "edd-columnar"
+
+
+def _date_conditions(column, created_since, created_before):
+    conditions, params = [], []
+    if created_since is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(created_since)
+    if created_before is not None:
+        conditions.append(f"{column} < ?")
+        params.append(created_before)
+    return conditions, params
+
+
+def _jobs_report(status=JobStatus.COMPLETED, created_since=None, created_before=None):
+    conditions, params = _date_conditions("jobs.created_at", created_since, created_before)
+    if status is not None:
+        conditions.insert(0, "jobs.status = ?")
+        params.insert(0, JobStatus.parse(status))
+    sql = (
+        f"SELECT jobs.id, jobs.description, {JobStatus.sql_label('jobs.status')}, jobs.job_cost, jobs.created_at, "
+        "technicians.id, technicians.name, customers.id, customers.name, equipment.type, equipment.serial_number "
+        "FROM jobs "
+        "JOIN equipment ON jobs.equipment_id = equipment.id "
+        "JOIN customers ON customers.id = equipment.customer_id "
+        "LEFT JOIN technicians ON technicians.id = jobs.technician_id"
+    )
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql + " ORDER BY jobs.id", params
+
+
+def _workload_report(status=None, created_since=None, created_before=None):
+    # Filters restrict which jobs are counted, not which technicians are listed.
+    conditions, params = _date_conditions("jobs.created_at", created_since, created_before)
+    if status is not None:
+        conditions.insert(0, "jobs.status = ?")
+        params.insert(0, JobStatus.parse(status))
+    join = " AND ".join(["jobs.technician_id = technicians.id"] + conditions)
+    sql = (
+        "SELECT technicians.id, technicians.name, technicians.email, technicians.expertise, "
+        "COUNT(jobs.id), "
+        f"COUNT(CASE WHEN jobs.status = {JobStatus.CREATED.value} THEN 1 END), "
+        f"COUNT(CASE WHEN jobs.status = {JobStatus.ASSESSED.value} THEN 1 END), "
+        f"COUNT(CASE WHEN jobs.status = {JobStatus.COMPLETED.value} THEN 1 END), "
+        "COALESCE(SUM(jobs.job_cost), 0) "
+        f"FROM technicians LEFT JOIN jobs ON {join} "
+        "GROUP BY technicians.id ORDER BY technicians.id"
+    )
+    return sql, params
+
+
+def _suppliers_report(status=None, created_since=None, created_before=None):
+    return "SELECT id, name, part_type, location FROM suppliers WHERE deleted_at IS NULL ORDER BY id", []
+
+
+REPORTS = {
+    # name: (column names, query builder, default status filter)
+    "completed_jobs": (
+        ("job_id", "description", "status", "job_cost", "created_at", "technician_id", "technician_name",
+         "customer_id", "customer_name", "equipment_type", "serial_number"),
+        _jobs_report, JobStatus.COMPLETED),
+    "technician_workload": (
+        ("technician_id", "name", "email", "expertise", "jobs", "created", "assessed", "completed", "total_cost"),
+        _workload_report, None),
+    "suppliers": (("supplier_id", "name", "part_type", "location"), _suppliers_report, None),
+}
+
+
+def read_only_connection(path):
+    """Opens ``path`` read-only; exports never take the write lock or block the application."""
+    connection = sqlite3.connect(read_only_uri(path), uri=True)
+    connection.execute("PRAGMA query_only = ON")
+    return connection
+
+
+class CsvExportWriter:
+    def __init__(self, handle, columns):
+        self.writer = csv.writer(handle)
+        self.writer.writerow(columns)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        pass
+
+
+class JsonlExportWriter:
+    def __init__(self, handle, columns):
+        self.handle = handle
+        self.columns = columns
+
+    def write_rows(self, rows):
+        columns = self.columns
+        self.handle.writelines(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+    def close(self):
+        pass
+
+
+class ColumnarExportWriter:
+    """Writes row groups column by column, in the spirit of Parquet.
+
+    Line one is a header naming the columns, each following line is one row group
+    ``{"rows": n, "columns": {name: [values...]}}`` and the last line is a footer with the
+    totals, so readers can load single columns or stream one group at a time.
+    """
+
+    def __init__(self, handle, columns):
+        self.handle = handle
+        self.columns = columns
+        self.row_groups = 0
+        self.rows = 0
+        handle.write(json.dumps({"format": COLUMNAR_FORMAT, "version": 1, "columns": list(columns)}) + "\n")
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+        values = dict(zip(self.columns, (list(column) for column in zip(*rows))))
+        self.handle.write(json.dumps({"rows": len(rows), "columns": values}) + "\n")
+        self.row_groups += 1
+        self.rows += len(rows)
+
+    def close(self):
+        self.handle.write(json.dumps({"row_groups": self.row_groups, "rows": self.rows}) + "\n")
+
+
+WRITERS = {"csv": CsvExportWriter, "jsonl": JsonlExportWriter, "columnar": ColumnarExportWriter}
+
+
+def read_columnar(path):
+    """Yields the rows of a columnar export as dicts, one row group in memory at a time."""
+    with open(path, encoding="utf-8") as handle:
+        header = json.loads(handle.readline())
+        if header.get("format") != COLUMNAR_FORMAT:
+            raise ValueError(f"{path} is not a columnar export.")
+        columns = header["columns"]
+        for line in handle:
+            group = json.loads(line)
+            if "columns" not in group:
+                break  # Footer
+            yield from (dict(zip(columns, row)) for row in zip(*(group["columns"][c] for c in columns)))
+
+
+def export(report, output, file_format=None, database=None, batch_size=1000, **filters):
+    """Streams one report to ``output`` straight from the cursor; returns a summary dict.
+
+    Filters: status (a report's default applies when omitted; pass None for every status),
+    created_since (inclusive) and created_before (exclusive) as ``YYYY-MM-DD`` strings.
+    """
+    if report not in REPORTS:
+        raise ValueError(f"Unknown report '{report}'. Choose from {', '.join(REPORTS)}.")
+    file_format = file_format or os.path.splitext(output)[1].lstrip(".") or "csv"
+    if file_format not in WRITERS:
+        raise ValueError(f"Unknown export format '{file_format}'. Choose from {', '.join(EXPORT_FORMATS)}.")
+    columns, build_query, default_status = REPORTS[report]
+    filters.setdefault("status", default_status)
+    sql, params = build_query(**filters)
+
+    started = time.perf_counter()
+    rows = 0
+    connection = read_only_connection(database or DB.path)
+    try:
+        cursor = connection.execute(sql, params)
+        # newline="" lets the csv module control line endings; harmless for the JSON writers.
+        with open(output, "w", newline="", encoding="utf-8") as handle:
+            writer = WRITERS[file_format](handle, columns)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                writer.write_rows(batch)
+                rows += len(batch)
+            writer.close()
+    finally:
+        connection.close()
+    return {"report": report, "output": output, "format": file_format, "rows": rows,
+            "elapsed_seconds": time.perf_counter() - started}
+
+
+def _export_job(database, job):
+    job = dict(job)
+    return export(job.pop("report"), job.pop("output"), database=database, **job)
+
+
+def export_many(jobs, workers=None, database=None):
+    """Runs several exports in parallel worker processes, each on its own read-only connection.
+
+    ``jobs`` is a list of dicts of :func:`export` keyword arguments (report, output, and
+    optionally file_format, batch_size and filters). Results come back in the same order.
+    """
+    jobs = list(jobs)
+    if database is None:
+        DB()  # Bring the schema up to date here; the workers cannot migrate read-only
+        database = DB.path
+    if len(jobs) <= 1 or workers == 1:
+        return [_export_job(database, job) for job in jobs]
+    from concurrent.futures import ProcessPoolExecutor  # Pulls in multiprocessing; only needed here
+    with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+        return list(pool.map(_export_job, [database] * len(jobs), jobs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export EDD reports to CSV, JSONL or columnar files.")
+    parser.add_argument("reports", nargs="+", choices=sorted(REPORTS))
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--status", help="Only jobs with this status ('any' for every status).")
+    parser.add_argument("--since", help="Jobs created on or after YYYY-MM-DD.")
+    parser.add_argument("--before", help="Jobs created before YYYY-MM-DD.")
+    parser.add_argument("--workers", type=int, help="Parallel export processes (defaults to one per report).")
+    args = parser.parse_args(argv)
+
+    filters = {"created_since": args.since, "created_before": args.before}
+    if args.status:
+        filters["status"] = None if args.status.lower() == "any" else args.status
+    extension = "columnar.jsonl" if args.format == "columnar" else args.format
+    jobs = [dict(filters, report=report, file_format=args.format,
+                 output=os.path.join(args.output_dir, f"{report}.{extension}"))
+            for report in args.reports]
+    for result in export_many(jobs, workers=args.workers):
+        print(f"{result['report']}: {result['rows']} rows -> {result['output']} "
+              f"({result['elapsed_seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from itertools import islice
+
+from app.db.db import DB
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.supplier import Supplier
+from app.utils.utils import Utils
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+SERIAL_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9\-_/.]{2,63}$")
+
+ENTITY_FIELDS = {
+    "customers": ("name", "email"),
+    "equipment": ("customer_email", "type", "serial_number"),
+    "suppliers": ("name", "part_type", "location"),
+}
+
+
+class ImportReport:
+    def __init__(self, entity, source, resumed_from=0):
+        self.entity = entity
+        self.source = source
+        self.resumed_from = resumed_from
+        self.read = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.rejected_by_reason = {}
+        self.batches = 0
+        self.elapsed = 0.0
+
+    def reject(self, reason):
+        self.rejected += 1
+        self.rejected_by_reason[reason] = self.rejected_by_reason.get(reason, 0) + 1
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            "entity": self.entity,
+            "source": self.source,
+            "resumed_from": self.resumed_from,
+            "read": self.read,
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "rejected_by_reason": dict(self.rejected_by_reason),
+            "batches": self.batches,
+            "elapsed_seconds": self.elapsed,
+            "rows_per_second": self.rows_per_second,
+        }
+
+
+def read_records(path, file_format=None):
+    """Streams dict records from a CSV (with header row) or JSONL file, one at a time."""
+    file_format = file_format or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+    with open(path, newline="", encoding="utf-8") as handle:
+        if file_format == "csv":
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        yield {"_error": "invalid JSON"}
+
+
+def validate(entity, record):
+    """Returns ``(cleaned_record, None)`` or ``(None, reason)``."""
+    if not isinstance(record, dict):
+        return None, "malformed record"
+    if "_error" in record:
+        return None, record["_error"]
+    cleaned = {}
+    for field in ENTITY_FIELDS[entity]:
+        value = str(record.get(field) or "").strip()
+        if not value:
+            return None, f"missing {field}"
+        cleaned[field] = value
+    if "email" in cleaned:
+        cleaned["email"] = cleaned["email"].lower()
+        if not EMAIL_PATTERN.match(cleaned["email"]):
+            return None, "invalid email"
+    if "customer_email" in cleaned:
+        cleaned["customer_email"] = cleaned["customer_email"].lower()
+        if not EMAIL_PATTERN.match(cleaned["customer_email"]):
+            return None, "invalid customer email"
+    if "serial_number" in cleaned and not SERIAL_PATTERN.match(cleaned["serial_number"]):
+        return None, "invalid serial number"
+    return cleaned, None
+
+
+def _lookup_by_email(cursor, emails):
+    """Maps each of the lowercased ``emails`` that is already registered to its customer id.
+
+    Stored emails may be mixed-case, so they are matched through idx_customers_email_lower;
+    if two differ only in case, the older customer wins.
+    """
+    found = {}
+    for chunk in Utils.chunked(emails, DB.max_bound_parameters):
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(
+            f"SELECT lower(email), id FROM customers WHERE lower(email) IN ({placeholders}) ORDER BY id DESC", chunk
+        )
+        found.update(cursor.fetchall())
+    return found
+
+
+def _registered_serials(cursor, serial_keys):
+    """The subset of normalized ``serial_keys`` already in the equipment registry."""
+    found = set()
+    for chunk in Utils.chunked(serial_keys, DB.max_bound_parameters):
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(f"SELECT serial_key FROM equipment WHERE serial_key IN ({placeholders})", chunk)
+        found.update(row[0] for row in cursor.fetchall())
+    return found
+
+
+class Importer:
+    """Streams a CSV/JSONL file into customers, equipment or suppliers in batches.
+
+    Each batch is validated, de-duplicated and inserted in one transaction together with
+    its checkpoint row, so a crashed import resumes after the last committed batch and
+    never inserts a record twice. Only one batch is held in memory at a time.
+    """
+
+    def __init__(self, entity, batch_size=1000, rejects_path=None, progress=None):
+        if entity not in ENTITY_FIELDS:
+            raise ValueError(f"Unknown import entity '{entity}'. Choose from {', '.join(ENTITY_FIELDS)}.")
+        self.entity = entity
+        self.batch_size = batch_size
+        self.rejects_path = rejects_path
+        self.progress = progress  # Optional callback(report) after each batch
+
+    @staticmethod
+    def checkpoint_key(entity, path):
+        return f"{entity}:{os.path.abspath(path)}"
+
+    def _checkpoint(self, key):
+        with DB().connection() as db:
+            row = db.execute("SELECT records_done FROM import_checkpoints WHERE source = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def run(self, path, file_format=None, resume=True):
+        key = self.checkpoint_key(self.entity, path)
+        done = self._checkpoint(key) if resume else 0
+        report = ImportReport(self.entity, path, resumed_from=done)
+        started = time.perf_counter()
+
+        records = islice(read_records(path, file_format), done, None)
+        rejects = open(self.rejects_path, "a", encoding="utf-8") if self.rejects_path else None
+        try:
+            position = done
+            for batch in Utils.chunked(records, self.batch_size):
+                position += len(batch)
+                self._import_batch(batch, key, position, report, rejects)
+                report.elapsed = time.perf_counter() - started
+                if self.progress is not None:
+                    self.progress(report)
+        finally:
+            if rejects is not None:
+                rejects.close()
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def _import_batch(self, batch, key, position, report, rejects_file):
+        report.read += len(batch)
+        rejects = []
+        valid = []
+        for offset, record in enumerate(batch):
+            cleaned, reason = validate(self.entity, record)
+            if reason:
+                self._reject(report, rejects, position - len(batch) + offset + 1, record, reason)
+            else:
+                valid.append((position - len(batch) + offset + 1, record, cleaned))
+
+        with DB().transaction() as db:
+            cursor = db.cursor()
+            rows = self._resolve(cursor, valid, report, rejects)
+            if rows:
+                self._save(rows)
+                report.inserted += len(rows)
+            cursor.execute(
+                "INSERT INTO import_checkpoints (source, records_done, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP) "
+                "ON CONFLICT(source) DO UPDATE SET records_done = excluded.records_done, updated_at = excluded.updated_at",
+                (key, position)
+            )
+        report.batches += 1
+        # Rejects are written only once the batch has committed, so a resumed import
+        # never logs the same rejected record twice.
+        if rejects_file is not None and rejects:
+            rejects_file.writelines(json.dumps(entry) + "\n" for entry in rejects)
+            rejects_file.flush()
+
+    def _resolve(self, cursor, valid, report, rejects):
+        """Drops duplicates and resolves references; returns the cleaned rows to insert."""
+        if self.entity == "customers":
+            existing = _lookup_by_email(cursor, list({c["email"] for _, _, c in valid}))
+            rows, seen = [], set()
+            for number, record, cleaned in valid:
+                if cleaned["email"] in existing or cleaned["email"] in seen:
+                    self._reject(report, rejects, number, record, "duplicate email")
+                    continue
+                seen.add(cleaned["email"])
+                rows.append(cleaned)
+            return rows
+        if self.entity == "equipment":
+            owners = _lookup_by_email(cursor, list({c["customer_email"] for _, _, c in valid}))
+            registered = _registered_serials(cursor, list({Utils.normalize_serial(c["serial_number"])
+                                                           for _, _, c in valid}))
+            rows = []
+            for number, record, cleaned in valid:
+                customer_id = owners.get(cleaned["customer_email"])
+                if customer_id is None:
+                    self._reject(report, rejects, number, record, "unknown customer")
+                    continue
+                serial_key = Utils.normalize_serial(cleaned["serial_number"])
+                if serial_key in registered:
+                    self._reject(report, rejects, number, record, "duplicate serial number")
+                    continue
+                registered.add(serial_key)
+                rows.append(dict(cleaned, customer_id=customer_id))
+            return rows
+        return [cleaned for _, _, cleaned in valid]
+
+    def _save(self, rows):
+        if self.entity == "customers":
+            Customer.save_many(Customer(row["name"], row["email"]) for row in rows)
+        elif self.entity == "equipment":
+            Equipment.save_many(Equipment(row["customer_id"], row["type"], row["serial_number"]) for row in rows)
+        else:
+            Supplier.save_many(Supplier(row["name"], row["part_type"], row["location"]) for row in rows)
+
+    @staticmethod
+    def _reject(report, rejects, number, record, reason):
+        report.reject(reason)
+        rejects.append({"record_number": number, "reason": reason, "record": record})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import customers, equipment or suppliers from CSV/JSONL.")
+    parser.add_argument("entity", choices=sorted(ENTITY_FIELDS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--rejects", help="Append rejected records with reasons to this JSONL file.")
+    parser.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint.")
+    args = parser.parse_args(argv)
+
+    def show_progress(report):
+        print(f"\r{report.read + report.resumed_from} records, {report.inserted} inserted, "
+              f"{report.rejected} rejected, {report.rows_per_second:,.0f} rows/sec", end="", flush=True)
+
+    importer = Importer(args.entity, batch_size=args.batch_size, rejects_path=args.rejects, progress=show_progress)
+    report = importer.run(args.path, args.format, resume=not args.restart)
+    print()
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+from app.db.db import DB
+from app.db.migrations import SQL_NOW
+from app.models.rows import IntakeTicketRow, row_factory
+from app.utils.exceptions import IntakeQueueFullException
+
+# Fields of one intake record; ``description`` is optional (no job is opened without it).
+INTAKE_FIELDS = ("name", "email", "equipment_type", "serial_number")
+
+_STOP = object()
+
+
+class IntakeQueue:
+    """Write-behind queue for walk-in intake: customer, device and (optionally) a job.
+
+    ``enqueue()`` appends the record to a journal file and returns a provisional ticket
+    at once; a writer thread commits queued records in groups of up to ``batch_size``,
+    waiting at most ``max_delay`` seconds after the first record of a group, so a rush
+    costs one commit per batch instead of three per customer. At most ``maxsize``
+    records may be waiting: producers then block (backpressure) and get
+    IntakeQueueFullException after ``timeout``.
+
+    Each ticket's outcome (the new ids, or the error that rejected the record) is
+    written to ``intake_tickets`` in the same transaction as the record, so records
+    journaled but not yet committed when the process stopped are replayed exactly once
+    by the next ``start()``. The journal is emptied whenever nothing is outstanding.
+
+    A batch that fails because the database is locked is retried up to ``max_retries``
+    times; after that, or on any other error, its tickets are recorded as failed. If even
+    that cannot be written the writer stops: the records stay journaled for the next
+    ``start()`` and ``enqueue()`` raises instead of waiting for room that never comes.
+    """
+
+    def __init__(self, journal_path=None, maxsize=1000, batch_size=100, max_delay=0.005,
+                 fsync=False, rate_window=10.0, max_retries=5):
+        self.journal_path = journal_path
+        self._journal_file = journal_path
+        self._database = None
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.fsync = fsync  # Also survive power loss, at the price of a disk flush per record
+        self.rate_window = rate_window
+        self.max_retries = max_retries
+        self._condition = threading.Condition()
+        self._items = queue.Queue()
+        self._pending = set()
+        self._outstanding = 0
+        self._journal = None
+        self._thread = None
+        self._closed = False
+        self._started_at = None
+        self._stop_registered = False
+        self._commits = deque()  # (monotonic time, records) of recent commits
+        self.enqueued = 0
+        self.committed = 0
+        self.failed = 0
+        self.batches = 0
+        self.retries = 0
+        self.full_waits = 0
+        self.last_commit_ms = 0.0
+        self.error = None  # Why the writer stopped, if it had to
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Replays records the journal holds from an earlier run, then starts the writer."""
+        with self._condition:
+            if self.running:
+                return self
+            self._database = DB.path
+            self.journal_path = self._journal_file or DB.path + ".intake.jsonl"
+            self._closed = False
+            self.error = None
+            self._journal = open(self.journal_path, "a+", encoding="utf-8")
+            self._journal.seek(0)
+            replay = self._unfinished(self._journal.read().splitlines())
+            for ticket, record in replay:
+                self._pending.add(ticket)
+                self._items.put((ticket, record))
+            self._outstanding += len(replay)
+            if not self._outstanding:
+                self._journal.truncate(0)
+            self._started_at = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name="intake-writer", daemon=True)
+            self._thread.start()
+            if not self._stop_registered:
+                atexit.register(self.stop)  # Drain what is queued before the pools close
+                self._stop_registered = True
+        return self
+
+    def _unfinished(self, lines):
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # A line torn by a crash mid-write was never acknowledged
+            entries.append((entry["ticket"], entry["record"]))
+        if not entries:
+            return []
+        done = set()
+        tickets = [ticket for ticket, _ in entries]
+        with DB().connection() as db:
+            for start in range(0, len(tickets), 500):
+                chunk = tickets[start:start + 500]
+                done.update(row[0] for row in db.execute(
+                    f"SELECT ticket FROM intake_tickets WHERE ticket IN ({', '.join('?' * len(chunk))})", chunk
+                ))
+        return [(ticket, record) for ticket, record in entries if ticket not in done]
+
+    def enqueue(self, record, timeout=None):
+        """Queues one intake record; returns its provisional ticket.
+
+        ``record`` needs name, email, equipment_type and serial_number, plus an optional
+        description of the issue. Blocks while the queue is full, for at most
+        ``timeout`` seconds if given.
+        """
+        missing = [field for field in INTAKE_FIELDS if not str(record.get(field) or "").strip()]
+        if missing:
+            raise ValueError(f"Missing required intake field(s): {', '.join(missing)}.")
+        record = {field: record[field] for field in INTAKE_FIELDS + ("description",) if record.get(field)}
+        if self._database != DB.path:
+            self.stop()  # DB.configure() pointed the models at another database
+        elif self.error is not None:
+            raise RuntimeError(f"The intake writer stopped after an error: {self.error}")
+        if not self.running:
+            self.start()
+        ticket = uuid.uuid4().hex[:16]
+        with self._condition:
+            if self._outstanding >= self.maxsize:
+                self.full_waits += 1
+                if not self._condition.wait_for(lambda: self._outstanding < self.maxsize or self._closed, timeout):
+                    raise IntakeQueueFullException(
+                        f"Intake queue is full ({self.maxsize} records waiting); try again shortly.")
+            if self._closed:
+                raise RuntimeError("The intake queue has been stopped.")
+            self._journal.write(json.dumps({"ticket": ticket, "record": record}) + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._outstanding += 1
+            self._pending.add(ticket)
+            self.enqueued += 1
+            self._items.put((ticket, record))
+        return ticket
+
+    def pending(self, ticket):
+        """True while the ticket's record is queued and not yet committed."""
+        with self._condition:
+            return ticket in self._pending
+
+    def resolve(self, ticket):
+        """The ticket's IntakeTicketRow once committed (``error`` set if rejected), else None."""
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(IntakeTicketRow)
+            cursor.execute(
+                "SELECT ticket, customer_id, equipment_id, job_id, error, committed_at FROM intake_tickets "
+                "WHERE ticket = ?", (ticket,)
+            )
+            return cursor.fetchone()
+
+    def flush(self, timeout=None):
+        """Waits until every queued record is committed; False if ``timeout`` ran out first
+        or the writer stopped after an error."""
+        with self._condition:
+            done = self._condition.wait_for(lambda: self._outstanding == 0 or not self.running, timeout)
+            return done and self.error is None
+
+    def stop(self, timeout=None):
+        """Commits what is queued, then stops the writer. Records left over stay journaled."""
+        with self._condition:
+            thread = self._thread
+            if self._closed or thread is None:
+                return
+            self._closed = True
+            self._items.put(_STOP)
+            self._condition.notify_all()
+        thread.join(timeout)
+        with self._condition:
+            if self._thread is thread and not thread.is_alive():
+                self._journal.close()
+                self._thread = None
+
+    def _next_batch(self):
+        item = self._items.get()
+        if item is _STOP:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            try:
+                item = self._items.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._items.put(_STOP)  # Stop once this batch is committed
+                break
+            batch.append(item)
+        return batch
+
+    @staticmethod
+    def _transient(error):
+        message = str(error).lower()
+        return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            attempts = 0
+            while True:
+                try:
+                    self._commit(batch)
+                    break
+                except Exception as error:
+                    # The whole batch rolled back; only a locked database is worth waiting for.
+                    if self._transient(error) and attempts < self.max_retries:
+                        attempts += 1
+                        self.retries += 1
+                        time.sleep(min(1.0, 0.05 * attempts))
+                        continue
+                    print(f"[ERROR] Intake batch of {len(batch)} failed: {error}")
+                    if not self._reject(batch, error):
+                        return
+                    break
+
+    def _reject(self, batch, error):
+        """Records every ticket in ``batch`` as failed; stops the writer if even that fails."""
+        started = time.perf_counter()
+        try:
+            with DB().transaction() as db:
+                db.executemany(
+                    "INSERT OR IGNORE INTO intake_tickets (ticket, customer_id, equipment_id, job_id, error, "
+                    f"committed_at) VALUES (?, NULL, NULL, NULL, ?, {SQL_NOW})",
+                    [(ticket, str(error)) for ticket, _ in batch]
+                )
+        except Exception as fatal:
+            print(f"[ERROR] Intake writer stopped; queued records stay journaled: {fatal}")
+            with self._condition:
+                self.error = fatal
+                self._closed = True
+                self._items = queue.Queue()  # The next start() replays them from the journal
+                self._pending.clear()
+                self._outstanding = 0
+                self._journal.close()
+                self._thread = None
+                self._condition.notify_all()
+            return False
+        self._finished(batch, len(batch), started)
+        return True
+
+    def _commit(self, batch):
+        started = time.perf_counter()
+        failed = 0
+        with DB().transaction() as db:
+            for ticket, record in batch:
+                # One bad record (e.g. a serial owned by someone else) must not sink the batch.
+                db.execute("SAVEPOINT intake_record")
+                try:
+                    ids, error = self._apply(record), None
+                    db.execute("RELEASE intake_record")
+                except Exception as e:
+                    db.execute("ROLLBACK TO intake_record")
+                    db.execute("RELEASE intake_record")
+                    ids, error = (None, None, None), str(e)
+                    failed += 1
+                db.execute(
+                    "INSERT OR IGNORE INTO intake_tickets (ticket, customer_id, equipment_id, job_id, error, "
+                    f"committed_at) VALUES (?, ?, ?, ?, ?, {SQL_NOW})", (ticket, *ids, error)
+                )
+        self._finished(batch, failed, started)
+
+    def _finished(self, batch, failed, started):
+        now = time.monotonic()
+        with self._condition:
+            self.batches += 1
+            self.committed += len(batch) - failed
+            self.failed += failed
+            self.last_commit_ms = (time.perf_counter() - started) * 1000
+            self._commits.append((now, len(batch)))
+            while self._commits and now - self._commits[0][0] > self.rate_window:
+                self._commits.popleft()
+            self._pending.difference_update(ticket for ticket, _ in batch)
+            self._outstanding -= len(batch)
+            if self._outstanding == 0:
+                self._journal.truncate(0)
+            self._condition.notify_all()
+
+    @staticmethod
+    def _apply(record):
+        from app.models.customer import Customer
+        from app.models.job import Job
+        from app.services.serial_registry import serial_registry
+        customer = Customer.find_by_email(record["email"])
+        customer_id = customer.id if customer else Customer(record["name"], record["email"]).save()
+        equipment_id, _ = serial_registry.register(customer_id, record["equipment_type"], record["serial_number"])
+        job_id = None
+        if record.get("description"):
+            job_id = Job(record["description"], equipment_id=equipment_id).save()
+        return customer_id, equipment_id, job_id
+
+    def stats(self):
+        """Queue depth, totals and the commit rate achieved over the last ``rate_window`` seconds."""
+        with self._condition:
+            now = time.monotonic()
+            recent = [records for at, records in self._commits if now - at <= self.rate_window]
+            span = max(min(self.rate_window, now - (self._started_at or now)), 1e-3)
+            return {
+                "queued": self._outstanding,
+                "capacity": self.maxsize,
+                "enqueued": self.enqueued,
+                "committed": self.committed,
+                "failed": self.failed,
+                "batches": self.batches,
+                "avg_batch": round((self.committed + self.failed) / self.batches, 1) if self.batches else 0.0,
+                "commits_per_second": round(len(recent) / span, 1),
+                "records_per_second": round(sum(recent) / span, 1),
+                "last_commit_ms": round(self.last_commit_ms, 2),
+                "full_waits": self.full_waits,
+                "retries": self.retries,
+                "error": str(self.error) if self.error is not None else None,
+            }
+
+
+intake_queue = IntakeQueue()
@@ -0,0 +1,167 @@
+import argparse
+import statistics
+import time
+
+from app.db.db import DB
+from app.db.migrations import metrics_backfill_statements
+from app.models.job_status import JobStatus
+from app.models.rows import TechnicianLoadRow, row_factory
+
+
+class MetricsService:
+    """Dashboard figures read from the summary tables triggers keep on ``jobs``.
+
+    Every read is a primary-key lookup or a scan of a table with one row per status or
+    per technician, so the cost does not grow with the number of jobs.
+    """
+
+    COMPLETED = JobStatus.COMPLETED
+
+    @staticmethod
+    def status_counts():
+        """Returns ``{status label: job count}`` for every status with at least one job."""
+        with DB().connection() as db:
+            rows = db.execute("SELECT status, jobs FROM job_status_counts WHERE jobs > 0 ORDER BY status").fetchall()
+        return {JobStatus(status).label: jobs for status, jobs in rows}
+
+    @staticmethod
+    def revenue(status=COMPLETED):
+        """Sum of ``job_cost`` over jobs with ``status``; pass None for every status."""
+        with DB().connection() as db:
+            if status is None:
+                row = db.execute("SELECT TOTAL(revenue) FROM job_status_counts").fetchone()
+            else:
+                row = db.execute("SELECT revenue FROM job_status_counts WHERE status = ?",
+                                 (JobStatus.parse(status),)).fetchone()
+        return row[0] if row else 0.0
+
+    @staticmethod
+    def backlog():
+        """Number of jobs not yet completed."""
+        with DB().connection() as db:
+            row = db.execute(
+                "SELECT TOTAL(jobs) FROM job_status_counts WHERE status != ?", (MetricsService.COMPLETED,)
+            ).fetchone()
+        return int(row[0])
+
+    @staticmethod
+    def technician_load(technician_id=None):
+        """TechnicianLoadRows, busiest first; a single row (or None) for ``technician_id``."""
+        sql = (
+            "SELECT technicians.id, technicians.name, COALESCE(technician_load.open_jobs, 0), "
+            "COALESCE(technician_load.completed_jobs, 0), COALESCE(technician_load.revenue, 0) "
+            "FROM technicians LEFT JOIN technician_load ON technician_load.technician_id = technicians.id"
+        )
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(TechnicianLoadRow)
+            if technician_id is not None:
+                cursor.execute(sql + " WHERE technicians.id = ?", (technician_id,))
+                return cursor.fetchone()
+            cursor.execute(sql + " ORDER BY 3 DESC, technicians.id")
+            return cursor.fetchall()
+
+    @staticmethod
+    def summary():
+        counts = MetricsService.status_counts()
+        return {
+            "jobs_by_status": counts,
+            "total_jobs": sum(counts.values()),
+            "backlog": MetricsService.backlog(),
+            "revenue": MetricsService.revenue(),
+        }
+
+    @staticmethod
+    def rebuild():
+        """Recomputes every summary table from ``jobs`` with one grouped scan each."""
+        with DB().transaction() as db:
+            for statement in metrics_backfill_statements():
+                db.execute(statement)
+
+    @staticmethod
+    def verify():
+        """Compares the summary tables with a fresh aggregate; returns a list of mismatches."""
+        with DB().connection() as db:
+            stored = dict(db.execute("SELECT status, jobs FROM job_status_counts WHERE jobs != 0").fetchall())
+            actual = dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            stored_load = {row[0]: row[1:] for row in db.execute(
+                "SELECT technician_id, open_jobs, completed_jobs FROM technician_load "
+                "WHERE open_jobs != 0 OR completed_jobs != 0")}
+            actual_load = {row[0]: row[1:] for row in db.execute(
+                "SELECT technician_id, SUM(status != ?), SUM(status = ?) FROM jobs "
+                "WHERE technician_id IS NOT NULL GROUP BY technician_id",
+                (MetricsService.COMPLETED, MetricsService.COMPLETED))}
+        mismatches = [f"status '{status}': stored {stored.get(status, 0)}, actual {actual.get(status, 0)}"
+                      for status in sorted(set(stored) | set(actual)) if stored.get(status) != actual.get(status)]
+        mismatches += [f"technician {tech_id}: stored {stored_load.get(tech_id)}, actual {actual_load.get(tech_id)}"
+                       for tech_id in sorted(set(stored_load) | set(actual_load))
+                       if stored_load.get(tech_id) != actual_load.get(tech_id)]
+        return mismatches
+
+    @staticmethod
+    def _spans(start, end, since=None):
+        """Yields ``(job_id, started_at, ended_at or None)`` from the job event log."""
+        sql = (
+            "SELECT started.job_id, started.at, MIN(ended.at) FROM job_events AS started "
+            "LEFT JOIN job_events AS ended ON ended.job_id = started.job_id AND ended.status = ? "
+            "WHERE started.status = ?"
+        )
+        params = [JobStatus.parse(end), JobStatus.parse(start)]
+        if since is not None:
+            sql += " AND started.at >= ?"
+            params.append(since)
+        with DB().read_connection() as db:
+            yield from db.execute(sql + " GROUP BY started.id", params)
+
+    @staticmethod
+    def turnaround(start=JobStatus.CREATED, end=JobStatus.COMPLETED, since=None):
+        """Hours taken from ``start`` to ``end`` over jobs that reached both.
+
+        ``since`` (seconds since the epoch) limits it to jobs that entered ``start`` after it.
+        """
+        hours = sorted((ended - started) / 3600 for _, started, ended in MetricsService._spans(start, end, since)
+                       if ended is not None)
+        if not hours:
+            return {"jobs": 0}
+        return {
+            "jobs": len(hours),
+            "mean_hours": statistics.fmean(hours),
+            "median_hours": statistics.median(hours),
+            "p95_hours": hours[int(0.95 * (len(hours) - 1))],
+            "max_hours": hours[-1],
+        }
+
+    @staticmethod
+    def sla_breaches(max_hours, start=JobStatus.CREATED, end=JobStatus.COMPLETED, now=None):
+        """Jobs that took, or have been open for, more than ``max_hours`` from ``start`` to ``end``.
+
+        Returns ``[(job_id, hours, reached_end), ...]``, longest first.
+        """
+        now = time.time() if now is None else now
+        breaches = []
+        for job_id, started, ended in MetricsService._spans(start, end):
+            hours = ((ended if ended is not None else now) - started) / 3600
+            if hours > max_hours:
+                breaches.append((job_id, hours, ended is not None))
+        breaches.sort(key=lambda breach: breach[1], reverse=True)
+        return breaches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show, verify or rebuild the dashboard metrics.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the summary tables from jobs.")
+    parser.add_argument("--verify", action="store_true", help="Report drift between summaries and jobs.")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        MetricsService.rebuild()
+        print("Metrics rebuilt.")
+    if args.verify:
+        mismatches = MetricsService.verify()
+        print("\n".join(mismatches) if mismatches else "Metrics match the jobs table.")
+    for key, value in MetricsService.summary().items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import math
+import random
+import time
+from collections import deque
+
+from app.db.db import DB
+from app.models.rows import OutboxRow, row_factory
+from app.services.notification_transports import ConsoleTransport, FileTransport, SMTPTransport
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class NotificationDispatcher:
+    """Delivers queued notifications from ``notification_outbox`` in concurrent batches.
+
+    Claimed rows are leased for ``lease`` seconds, so a dispatcher that dies mid-batch
+    leaves them to be picked up again. The lease must outlast the slowest possible
+    batch (``ceil(batch_size / concurrency)`` rounds of ``send_timeout``), or another
+    dispatcher could reclaim rows still being sent and deliver them twice; by default it
+    is derived from those settings. Failed sends are retried with exponential backoff
+    until ``max_attempts``, after which the row is marked ``failed``.
+    """
+
+    lease_margin = 30.0  # Time to claim a batch and record its results
+
+    def __init__(self, transport, batch_size=100, concurrency=10, max_attempts=5, base_delay=2.0,
+                 max_delay=600.0, lease=None, send_timeout=30.0, clock=time.time):
+        longest_batch = math.ceil(batch_size / concurrency) * send_timeout
+        if lease is None:
+            lease = longest_batch + self.lease_margin
+        elif lease <= longest_batch:
+            raise ValueError(f"A lease of {lease}s is shorter than the slowest batch ({longest_batch}s); "
+                             "raise it or lower batch_size or send_timeout.")
+        self.transport = transport
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self.send_timeout = send_timeout
+        self.clock = clock
+
+        self.batches = 0
+        self.claimed = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.deduplicated = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self._send_latencies = deque(maxlen=1000)
+        self._delivery_latencies = deque(maxlen=1000)
+
+    def backoff(self, attempts):
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay * (0.5 + random.random() / 2)  # Jitter keeps retries from arriving in lockstep
+
+    def _claim_batch(self):
+        now = self.clock()
+        with DB().transaction() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(OutboxRow)
+            cursor.execute(
+                "SELECT id, recipient, message, attempts, created_at FROM notification_outbox "
+                "WHERE status IN ('pending', 'sending') AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at, id LIMIT ?",
+                (now, self.batch_size)
+            )
+            rows = cursor.fetchall()
+            if rows:
+                placeholders = ", ".join("?" * len(rows))
+                cursor.execute(
+                    f"UPDATE notification_outbox SET status = 'sending', next_attempt_at = ? "
+                    f"WHERE id IN ({placeholders})",
+                    (now + self.lease, *(row.id for row in rows))
+                )
+        return rows
+
+    def _record_results(self, sent_rows, failed_rows):
+        now = self.clock()
+        with DB().transaction() as db:
+            cursor = db.cursor()
+            cursor.executemany(
+                "UPDATE notification_outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1, "
+                "last_error = NULL WHERE id = ?",
+                [(now, row.id) for row in sent_rows]
+            )
+            for row, error in failed_rows:
+                attempts = row.attempts + 1
+                if attempts >= self.max_attempts:
+                    status, next_attempt_at = "failed", now
+                    self.failed += 1
+                else:
+                    status, next_attempt_at = "pending", now + self.backoff(attempts)
+                    self.retried += 1
+                cursor.execute(
+                    "UPDATE notification_outbox SET status = ?, attempts = ?, next_attempt_at = ?, "
+                    "last_error = ? WHERE id = ?",
+                    (status, attempts, next_attempt_at, str(error), row.id)
+                )
+
+    async def _deliver(self, semaphore, recipient, message):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self.transport.send(recipient, message), self.send_timeout)
+                return None
+            except Exception as e:
+                return e
+            finally:
+                self._send_latencies.append(time.perf_counter() - started)
+
+    async def dispatch_once(self):
+        """Claims and delivers one batch; returns how many outbox rows were claimed."""
+        started = time.perf_counter()
+        rows = await asyncio.to_thread(self._claim_batch)
+        if not rows:
+            return 0
+
+        # Identical messages to the same recipient in one batch are sent once.
+        groups = {}
+        for row in rows:
+            groups.setdefault((row.recipient, row.message), []).append(row)
+        self.deduplicated += len(rows) - len(groups)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        keys = list(groups)
+        errors = await asyncio.gather(*(self._deliver(semaphore, *key) for key in keys))
+
+        sent_rows, failed_rows = [], []
+        now = self.clock()
+        for key, error in zip(keys, errors):
+            if error is None:
+                sent_rows.extend(groups[key])
+                self._delivery_latencies.extend(now - row.created_at for row in groups[key])
+            else:
+                failed_rows.extend((row, error) for row in groups[key])
+        await asyncio.to_thread(self._record_results, sent_rows, failed_rows)
+
+        self.batches += 1
+        self.claimed += len(rows)
+        self.sent += len(sent_rows)
+        self.busy_time += time.perf_counter() - started
+        return len(rows)
+
+    async def drain(self):
+        """Dispatches until nothing is due; returns the number of rows claimed."""
+        total = 0
+        while True:
+            claimed = await self.dispatch_once()
+            total += claimed
+            if claimed == 0:
+                return total
+
+    async def run(self, poll_interval=1.0, stop_event=None):
+        stop_event = stop_event or asyncio.Event()
+        failures = 0
+        try:
+            while not stop_event.is_set():
+                try:
+                    claimed = await self.dispatch_once()
+                    failures = 0
+                    delay = poll_interval if claimed < self.batch_size else 0
+                except Exception as e:
+                    # E.g. the database stayed locked past busy_timeout; claimed rows keep
+                    # their lease and are picked up again, so back off and carry on.
+                    self.errors += 1
+                    failures += 1
+                    delay = min(self.max_delay, poll_interval * 2 ** failures)
+                    print(f"[ERROR] Notification dispatch failed, retrying in {delay:.0f}s: {e}")
+                if delay:
+                    try:
+                        await asyncio.wait_for(stop_event.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self.transport.close()
+
+    def stats(self):
+        send = list(self._send_latencies)
+        delivery = list(self._delivery_latencies)
+        return {
+            "batches": self.batches,
+            "claimed": self.claimed,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "deduplicated": self.deduplicated,
+            "errors": self.errors,
+            "throughput_per_sec": self.sent / self.busy_time if self.busy_time else 0.0,
+            "send_latency_avg": sum(send) / len(send) if send else 0.0,
+            "send_latency_p95": _percentile(send, 0.95),
+            "delivery_latency_avg": sum(delivery) / len(delivery) if delivery else 0.0,
+            "delivery_latency_p95": _percentile(delivery, 0.95),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deliver queued customer notifications.")
+    parser.add_argument("--transport", choices=["console", "file", "smtp"], default="console")
+    parser.add_argument("--path", default="notifications.jsonl", help="Output file for the file transport.")
+    parser.add_argument("--smtp-host", default="localhost")
+    parser.add_argument("--smtp-port", type=int, default=25)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--once", action="store_true", help="Drain the outbox once and exit.")
+    args = parser.parse_args(argv)
+
+    if args.transport == "file":
+        transport = FileTransport(args.path)
+    elif args.transport == "smtp":
+        transport = SMTPTransport(args.smtp_host, args.smtp_port)
+    else:
+        transport = ConsoleTransport()
+    dispatcher = NotificationDispatcher(transport, batch_size=args.batch_size, concurrency=args.concurrency)
+
+    try:
+        asyncio.run(dispatcher.drain() if args.once else dispatcher.run())
+    except KeyboardInterrupt:
+        pass
+    print(dispatcher.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,46 @@
+import time
+
+from app.models.job_status import JobStatus
+
+
 class NotificationService:
     @staticmethod
     def notify(customer_email, message):
-        print(f"Sending notification to {customer_email}: {message}")
\ No newline at end of file
+        print(f"Sending notification to {customer_email}: {message}")
+
+    @staticmethod
+    def enqueue(cursor, recipient, message, dedupe_key=None):
+        """Writes a notification to the outbox using the caller's cursor (and transaction).
+
+        A second message with the same ``dedupe_key`` is ignored. Delivery is left to
+        NotificationDispatcher, so the caller never waits on the transport.
+        """
+        cursor.execute(
+            "INSERT OR IGNORE INTO notification_outbox (recipient, message, dedupe_key, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (recipient, message, dedupe_key, time.time())
+        )
+
+    @staticmethod
+    def enqueue_job_status(cursor, job_ids):
+        """Queues one status message per job for the owning customer, in a single statement.
+
+        Call after the status change so the message reflects the stored status and cost.
+        """
+        if not job_ids:
+            return
+        placeholders = ", ".join("?" * len(job_ids))
+        label = JobStatus.sql_label("jobs.status")
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO notification_outbox (recipient, message, dedupe_key, created_at)
+            SELECT customers.email,
+                   'Your repair request #' || jobs.id || ' (' || jobs.description || ') is now: ' || {label}
+                       || CASE WHEN jobs.status = {JobStatus.COMPLETED.value}
+                               THEN '. Final cost: ' || printf('%.2f', jobs.job_cost) ELSE '' END,
+                   'job-status:' || jobs.id || ':' || {label},
+                   ?
+            FROM jobs
+            JOIN equipment ON jobs.equipment_id = equipment.id
+            JOIN customers ON customers.id = equipment.customer_id
+            WHERE jobs.id IN ({placeholders})
+        ''', (time.time(), *job_ids))
@@ -0,0 +1,70 @@
+import abc
+import asyncio
+import json
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+
+
+class Transport(abc.ABC):
+    """Delivers one notification. Raise to have the dispatcher retry it later."""
+
+    @abc.abstractmethod
+    async def send(self, recipient, message):
+        """Sends ``message`` to ``recipient``."""
+
+    async def close(self):
+        pass
+
+
+class ConsoleTransport(Transport):
+    async def send(self, recipient, message):
+        print(f"Sending notification to {recipient}: {message}")
+
+
+class FileTransport(Transport):
+    """Appends each delivered notification to a JSONL file; a local stand-in for email."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _append(self, recipient, message):
+        line = json.dumps({"recipient": recipient, "message": message, "sent_at": time.time()})
+        with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    async def send(self, recipient, message):
+        await asyncio.to_thread(self._append, recipient, message)
+
+
+class SMTPTransport(Transport):
+    """Sends through an SMTP relay; blocking smtplib calls run on worker threads."""
+
+    def __init__(self, host, port=25, sender="noreply@edd-repairs.local", subject="Repair update",
+                 username=None, password=None, use_tls=False, timeout=30):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.subject = subject
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def _send(self, recipient, message):
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = recipient
+        email["Subject"] = self.subject
+        email.set_content(message)
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(email)
+
+    async def send(self, recipient, message):
+        await asyncio.to_thread(self._send, recipient, message)
@@ -0,0 +1,213 @@
+import heapq
+import re
+import threading
+import time
+
+from app.db.db import DB
+from app.models.job import Job
+from app.models.job_status import JobStatus
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Words that say nothing about which technician fits a job.
+GENERIC_WORDS = frozenset({
+    "and", "the", "for", "with", "not", "will", "won", "does", "after", "under", "when",
+    "repair", "replacement", "general", "service", "issue", "problem", "broken",
+})
+
+
+def keywords(text):
+    """Normalized words of ``text``: ``"Smartphone screens"`` -> ``{"smartphone", "screen"}``."""
+    words = set()
+    for word in _WORD.findall((text or "").lower()):
+        if len(word) < 3 or word in GENERIC_WORDS:
+            continue
+        if word.endswith("ing") and len(word) > 5:
+            word = word[:-3]  # networking -> network, soldering -> solder
+        elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+            word = word[:-1]
+        words.add(word)
+    return words
+
+
+class JobScheduler:
+    """Picks the least loaded technician whose expertise matches a job.
+
+    Technicians sit in one min-heap of ``(open jobs, id)`` per expertise keyword plus a
+    heap of everyone for jobs no expertise matches. A decision peeks at the heaps of the
+    job's keywords, so it costs O(k log n) rather than a scan of technicians or jobs.
+    Heap entries are replaced rather than updated: an entry whose load no longer matches
+    ``_load`` is stale and dropped when it reaches the top.
+
+    Open-job counts come from the trigger-maintained ``technician_load`` table and are
+    re-read at most every ``sync_interval`` seconds, so writes made elsewhere (status
+    updates, other processes) are picked up without scanning ``jobs``.
+    """
+
+    def __init__(self, sync_interval=30.0, clock=time.monotonic):
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._load = {}  # technician id -> open jobs
+        self._keywords = {}  # technician id -> expertise keywords
+        self._by_keyword = {}  # keyword -> heap of (open jobs, technician id)
+        self._everyone = []
+        self._last_technician_id = 0
+        self._synced_at = None
+        self._database = None
+        self.assigned = 0
+        self.matched = 0
+
+    def reset(self):
+        """Forgets every technician; the next decision reloads them."""
+        with self._lock:
+            self._load.clear()
+            self._keywords.clear()
+            self._by_keyword.clear()
+            self._everyone = []
+            self._last_technician_id = 0
+            self._synced_at = None
+
+    def _push(self, technician_id):
+        entry = (self._load[technician_id], technician_id)
+        heapq.heappush(self._everyone, entry)
+        for word in self._keywords[technician_id]:
+            heapq.heappush(self._by_keyword.setdefault(word, []), entry)
+
+    def _rebuild_heaps(self):
+        self._everyone = []
+        self._by_keyword = {}
+        for technician_id in self._load:
+            self._push(technician_id)
+
+    def _top(self, heap):
+        while heap:
+            load, technician_id = heap[0]
+            if self._load.get(technician_id) == load:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def sync(self):
+        """Adds technicians created since the last sync and refreshes every open-job count."""
+        if self._database != DB.path:
+            self.reset()  # DB.configure() pointed the models at another database
+            self._database = DB.path
+        with DB().connection() as db:
+            new_technicians = db.execute(
+                "SELECT id, expertise FROM technicians WHERE id > ? ORDER BY id", (self._last_technician_id,)
+            ).fetchall()
+            loads = dict(db.execute("SELECT technician_id, open_jobs FROM technician_load").fetchall())
+        with self._lock:
+            changed = []
+            for technician_id, expertise in new_technicians:
+                self._keywords[technician_id] = keywords(expertise)
+                self._load[technician_id] = None
+                self._last_technician_id = max(self._last_technician_id, technician_id)
+            for technician_id, load in self._load.items():
+                current = loads.get(technician_id, 0)
+                if load != current:
+                    self._load[technician_id] = current
+                    changed.append(technician_id)
+            if len(self._everyone) > 2 * len(self._load) + 64:
+                self._rebuild_heaps()  # Drop the stale entries that have piled up
+            else:
+                for technician_id in changed:
+                    self._push(technician_id)
+            self._synced_at = self.clock()
+
+    def _sync_if_stale(self):
+        if (self._synced_at is None or self._database != DB.path
+                or self.clock() - self._synced_at >= self.sync_interval):
+            self.sync()
+
+    def _pick(self, words):
+        best = None
+        for word in words:
+            heap = self._by_keyword.get(word)
+            top = self._top(heap) if heap else None
+            if top is not None and (best is None or top < best):
+                best = top
+        if best is not None:
+            return best[1], True
+        best = self._top(self._everyone)
+        return (best[1], False) if best is not None else (None, False)
+
+    def _record(self, technician_id, matched):
+        if technician_id in self._load:
+            self._load[technician_id] += 1
+            self._push(technician_id)
+        self.assigned += 1
+        self.matched += matched
+
+    def choose(self, description, equipment_type=None):
+        """Returns the technician id the next job like this would go to, or None."""
+        self._sync_if_stale()
+        with self._lock:
+            return self._pick(keywords(f"{description} {equipment_type or ''}"))[0]
+
+    def create_job(self, description, equipment_id, technician_id=None):
+        """Saves a new job, choosing its technician unless one is given; returns ``(job_id, technician_id)``."""
+        self._sync_if_stale()
+        try:
+            with DB().transaction() as db:
+                row = db.execute("SELECT type FROM equipment WHERE id = ?", (equipment_id,)).fetchone()
+                if row is None:
+                    raise ValueError(f"Equipment ID {equipment_id} does not exist.")
+                with self._lock:
+                    matched = False
+                    if technician_id is None:
+                        technician_id, matched = self._pick(keywords(f"{description} {row[0]}"))
+                        if technician_id is None:
+                            raise ValueError("No technicians are available to take the job.")
+                    job_id = Job(description, technician_id=technician_id, equipment_id=equipment_id).save()
+                    self._record(technician_id, matched)
+        except Exception:
+            self._synced_at = None  # The in-memory loads may be ahead of a rolled-back write
+            raise
+        return job_id, technician_id
+
+    def assign_backlog(self, limit=None):
+        """Assigns unassigned, newly created jobs in one transaction, oldest first.
+
+        Returns ``[(job_id, technician_id), ...]`` for the jobs assigned.
+        """
+        self.sync()
+        sql = (
+            "SELECT jobs.id, jobs.description, equipment.type FROM jobs "
+            "JOIN equipment ON equipment.id = jobs.equipment_id "
+            "WHERE jobs.technician_id IS NULL AND jobs.status = ? ORDER BY jobs.id"
+        )
+        assignments = []
+        try:
+            with DB().transaction() as db:
+                cursor = db.cursor()
+                cursor.execute(sql + " LIMIT ?", (JobStatus.CREATED, -1 if limit is None else limit))
+                backlog = cursor.fetchall()
+                with self._lock:
+                    for job_id, description, equipment_type in backlog:
+                        technician_id, matched = self._pick(keywords(f"{description} {equipment_type}"))
+                        if technician_id is None:
+                            break
+                        self._record(technician_id, matched)
+                        assignments.append((job_id, technician_id))
+                cursor.executemany(
+                    "UPDATE jobs SET technician_id = ? WHERE id = ? AND technician_id IS NULL",
+                    [(technician_id, job_id) for job_id, technician_id in assignments]
+                )
+        except Exception:
+            self._synced_at = None
+            raise
+        return assignments
+
+    def stats(self):
+        with self._lock:
+            return {
+                "technicians": len(self._load),
+                "keywords": len(self._by_keyword),
+                "heap_entries": len(self._everyone) + sum(len(heap) for heap in self._by_keyword.values()),
+                "assigned": self.assigned,
+                "matched_expertise": self.matched,
+            }
+
+
+scheduler = JobScheduler()
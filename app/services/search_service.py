@@ -0,0 +1,103 @@
+import re
+
+from app.db.db import DB
+from app.db.migrations import LIVE_ROWS, SEARCH_DOCUMENTS, search_backfill_statement
+from app.models.job import Job
+from app.models.rows import JobListingRow, SearchResultRow, row_factory
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchService:
+    """Ranked full-text lookup over customers, equipment, jobs and suppliers (FTS5).
+
+    The index is kept current by triggers on the source tables; see SEARCH_DOCUMENTS
+    in app/db/migrations.py.
+    """
+
+    KINDS = ("customer", "equipment", "job", "supplier")
+
+    @staticmethod
+    def build_query(text):
+        """Turns free text into an FTS5 query: every word must match, each as a prefix.
+
+        Punctuation in serial numbers or emails is treated as a word break rather than
+        FTS5 syntax, so user input can never produce a query syntax error.
+        """
+        tokens = _TOKEN.findall(text.lower())
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    @staticmethod
+    def search(text, kinds=None, limit=20):
+        """Returns SearchResultRows, best match first (bm25 with titles weighted double)."""
+        query = SearchService.build_query(text)
+        if not query:
+            return []
+        sql = (
+            "SELECT kind, ref_id, title, body, bm25(search_index, 0, 0, 2.0, 1.0) AS score "
+            "FROM search_index WHERE search_index MATCH ?"
+        )
+        params = [query]
+        if kinds:
+            sql += f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(SearchResultRow)
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    @staticmethod
+    def search_jobs(text, limit=20):
+        """Finds repairs whose issue text, device or customer matches, best match first."""
+        query = SearchService.build_query(text)
+        if not query:
+            return []
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(JobListingRow)
+            cursor.execute(f'''
+                WITH hits AS (
+                    SELECT kind, ref_id, bm25(search_index, 0, 0, 2.0, 1.0) AS score
+                    FROM search_index
+                    WHERE search_index MATCH ? AND kind IN ('job', 'equipment', 'customer')
+                    ORDER BY score LIMIT ?
+                ),
+                matched AS (
+                    SELECT ref_id AS job_id, score FROM hits WHERE kind = 'job'
+                    UNION ALL
+                    SELECT jobs.id, hits.score FROM hits
+                    JOIN jobs ON jobs.equipment_id = hits.ref_id WHERE hits.kind = 'equipment'
+                    UNION ALL
+                    SELECT jobs.id, hits.score FROM hits
+                    JOIN equipment ON equipment.customer_id = hits.ref_id
+                    JOIN jobs ON jobs.equipment_id = equipment.id WHERE hits.kind = 'customer'
+                ),
+                ranked AS (
+                    SELECT job_id, MIN(score) AS score FROM matched GROUP BY job_id
+                )
+                SELECT {Job.LISTING_COLUMNS}
+                FROM ranked
+                JOIN jobs ON jobs.id = ranked.job_id
+                JOIN equipment ON jobs.equipment_id = equipment.id
+                JOIN customers ON customers.id = equipment.customer_id
+                ORDER BY ranked.score, jobs.id
+                LIMIT ?
+            ''', (query, limit * 5, limit))
+            return cursor.fetchall()
+
+    @staticmethod
+    def optimize():
+        """Merges the index's b-tree segments; worth running after large imports."""
+        with DB().transaction() as db:
+            db.execute("INSERT INTO search_index (search_index) VALUES ('optimize')")
+
+    @staticmethod
+    def rebuild():
+        """Re-indexes every live document from the source tables."""
+        with DB().transaction() as db:
+            db.execute("DELETE FROM search_index")
+            for table in SEARCH_DOCUMENTS:
+                db.execute(search_backfill_statement(table, LIVE_ROWS.get(table)))
@@ -0,0 +1,124 @@
+import threading
+import time
+
+from app.db.db import DB
+from app.models.equipment import Equipment
+from app.utils.bloom import BloomFilter
+from app.utils.exceptions import DuplicateSerialException
+from app.utils.utils import Utils
+
+
+class SerialRegistry:
+    """Intake-side view of every registered serial number.
+
+    A Bloom filter of the normalized serial keys answers "never seen" without any SQL, so
+    only devices that may be repeats pay for the history lookup. The unique index on
+    ``equipment.serial_key`` stays the source of truth: a false positive costs one query
+    that finds nothing, and serials registered by another process since the last sync
+    (at most ``sync_interval`` seconds ago) are still caught when the device is saved.
+    """
+
+    def __init__(self, error_rate=0.001, sync_interval=30.0, clock=time.monotonic):
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._last_equipment_id = 0
+        self._synced_at = None
+        self._database = None
+        self.lookups = 0
+        self.skipped_queries = 0
+        self.false_positives = 0
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._last_equipment_id = 0
+            self._synced_at = None
+
+    def sync(self):
+        """Adds serials registered since the last sync, resizing the filter when it fills up."""
+        if self._database != DB.path:
+            self.reset()  # DB.configure() pointed the models at another database
+            self._database = DB.path
+        with DB().connection() as db:
+            new_rows = db.execute(
+                "SELECT id, serial_key FROM equipment WHERE id > ? AND serial_key IS NOT NULL ORDER BY id",
+                (self._last_equipment_id,)
+            ).fetchall()
+            with self._lock:
+                if self._bloom is None or self._bloom.count + len(new_rows) > self._bloom.capacity:
+                    total = db.execute("SELECT COUNT(*) FROM equipment WHERE serial_key IS NOT NULL").fetchone()[0]
+                    self._bloom = BloomFilter(max(1024, 2 * total), self.error_rate)
+                    new_rows = db.execute(
+                        "SELECT id, serial_key FROM equipment WHERE serial_key IS NOT NULL ORDER BY id"
+                    ).fetchall()
+                for equipment_id, serial_key in new_rows:
+                    self._bloom.add(serial_key)
+                    self._last_equipment_id = max(self._last_equipment_id, equipment_id)
+                self._synced_at = self.clock()
+
+    def _sync_if_stale(self):
+        if (self._synced_at is None or self._database != DB.path
+                or self.clock() - self._synced_at >= self.sync_interval):
+            self.sync()
+
+    def seen(self, serial_number):
+        """False means the serial is definitely new; True means it probably is registered."""
+        serial_key = Utils.normalize_serial(serial_number)
+        if serial_key is None:
+            return False
+        self._sync_if_stale()
+        with self._lock:
+            return serial_key in self._bloom
+
+    def lookup(self, serial_number):
+        """The device's SerialHistoryRow, or None; new serials never reach the database."""
+        self.lookups += 1
+        if not self.seen(serial_number):
+            self.skipped_queries += 1
+            return None
+        history = Equipment.find_by_serial(serial_number)
+        if history is None:
+            self.false_positives += 1
+        return history
+
+    def register(self, customer_id, equipment_type, serial_number):
+        """Registers a device at intake; returns ``(equipment_id, history)``.
+
+        ``history`` is the SerialHistoryRow of a device the customer already had registered
+        (None for a new one). Raises DuplicateSerialException if another customer owns it.
+        """
+        history = self.lookup(serial_number)
+        if history is not None:
+            if history.customer_id != customer_id:
+                own = Equipment.find_by_serial(serial_number, customer_id)
+                if own is None:
+                    raise DuplicateSerialException(serial_number, history.customer_id)
+                history = own
+            return history.equipment_id, history
+        equipment_id = Equipment(customer_id, equipment_type, serial_number).save()
+        serial_key = Utils.normalize_serial(serial_number)
+        if serial_key is not None:
+            DB().after_commit(lambda: self._remember(serial_key))
+        return equipment_id, None
+
+    def _remember(self, serial_key):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(serial_key)
+
+    def stats(self):
+        with self._lock:
+            bloom = self._bloom
+            return {
+                "serials": bloom.count if bloom else 0,
+                "filter_bytes": len(bloom.bits) if bloom else 0,
+                "lookups": self.lookups,
+                "skipped_queries": self.skipped_queries,
+                "false_positives": self.false_positives,
+            }
+
+
+serial_registry = SerialRegistry()
@@ -1,10 +1,266 @@
 # services/supplier_manager.py
+import argparse
+import sqlite3
+
+from app.db.db import DB
+from app.db.migrations import LIVE_ROWS, SQL_NOW
+from app.models.job_status import JobStatus
+from app.models.rows import ReorderRow, ReservationRow, StockRow, row_factory
+from app.models.supplier import Supplier
+from app.utils.exceptions import InsufficientStockException
+
+# Stock rows are created empty on first use, then moved by ``delta``. (An upsert cannot
+# do both: SQLite checks on_hand >= 0 on the row to insert before it sees the conflict.)
+# Selecting from parts and suppliers makes an unknown id (or a removed supplier) create
+# nothing, so its update changes no row (foreign keys are not enforced). A removed
+# supplier's empty stock rows stay until the purge, so moves check the supplier too.
+CREATE_STOCK = (
+    "INSERT OR IGNORE INTO part_stock (part_id, supplier_id) "
+    "SELECT parts.id, suppliers.id FROM parts, suppliers "
+    f"WHERE parts.id = ? AND suppliers.id = ? AND suppliers.{LIVE_ROWS['suppliers']}"
+)
+MOVE_STOCK = (
+    "UPDATE part_stock SET on_hand = on_hand + ? WHERE part_id = ? AND supplier_id = ? "
+    f"AND supplier_id IN (SELECT id FROM suppliers WHERE {LIVE_ROWS['suppliers']})"
+)
+
+STOCK_COLUMNS = (
+    "parts.id, parts.sku, parts.name, parts.part_type, suppliers.id, suppliers.name, suppliers.location, "
+    "part_stock.on_hand, part_stock.reserved, part_stock.on_hand - part_stock.reserved"
+)
+# Removed suppliers keep their stock rows until purged; only live suppliers are offered.
+STOCK_TABLES = (
+    "parts JOIN part_stock ON part_stock.part_id = parts.id "
+    f"JOIN suppliers ON suppliers.id = part_stock.supplier_id AND suppliers.{LIVE_ROWS['suppliers']}"
+)
+OPEN_RESERVATION = "consumed_at IS NULL AND released_at IS NULL"
+
+
 class SupplierManager:
-    def __init__(self):
-        self.suppliers = []
+    """The parts catalog: stock per supplier, reservations against jobs and reorder levels.
+
+    A reservation holds parts for a job without taking them off the shelf; completing
+    the job consumes them (a trigger on ``jobs.status`` does this in the same write) and
+    ``release()`` hands them back. ``available`` is always ``on_hand - reserved``.
+    """
+
+    @staticmethod
+    def add_supplier(name, part_type, location):
+        return Supplier(name, part_type, location).save()
+
+    @staticmethod
+    def list_suppliers():
+        return Supplier.get_all()
+
+    @staticmethod
+    def availability(part_type=None, location=None, sku=None):
+        """Stock of matching parts at each supplier, most available first.
+
+        Part type and location are matched case-insensitively through idx_parts_part_type
+        and idx_suppliers_location. Reads the live database, so reservations made a moment
+        ago are already counted.
+        """
+        conditions, params = [], []
+        if sku:
+            conditions.append("parts.sku = ?")
+            params.append(sku)
+        if part_type:
+            conditions.append("parts.part_type = ?")
+            params.append(part_type)
+        if location:
+            conditions.append("suppliers.location = ? COLLATE NOCASE")
+            params.append(location)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(StockRow)
+            cursor.execute(
+                f"SELECT {STOCK_COLUMNS} FROM {STOCK_TABLES}{where} "
+                "ORDER BY part_stock.on_hand - part_stock.reserved DESC, parts.sku, suppliers.id", params
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def adjust_stock(movements):
+        """Applies ``(part_id, supplier_id, delta)`` movements in one transaction.
+
+        Deliveries are positive, write-offs negative. Movements for the same part and
+        supplier are summed first and the totals go to SQLite as one executemany, so
+        thousands of movements cost one commit. Nothing is applied if any part would drop
+        below zero or below what is reserved (InsufficientStockException) or if a part or
+        supplier id is unknown (ValueError). Returns the number of stock rows changed.
+        """
+        totals = {}
+        for part_id, supplier_id, delta in movements:
+            key = (int(part_id), int(supplier_id))
+            totals[key] = totals.get(key, 0) + int(delta)
+        changes = [(delta, part_id, supplier_id) for (part_id, supplier_id), delta in totals.items() if delta]
+        if not changes:
+            return 0
+        with DB().transaction() as db:
+            # A savepoint lets a failed batch be undone even inside a caller's transaction.
+            db.execute("SAVEPOINT adjust_stock")
+            try:
+                db.executemany(CREATE_STOCK, [(part_id, supplier_id) for _, part_id, supplier_id in changes])
+                changed = db.executemany(MOVE_STOCK, changes).rowcount
+            except sqlite3.IntegrityError as error:
+                db.execute("ROLLBACK TO adjust_stock")
+                db.execute("RELEASE adjust_stock")
+                if "CHECK constraint failed" not in str(error):
+                    raise
+                raise InsufficientStockException(SupplierManager._shortages(db, changes))
+            if changed < len(changes):
+                db.execute("ROLLBACK TO adjust_stock")
+                db.execute("RELEASE adjust_stock")
+                raise ValueError(f"Unknown part or supplier in stock movements: {SupplierManager._unknown(db, changes)}.")
+            db.execute("RELEASE adjust_stock")
+        return changed
+
+    @staticmethod
+    def _shortages(db, changes):
+        shortages = []
+        for delta, part_id, supplier_id in changes:
+            if delta >= 0:
+                continue
+            row = db.execute("SELECT on_hand - reserved FROM part_stock WHERE part_id = ? AND supplier_id = ?",
+                             (part_id, supplier_id)).fetchone()
+            available = row[0] if row else 0
+            if available + delta < 0:
+                shortages.append((part_id, supplier_id, available, -delta))
+        return shortages
+
+    @staticmethod
+    def _unknown(db, changes):
+        part_ids = {part_id for _, part_id, _ in changes}
+        supplier_ids = {supplier_id for _, _, supplier_id in changes}
+        known_parts = SupplierManager._existing(db, "parts", part_ids)
+        known_suppliers = SupplierManager._existing(db, "suppliers", supplier_ids)
+        return sorted((part_id, supplier_id) for _, part_id, supplier_id in changes
+                      if part_id not in known_parts or supplier_id not in known_suppliers)
+
+    @staticmethod
+    def _existing(db, table, ids, chunk_size=500):
+        ids, found = sorted(ids), set()
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            placeholders = ", ".join("?" * len(chunk))
+            live = f" AND {LIVE_ROWS[table]}" if table in LIVE_ROWS else ""
+            found.update(row[0] for row in db.execute(
+                f"SELECT id FROM {table} WHERE id IN ({placeholders}){live}", chunk
+            ))
+        return found
+
+    @staticmethod
+    def reserve(job_id, part_id, quantity=1, supplier_id=None, location=None, technician_id=None):
+        """Holds ``quantity`` of a part for an open job; returns the reservation id.
+
+        Without ``supplier_id`` the live supplier with the most available stock (at
+        ``location``, if given) is used. With ``technician_id`` the job must be assigned
+        to that technician. Raises InsufficientStockException if the supplier cannot cover
+        the quantity and ValueError for an unknown, completed or someone else's job or a
+        removed supplier.
+        """
+        if quantity < 1:
+            raise ValueError("Reservation quantity must be at least 1.")
+        with DB().transaction() as db:
+            job = db.execute("SELECT status, technician_id FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None:
+                raise ValueError(f"Service request {job_id} does not exist.")
+            if technician_id is not None and job[1] != technician_id:
+                raise ValueError(f"Service request {job_id} is not assigned to technician {technician_id}.")
+            if job[0] == JobStatus.COMPLETED:
+                raise ValueError(f"Service request {job_id} is already completed.")
+            if supplier_id is not None:
+                if not SupplierManager._existing(db, "suppliers", [supplier_id]):
+                    raise ValueError(f"Supplier {supplier_id} does not exist.")
+            else:
+                sql = ("SELECT part_stock.supplier_id FROM part_stock JOIN suppliers ON suppliers.id = part_stock.supplier_id "
+                       f"WHERE part_stock.part_id = ? AND suppliers.{LIVE_ROWS['suppliers']}")
+                params = [part_id]
+                if location:
+                    sql += " AND suppliers.location = ? COLLATE NOCASE"
+                    params.append(location)
+                row = db.execute(sql + " ORDER BY part_stock.on_hand - part_stock.reserved DESC LIMIT 1",
+                                 params).fetchone()
+                if row is None:
+                    raise InsufficientStockException([(part_id, None, 0, quantity)])
+                supplier_id = row[0]
+            # The write lock is already held (BEGIN IMMEDIATE), so check-and-reserve is one step.
+            cursor = db.execute(
+                "UPDATE part_stock SET reserved = reserved + ? "
+                "WHERE part_id = ? AND supplier_id = ? AND on_hand - reserved >= ?",
+                (quantity, part_id, supplier_id, quantity)
+            )
+            if cursor.rowcount == 0:
+                row = db.execute("SELECT on_hand - reserved FROM part_stock WHERE part_id = ? AND supplier_id = ?",
+                                 (part_id, supplier_id)).fetchone()
+                raise InsufficientStockException([(part_id, supplier_id, row[0] if row else 0, quantity)])
+            cursor = db.execute(
+                "INSERT INTO part_reservations (job_id, part_id, supplier_id, quantity, reserved_at) "
+                f"VALUES (?, ?, ?, ?, {SQL_NOW})", (job_id, part_id, supplier_id, quantity)
+            )
+            return cursor.lastrowid
+
+    @staticmethod
+    def release(reservation_id):
+        """Returns an open reservation's parts to stock; False if it is not open."""
+        with DB().transaction() as db:
+            row = db.execute(
+                f"SELECT part_id, supplier_id, quantity FROM part_reservations WHERE id = ? AND {OPEN_RESERVATION}",
+                (reservation_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            part_id, supplier_id, quantity = row
+            db.execute("UPDATE part_stock SET reserved = reserved - ? WHERE part_id = ? AND supplier_id = ?",
+                       (quantity, part_id, supplier_id))
+            db.execute(f"UPDATE part_reservations SET released_at = {SQL_NOW} WHERE id = ?", (reservation_id,))
+        return True
+
+    @staticmethod
+    def reservations_for_job(job_id):
+        with DB().connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(ReservationRow)
+            cursor.execute(
+                "SELECT id, job_id, part_id, supplier_id, quantity, reserved_at, consumed_at, released_at "
+                "FROM part_reservations WHERE job_id = ? ORDER BY id", (job_id,)
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def below_reorder():
+        """Parts whose available stock across all suppliers is at or below their reorder threshold.
+
+        A threshold of 0 means the part is not reordered automatically.
+        """
+        with DB().read_connection() as db:
+            cursor = db.cursor()
+            cursor.row_factory = row_factory(ReorderRow)
+            cursor.execute(
+                "SELECT parts.id, parts.sku, parts.name, parts.part_type, "
+                "COALESCE(SUM(part_stock.on_hand - part_stock.reserved), 0) AS available, parts.reorder_threshold "
+                "FROM parts LEFT JOIN part_stock ON part_stock.part_id = parts.id GROUP BY parts.id "
+                "HAVING parts.reorder_threshold > 0 AND available <= parts.reorder_threshold "
+                "ORDER BY available - parts.reorder_threshold, parts.sku"
+            )
+            return cursor.fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Purge removed suppliers and list parts to reorder.")
+    parser.add_argument("--purge", action="store_true", help="Delete the tombstones of removed suppliers.")
+    parser.add_argument("--older-than-days", type=float, default=0.0, help="Keep tombstones younger than this.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to yield the write lock between batches.")
+    args = parser.parse_args(argv)
+
+    if args.purge:
+        purged = Supplier.purge_deleted(args.batch_size, args.older_than_days * 86400, args.pause)
+        print(f"Purged {purged} removed suppliers.")
+    for part in SupplierManager.below_reorder():
+        print(f"Reorder: {part.sku} ({part.name}), {part.available} available, threshold {part.reorder_threshold}")
 
-    def add_supplier(self, name, location):
-        self.suppliers.append({"name": name, "location": location})
 
-    def list_suppliers(self):
-        return self.suppliers
\ No newline at end of file
+if __name__ == "__main__":
+    main()
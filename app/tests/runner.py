@@ -0,0 +1,149 @@
+# tests/runner.py
+# Runs the test modules in parallel worker processes, each on throwaway databases.
+#
+#   python -m app.tests.runner --workers 4
+#
+# The parent builds one migrated template database; every worker starts from a copy of
+# it, and DatabaseTestCase tests get a fresh copy per test, so the application's own
+# database is never touched and modules cannot see each other's rows.
+
+import argparse
+import fnmatch
+import io
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+import traceback
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+
+from app.db import testing
+from app.db.db import DB
+
+TESTS_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(TESTS_DIRECTORY))
+
+
+class TimedTestResult(unittest.TestResult):
+    """Collects ``{"test", "outcome", "seconds", "details"}`` for every test run."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self._started = {}
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started[test.id()] = time.perf_counter()
+
+    def _record(self, test, outcome, details=""):
+        started = self._started.pop(test.id(), None)
+        self.records.append({
+            "test": test.id(),
+            "outcome": outcome,
+            "seconds": time.perf_counter() - started if started is not None else 0.0,
+            "details": details,
+        })
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, "ok")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, "FAIL", self.failures[-1][1])
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._record(test, "ERROR", self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._record(test, "skipped", reason)
+
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self._record(test, "expected failure")
+
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self._record(test, "unexpected success")
+
+
+def discover_modules(start_dir=TESTS_DIRECTORY, pattern="test_*.py", top_level_dir=PROJECT_ROOT):
+    """Dotted names of the test modules in ``start_dir``, e.g. ``app.tests.test_jobs``."""
+    package = os.path.relpath(os.path.abspath(start_dir), top_level_dir).replace(os.sep, ".")
+    return [f"{package}.{name[:-3]}" for name in sorted(os.listdir(start_dir))
+            if name.endswith(".py") and fnmatch.fnmatch(name, pattern)]
+
+
+def _init_worker(template):
+    testing.use_template(template)
+    # Tests that do not use DatabaseTestCase still get a private database per worker.
+    DB.configure(path=testing.fresh_database(os.path.dirname(template)))
+
+
+def run_module(module):
+    """Runs one module's tests; returns their records. Output is kept for failing tests."""
+    output = io.StringIO()
+    result = TimedTestResult()
+    started = time.perf_counter()
+    with redirect_stdout(output), redirect_stderr(output):
+        try:
+            unittest.defaultTestLoader.loadTestsFromName(module).run(result)
+        except Exception:
+            result.records.append({"test": module, "outcome": "ERROR", "seconds": time.perf_counter() - started,
+                                   "details": traceback.format_exc()})
+    for record in result.records:
+        if record["outcome"] in ("FAIL", "ERROR") and output.getvalue():
+            record["details"] += "\nCaptured output:\n" + output.getvalue()
+    return result.records
+
+
+def run_tests(start_dir=TESTS_DIRECTORY, pattern="test_*.py", workers=None, top_level_dir=PROJECT_ROOT):
+    """Runs every matching module across a process pool; returns all test records."""
+    modules = discover_modules(start_dir, pattern, top_level_dir)
+    if not modules:
+        return []
+    directory = testing.scratch_directory()
+    try:
+        template = testing.build_template(os.path.join(directory, "template.db"))
+        # spawn, not fork: the parent may hold open SQLite connections that must not be shared.
+        with ProcessPoolExecutor(max_workers=workers or min(len(modules), os.cpu_count() or 1),
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(template,)) as pool:
+            return [record for records in pool.map(run_module, modules) for record in records]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def print_report(records, elapsed, stream=sys.stdout):
+    """Prints each test's timing (slowest first), the failures and a summary line."""
+    for record in sorted(records, key=lambda record: record["seconds"], reverse=True):
+        print(f"{record['seconds'] * 1000:9.1f} ms  {record['outcome']:<8} {record['test']}", file=stream)
+    failed = [record for record in records if record["outcome"] in ("FAIL", "ERROR", "unexpected success")]
+    for record in failed:
+        print(f"\n=== {record['outcome']}: {record['test']} ===\n{record['details']}", file=stream)
+    total = sum(record["seconds"] for record in records)
+    print(f"\nRan {len(records)} tests in {elapsed:.2f}s wall time ({total:.2f}s of test time); "
+          f"{len(failed)} failed.", file=stream)
+    return not failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the test suite in parallel on isolated databases.")
+    parser.add_argument("--workers", type=int, help="Worker processes (defaults to one per core).")
+    parser.add_argument("--pattern", default="test_*.py")
+    parser.add_argument("--start-dir", default=TESTS_DIRECTORY)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    records = run_tests(args.start_dir, args.pattern, args.workers)
+    return 0 if print_report(records, time.perf_counter() - started) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# tests/test_api.py
+import asyncio
+import json
+import threading
+import unittest
+from app.db.testing import DatabaseTestCase
+from app.api.server import ApiError, ApiServer, Request, register_customer
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.job_status import JobStatus
+from app.models.supplier import Supplier
+from app.models.technician import Technician
+from app.services.intake_queue import intake_queue
+from app.utils.utils import Utils
+
+async def send(reader, writer, method, path, payload=None, headers=""):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: test\r\n{headers}Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        response_headers[name.lower()] = value.strip()
+    data = json.loads(await reader.readexactly(int(response_headers["content-length"])))
+    return status, data, response_headers
+
+class TestApiServer(DatabaseTestCase):
+    def run_against_server(self, scenario):
+        async def main():
+            server = await ApiServer(port=0).start()
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            try:
+                return await scenario(reader, writer), server.stats()
+            finally:
+                writer.close()
+                await server.close()
+        return asyncio.run(main())
+
+    def test_operations_share_one_keep_alive_connection(self):
+        technician_id = Technician("Api Tech", Utils.generate_random_email(), "Laptops").save()
+        email = Utils.generate_random_email()
+
+        async def scenario(reader, writer):
+            status, created, _ = await send(reader, writer, "POST", "/customers", {
+                "name": "Api Customer", "email": email, "equipment_type": "Laptop", "serial_number": "API-001"})
+            self.assertEqual(status, 201)
+            status, _, _ = await send(reader, writer, "POST", "/customers", {"name": "Again", "email": email})
+            self.assertEqual(status, 409)
+
+            status, job, _ = await send(reader, writer, "POST", "/jobs", {
+                "equipment_id": created["equipment_id"], "technician_id": technician_id, "description": "Dead pixel"})
+            self.assertEqual(status, 201)
+            status, result, _ = await send(reader, writer, "POST", f"/technicians/{technician_id}/jobs/status",
+                                           {"job_ids": [job["job_id"], -1]})
+            self.assertEqual((status, result), (200, {"updated": [job["job_id"]], "skipped": [-1]}))
+            status, _, _ = await send(reader, writer, "POST", f"/jobs/{job['job_id']}/cost", {"cost": 55})
+            self.assertEqual(status, 200)
+
+            status, page, _ = await send(reader, writer, "GET", f"/jobs?customer_id={created['customer_id']}")
+            self.assertEqual([(j["id"], j["status"], j["job_cost"]) for j in page["jobs"]],
+                             [(job["job_id"], "Job Completed", 55.0)])
+            status, device, _ = await send(reader, writer, "GET", "/equipment?serial=api001")
+            self.assertEqual((status, device["customer_email"], [j["status"] for j in device["jobs"]]),
+                             (200, email, ["Job Completed"]))
+            status, _, headers = await send(reader, writer, "GET", "/health", headers="Connection: close\r\n")
+            self.assertEqual((status, headers["connection"]), (200, "close"))
+            self.assertEqual(await reader.read(), b"")
+
+        _, stats = self.run_against_server(scenario)
+        self.assertEqual((stats["connections"], stats["requests"]), (1, 8))
+
+    def test_parts_stock_and_reservations(self):
+        supplier_id = Supplier("Api Parts", "Battery", "Leeds").save()
+        customer_id = Customer("Parts Api Customer", Utils.generate_random_email()).save()
+        job_id = Job("Swollen battery", equipment_id=Equipment(customer_id, "Laptop", "API-PARTS-1").save()).save()
+
+        async def scenario(reader, writer):
+            status, part, _ = await send(reader, writer, "POST", "/parts", {
+                "sku": "API-BAT", "name": "Battery", "part_type": "Battery", "reorder_threshold": 2})
+            self.assertEqual(status, 201)
+            movement = {"part_id": part["part_id"], "supplier_id": supplier_id, "quantity": 1}
+            status, result, _ = await send(reader, writer, "POST", "/parts/stock", {"movements": [movement] * 3})
+            self.assertEqual((status, result), (200, {"movements": 3, "stock_rows_changed": 1}))
+
+            status, reservation, _ = await send(reader, writer, "POST", f"/jobs/{job_id}/parts",
+                                                {"part_id": part["part_id"], "quantity": 2})
+            self.assertEqual(status, 201)
+            status, _, _ = await send(reader, writer, "POST", f"/jobs/{job_id}/parts",
+                                      {"part_id": part["part_id"], "quantity": 2})
+            self.assertEqual(status, 409)
+            status, stock, _ = await send(reader, writer, "GET", "/parts?part_type=battery&location=LEEDS")
+            self.assertEqual([(row["on_hand"], row["available"]) for row in stock["stock"]], [(3, 1)])
+            status, reorder, _ = await send(reader, writer, "GET", "/parts/reorder")
+            self.assertEqual([row["sku"] for row in reorder["parts"]], ["API-BAT"])
+            path = f"/parts/reservations/{reservation['reservation_id']}/release"
+            self.assertEqual((await send(reader, writer, "POST", path))[0], 200)
+            self.assertEqual((await send(reader, writer, "POST", path))[0], 404)
+
+        self.run_against_server(scenario)
+
+    def test_intake_tickets_are_answered_before_the_commit(self):
+        async def scenario(reader, writer):
+            status, queued, _ = await send(reader, writer, "POST", "/intake", {
+                "name": "Rush Customer", "email": Utils.generate_random_email(), "equipment_type": "Tablet",
+                "serial_number": "API-RUSH-1", "description": "No charge"})
+            self.assertEqual(status, 202)
+            self.assertTrue(await asyncio.to_thread(intake_queue.flush, 5))
+            status, ticket, _ = await send(reader, writer, "GET", f"/intake/{queued['ticket']}")
+            self.assertEqual((status, ticket["error"]), (200, None))
+            self.assertIsNotNone(ticket["job_id"])
+            self.assertEqual((await send(reader, writer, "POST", "/intake", {"name": "x"}))[0], 400)
+            self.assertEqual((await send(reader, writer, "GET", "/intake/abc123"))[0], 404)
+
+        try:
+            self.run_against_server(scenario)
+        finally:
+            intake_queue.stop()
+
+    def test_assessed_jobs_get_a_suggested_cost(self):
+        customer_id = Customer("Estimate Customer", Utils.generate_random_email()).save()
+        for i, cost in enumerate((90.0, 100.0, 110.0, 120.0, 130.0)):
+            equipment_id = Equipment(customer_id, "Drone", f"EST-{i}").save()
+            job_id = Job("Drone propeller cracked", status=JobStatus.ASSESSED, equipment_id=equipment_id).save()
+            Job.update_cost(job_id, cost)
+        equipment_id = Equipment(customer_id, "Drone", "EST-NEW").save()
+        job_id = Job("Propeller chipped", status=JobStatus.ASSESSED, equipment_id=equipment_id).save()
+
+        async def scenario(reader, writer):
+            status, result, _ = await send(reader, writer, "GET", f"/jobs/{job_id}/estimate")
+            self.assertEqual((status, result["estimate"]["samples"]), (200, 5))
+            self.assertEqual(result["estimate"]["basis"], "drone jobs mentioning 'propeller'")
+            self.assertAlmostEqual(result["estimate"]["suggested"], 110.0, delta=1.1)
+            self.assertEqual((await send(reader, writer, "GET", "/jobs/999999/estimate"))[0], 404)
+
+        self.run_against_server(scenario)
+
+    def test_concurrent_registrations_of_one_email_create_one_customer(self):
+        email = Utils.generate_random_email()
+        addresses = [email, email.upper(), email, email.title()]
+        barrier = threading.Barrier(len(addresses))
+        statuses = []
+
+        def register(address):
+            request = Request("POST", "/customers", "HTTP/1.1", {},
+                              json.dumps({"name": "Twice", "email": address}).encode())
+            barrier.wait()
+            try:
+                statuses.append(register_customer(request)[0])
+            except ApiError as error:
+                statuses.append(error.status)
+        threads = [threading.Thread(target=register, args=(address,)) for address in addresses]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(statuses), [201, 409, 409, 409])
+
+    def test_bad_requests_get_json_errors(self):
+        async def scenario(reader, writer):
+            self.assertEqual((await send(reader, writer, "GET", "/nowhere"))[0], 404)
+            self.assertEqual((await send(reader, writer, "DELETE", "/jobs"))[0], 405)
+            self.assertEqual((await send(reader, writer, "POST", "/suppliers", {"name": "x"}))[0], 400)
+            status, error, _ = await send(reader, writer, "POST", "/jobs/1/cost", {"cost": "lots"})
+            self.assertEqual((status, error), (400, {"error": "'cost' must be a number."}))
+            for length in ("-5", "ten"):
+                bad_reader, bad_writer = await asyncio.open_connection(*writer.get_extra_info("peername")[:2])
+                bad_writer.write(f"POST /customers HTTP/1.1\r\nHost: test\r\nContent-Length: {length}\r\n\r\n".encode())
+                self.assertEqual(int((await bad_reader.readline()).split()[1]), 400)
+                bad_writer.close()
+
+        self.run_against_server(scenario)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
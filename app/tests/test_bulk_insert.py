@@ -0,0 +1,30 @@
+# tests/test_bulk_insert.py
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.utils.utils import Utils
+
+class TestBulkInsert(DatabaseTestCase):
+    def test_save_many_returns_assigned_ids(self):
+        customer = Customer("Bulk Customer", Utils.generate_random_email())
+        customer_id = customer.save()
+        devices = [Equipment(customer_id, "laptop", f"BULK-{i}") for i in range(50)]
+        ids = Equipment.save_many(devices)
+        self.assertEqual(len(ids), 50)
+        self.assertEqual([d.id for d in devices], ids)
+        stored = {row.id: row.serial_number for row in Equipment.get_by_customer(customer_id)}
+        self.assertEqual(stored, {d.id: d.serial_number for d in devices})
+
+    def test_transaction_rolls_back_every_write(self):
+        email = Utils.generate_random_email()
+        with self.assertRaises(RuntimeError):
+            with DB().transaction():
+                customer_id = Customer("Rolled Back", email).save()
+                Equipment(customer_id, "phone", "ROLLBACK-1").save()
+                raise RuntimeError("abort intake")
+        self.assertIsNone(Customer.find_by_email(email))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+# tests/test_cache.py
+import unittest
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.utils.cache import LRUCache, MISSING
+from app.utils.utils import Utils
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used_and_expires(self):
+        clock = FakeClock()
+        cache = LRUCache("test.lru", maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertIs(cache.get("b"), MISSING)
+        clock.now = 11
+        self.assertIs(cache.get("a"), MISSING)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]), (1, 2, 1, 1))
+
+    def test_fill_racing_an_invalidation_is_not_cached(self):
+        cache = LRUCache("test.generations", maxsize=2)
+        generation = cache.generation()  # A reader misses and starts its query...
+        cache.invalidate("new@example.com")  # ...while a save commits
+        self.assertFalse(cache.set("new@example.com", None, generation))
+        self.assertIs(cache.get("new@example.com"), MISSING)
+        self.assertTrue(cache.set("other@example.com", 1, generation))  # Other keys still fill
+        self.assertTrue(cache.set("new@example.com", 2, cache.generation()))
+
+        generation = cache.generation()
+        cache.invalidate("a", "b", "c")  # Stamps beyond maxsize are forgotten conservatively
+        self.assertFalse(cache.set("a", 1, generation))
+        generation = cache.generation()
+        cache.clear()
+        self.assertFalse(cache.set("z", 1, generation))
+
+class TestModelCaching(DatabaseTestCase):
+    def test_lookups_are_cached_and_invalidated_on_save(self):
+        email = Utils.generate_random_email()
+        self.assertIsNone(Customer.find_by_email(email))
+        customer_id = Customer("Cached Customer", email).save()
+        hits = Customer.cache.hits
+        self.assertEqual(Customer.find_by_email(email).id, customer_id)
+        self.assertEqual(Customer.find_by_email(email).id, customer_id)
+        self.assertEqual(Customer.cache.hits, hits + 1)
+
+        self.assertEqual(Equipment.get_by_customer(customer_id), [])
+        Equipment(customer_id, "laptop", "CACHE-1").save()
+        self.assertEqual([row.serial_number for row in Equipment.get_by_customer(customer_id)], ["CACHE-1"])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+# tests/test_config.py
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from app.config import load_settings
+from app.db.migrations import Migrator
+from app.db.pool import ConnectionPool
+
+class TestSettings(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_environment_overrides_config_file_and_defaults(self):
+        config_file = os.path.join(self.tmp_dir.name, "edd.json")
+        with open(config_file, "w", encoding="utf-8") as handle:
+            json.dump({"database_path": "from_file.db", "pool_size": 8, "synchronous": "full"}, handle)
+        settings = load_settings({"EDD_CONFIG": config_file, "EDD_POOL_SIZE": "2", "EDD_TEMP_STORE": ""})
+        self.assertEqual((settings.database_path, settings.pool_size), ("from_file.db", 2))
+        self.assertEqual(settings.pragmas["synchronous"], "FULL")
+        self.assertEqual(settings.pragmas["temp_store"], "MEMORY")
+        self.assertEqual(load_settings({"EDD_DB_PATH": "/data/edd.db"}).database_path, "/data/edd.db")
+
+    def test_invalid_values_are_rejected(self):
+        for environ in ({"EDD_POOL_SIZE": "many"}, {"EDD_POOL_SIZE": "0"}, {"EDD_SYNCHRONOUS": "sometimes"}):
+            with self.assertRaises(ValueError):
+                load_settings(environ)
+
+    def test_pool_applies_pragmas(self):
+        pool = ConnectionPool(os.path.join(self.tmp_dir.name, "pragmas.db"),
+                              pragmas={"synchronous": "OFF", "cache_size": -2000})
+        try:
+            with pool.connection() as db:
+                self.assertEqual(db.execute("PRAGMA synchronous").fetchone()[0], 0)
+                self.assertEqual(db.execute("PRAGMA cache_size").fetchone()[0], -2000)
+        finally:
+            pool.close()
+
+    def test_current_schema_is_recognised_from_the_header(self):
+        connection = sqlite3.connect(":memory:")
+        migrator = Migrator(connection)
+        self.assertFalse(migrator.is_current())
+        migrator.migrate()
+        self.assertTrue(migrator.is_current())
+        self.assertEqual(connection.execute("PRAGMA user_version").fetchone()[0], migrator.latest_version())
+        connection.close()
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
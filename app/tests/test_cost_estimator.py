@@ -0,0 +1,131 @@
+# tests/test_cost_estimator.py
+import random
+import statistics
+import threading
+import unittest
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.job_status import JobStatus
+from app.services.cost_estimator import CostEstimator, CostStats
+from app.utils.sketch import QuantileSketch
+from app.utils.utils import Utils
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_quantiles_stay_within_relative_accuracy(self):
+        rng = random.Random(7)
+        costs = [rng.lognormvariate(5, 1) for _ in range(20000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for cost in costs:
+            sketch.add(cost)
+        costs.sort()
+        fractions = [0.01, 0.25, 0.5, 0.75, 0.95, 0.99]
+        for fraction, estimate in zip(fractions, sketch.quantiles(fractions)):
+            exact = costs[int(fraction * (len(costs) - 1))]
+            self.assertLess(abs(estimate - exact) / exact, 0.02)
+        self.assertLess(len(sketch.buckets), 1000)
+
+    def test_weighted_adds_and_merges_match_single_adds(self):
+        weighted, single, other = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        weighted.add(120.0, 3)
+        weighted.add(0.0)
+        for cost in (120.0, 120.0, 0.0):
+            single.add(cost)
+        other.add(120.0)
+        single.merge(other)
+        self.assertEqual((weighted.buckets, weighted.zeros, weighted.count), (single.buckets, single.zeros, single.count))
+        self.assertEqual(weighted.quantile(0.0), 0.0)
+        with self.assertRaises(ValueError):
+            single.merge(QuantileSketch(relative_accuracy=0.05))
+
+    def test_running_mean_and_deviation_match_statistics(self):
+        stats = CostStats()
+        costs = [80.0, 80.0, 80.0, 150.0, 95.5, 300.0]
+        stats.add(80.0, 3)
+        for cost in costs[3:]:
+            stats.add(cost)
+        self.assertAlmostEqual(stats.mean, statistics.mean(costs))
+        self.assertAlmostEqual(stats.stdev, statistics.stdev(costs))
+
+class TestCostEstimator(DatabaseTestCase):
+    def setUp(self):
+        self.customer_id = Customer("Cost Customer", Utils.generate_random_email()).save()
+        self.estimator = CostEstimator(min_samples=3)
+        self.serials = 0
+
+    def device(self, equipment_type):
+        self.serials += 1
+        return Equipment(self.customer_id, equipment_type, f"COST-{self.serials:04d}").save()
+
+    def complete(self, equipment_type, description, cost):
+        equipment_id = self.device(equipment_type)
+        job_id = Job(description, status=JobStatus.ASSESSED, equipment_id=equipment_id).save()
+        self.assertTrue(Job.update_cost(job_id, cost))
+        return job_id
+
+    def test_most_specific_group_with_enough_history_is_used(self):
+        for cost in (100.0, 110.0, 120.0):
+            self.complete("Zither", "Zither tuning peg snapped", cost)
+        for cost in (40.0, 50.0, 60.0):
+            self.complete("Zither", "Zither strap frayed", cost)
+
+        peg = self.estimator.estimate("zither", "Tuning peg loose")
+        self.assertEqual((peg.basis, peg.samples), ("zither jobs mentioning 'peg'", 3))
+        self.assertAlmostEqual(peg.suggested, 110.0, delta=1.1)
+        self.assertAlmostEqual(peg.mean, 110.0)
+        self.assertLessEqual(peg.low, peg.suggested)
+        self.assertGreaterEqual(peg.high, peg.suggested)
+
+        body = self.estimator.estimate("Zither", "Cracked body")  # No zither history for 'body'
+        self.assertEqual((body.basis, body.samples), ("zither jobs", 6))
+        self.assertIsNone(CostEstimator(min_samples=10 ** 9).estimate("Zither", "Cracked body"))
+
+    def test_sync_adds_new_completions_without_a_rebuild(self):
+        clock = [0.0]
+        estimator = CostEstimator(min_samples=3, sync_interval=30.0, clock=lambda: clock[0])
+        for cost in (200.0, 210.0, 220.0):
+            self.complete("Theremin", "Theremin antenna bent", cost)
+        self.assertEqual(estimator.estimate("Theremin", "antenna").samples, 3)
+        self.assertEqual(estimator.rebuilds, 1)
+
+        self.complete("Theremin", "Theremin antenna loose", 230.0)
+        self.assertEqual(estimator.estimate("Theremin", "antenna").samples, 3)  # Not yet synced
+        clock[0] = 31.0
+        estimate = estimator.estimate("Theremin", "antenna")
+        self.assertEqual((estimate.samples, estimator.rebuilds, estimator.observed), (4, 1, 1))
+        self.assertAlmostEqual(estimate.mean, 215.0)
+
+    def test_concurrent_syncs_count_each_completion_once(self):
+        clock = [0.0]
+        estimator = CostEstimator(min_samples=1, clock=lambda: clock[0])
+        self.complete("Banjo", "Banjo string snapped", 40.0)
+        estimator.rebuild()
+        for round_number in range(10):
+            for _ in range(3):
+                self.complete("Banjo", "Banjo string snapped", 40.0 + round_number)
+            clock[0] += 60.0  # Every thread finds the groups stale at once
+            barrier = threading.Barrier(5)
+
+            def estimate():
+                barrier.wait()
+                estimator.estimate("Banjo", "string")
+            threads = [threading.Thread(target=estimate) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(estimator.estimate("Banjo", "string").samples, 31)
+        self.assertEqual(estimator.observed, 30)
+
+    def test_estimate_jobs_skips_unknown_jobs(self):
+        for cost in (75.0, 80.0, 85.0):
+            self.complete("Kazoo", "Kazoo membrane torn", cost)
+        equipment_id = self.device("Kazoo")
+        job_id = Job("Membrane split", status=JobStatus.ASSESSED, equipment_id=equipment_id).save()
+        estimates = self.estimator.estimate_jobs([job_id, -1])
+        self.assertEqual(list(estimates), [job_id])
+        self.assertEqual(estimates[job_id].basis, "kazoo jobs mentioning 'membrane'")
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
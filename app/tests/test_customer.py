@@ -1,14 +1,23 @@
 # tests/test_customer.py
 import unittest
+from app.db.testing import DatabaseTestCase
 from app.models.customer import Customer
 from app.utils.utils import Utils
 
-class TestJob(unittest.TestCase):
+class TestJob(DatabaseTestCase):
     def test_customer_creation(self):
         customer = Customer("Test Customer","Test parts","Test Location")
         customer.save()
         customers = Customer.get_all()
         self.assertTrue(any(c[1] == "Test Customer" for c in customers))
 
+    def test_rows_are_slotted_and_named(self):
+        email = Utils.generate_random_email()
+        customer_id = Customer("Row Customer", email).save()
+        row = next(c for c in Customer.get_all() if c.id == customer_id)
+        self.assertEqual((row.name, row.email), ("Row Customer", email))
+        self.assertEqual(row[1], row.name)
+        self.assertFalse(hasattr(row, "__dict__"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
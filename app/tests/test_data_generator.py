@@ -0,0 +1,23 @@
+# tests/test_data_generator.py
+import random
+import unittest
+from app.utils.data_generator import SyntheticDataGenerator
+from app.utils.utils import Utils
+
+class TestDataGenerator(unittest.TestCase):
+    def test_random_email_honours_custom_tlds(self):
+        email = Utils.generate_random_email(domains=["example"], tlds=["org"], rng=random.Random(1))
+        self.assertRegex(email, r"^[a-z0-9]{4,15}@example\.org$")
+
+    def test_same_seed_yields_same_records(self):
+        first = SyntheticDataGenerator(seed=7)
+        second = SyntheticDataGenerator(seed=7)
+        self.assertEqual([(c.name, c.email) for c in first.customers(20)],
+                         [(c.name, c.email) for c in second.customers(20)])
+        self.assertEqual([e.serial_number for e in first.equipment([1, 2, 3], per_customer=2)],
+                         [e.serial_number for e in second.equipment([1, 2, 3], per_customer=2)])
+        emails = [t.email for t in first.technicians(200)]
+        self.assertEqual(len(set(emails)), 200)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+# tests/test_db_pool.py
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from app.db.db import read_only_uri
+from app.db.pool import ConnectionPool
+from app.utils.exceptions import PoolExhaustedException
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(os.path.join(self.tmp_dir.name, "pool.db"), max_size=2, timeout=0.2)
+
+    def tearDown(self):
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def test_wal_mode_and_reentrant_checkout(self):
+        with self.pool.connection() as outer:
+            mode = outer.execute("PRAGMA journal_mode").fetchone()[0]
+            with self.pool.connection() as inner:
+                self.assertIs(outer, inner)
+        self.assertEqual(mode, "wal")
+        stats = self.pool.stats()
+        self.assertEqual(stats["checkouts"], 1)
+        self.assertEqual(stats["in_use"], 0)
+
+    def test_pool_is_bounded(self):
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        with self.assertRaises(PoolExhaustedException):
+            self.pool.acquire()
+        self.pool.release(first)
+        self.pool.release(second)
+        stats = self.pool.stats()
+        self.assertEqual(stats["created"], 2)
+        self.assertEqual(stats["timeouts"], 1)
+
+    def test_worker_threads_share_the_pool(self):
+        with self.pool.connection() as db:
+            db.execute("CREATE TABLE counter (value INTEGER)")
+            db.commit()
+
+        def work():
+            for _ in range(20):
+                with self.pool.connection() as db:
+                    db.execute("INSERT INTO counter (value) VALUES (1)")
+                    db.commit()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with self.pool.connection() as db:
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM counter").fetchone()[0], 80)
+        self.assertLessEqual(self.pool.stats()["peak_in_use"], 2)
+
+    def test_read_only_pool_rejects_writes(self):
+        with self.pool.connection() as db:
+            db.execute("CREATE TABLE notes (body TEXT)")
+            db.execute("INSERT INTO notes VALUES ('kept')")
+            db.commit()
+        reader = ConnectionPool(read_only_uri(self.pool.database), max_size=1, uri=True, read_only=True)
+        try:
+            with reader.connection() as db:
+                self.assertEqual(db.execute("SELECT body FROM notes").fetchall(), [("kept",)])
+                with self.assertRaises(sqlite3.OperationalError):
+                    db.execute("INSERT INTO notes VALUES ('lost')")
+        finally:
+            reader.close()
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+# tests/test_exporter.py
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.technician import Technician
+from app.services.exporter import export, export_many, read_columnar, read_only_connection
+from app.utils.utils import Utils
+
+class TestExporter(DatabaseTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        customer_id = Customer("Export Customer", Utils.generate_random_email()).save()
+        equipment_id = Equipment(customer_id, "Printer", "EXP-4411").save()
+        self.technician_id = Technician("Export Tech", Utils.generate_random_email(), "Printers").save()
+        self.completed_id = Job("Paper jam", "Job Assessed", self.technician_id, equipment_id).save()
+        Job.update_cost(self.completed_id, 42.5)
+        self.open_id = Job("Streaky prints", "Job Created", self.technician_id, equipment_id).save()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_formats_stream_the_same_rows(self):
+        export("completed_jobs", self.path("jobs.csv"))
+        export("completed_jobs", self.path("jobs.jsonl"))
+        export("completed_jobs", self.path("jobs.col"), file_format="columnar", batch_size=2)
+
+        with open(self.path("jobs.csv"), newline="", encoding="utf-8") as handle:
+            csv_rows = {int(row["job_id"]): row for row in csv.DictReader(handle)}
+        with open(self.path("jobs.jsonl"), encoding="utf-8") as handle:
+            jsonl_rows = {row["job_id"]: row for row in map(json.loads, handle)}
+        columnar_rows = {row["job_id"]: row for row in read_columnar(self.path("jobs.col"))}
+
+        self.assertEqual(set(csv_rows), set(jsonl_rows))
+        self.assertEqual(jsonl_rows, columnar_rows)
+        self.assertEqual(jsonl_rows[self.completed_id]["job_cost"], 42.5)
+        self.assertEqual(jsonl_rows[self.completed_id]["technician_name"], "Export Tech")
+        self.assertNotIn(self.open_id, jsonl_rows)
+
+    def test_filters_and_parallel_exports(self):
+        results = export_many([
+            {"report": "completed_jobs", "output": self.path("all.jsonl"), "status": None},
+            {"report": "completed_jobs", "output": self.path("future.jsonl"), "created_since": "9999-01-01"},
+            {"report": "technician_workload", "output": self.path("workload.jsonl")},
+        ], workers=2)
+        self.assertEqual([r["report"] for r in results], ["completed_jobs", "completed_jobs", "technician_workload"])
+        self.assertEqual(results[1]["rows"], 0)
+        with open(self.path("all.jsonl"), encoding="utf-8") as handle:
+            self.assertTrue({self.completed_id, self.open_id} <= {row["job_id"] for row in map(json.loads, handle)})
+        with open(self.path("workload.jsonl"), encoding="utf-8") as handle:
+            workload = {row["technician_id"]: row for row in map(json.loads, handle)}
+        self.assertEqual((workload[self.technician_id]["jobs"], workload[self.technician_id]["completed"],
+                          workload[self.technician_id]["total_cost"]), (2, 1, 42.5))
+
+    def test_export_connections_are_read_only(self):
+        connection = read_only_connection(DB.path)
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                connection.execute("DELETE FROM suppliers")
+        finally:
+            connection.close()
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
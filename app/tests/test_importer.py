@@ -0,0 +1,78 @@
+# tests/test_importer.py
+import json
+import os
+import tempfile
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.services.importer import Importer
+from app.utils.utils import Utils
+
+class TestImporter(DatabaseTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(content)
+        return path
+
+    def test_customers_and_equipment_import_with_rejects(self):
+        existing = Utils.generate_random_email()
+        Customer("Existing Customer", existing).save()
+        new_email = Utils.generate_random_email()
+        customers_csv = self.write("customers.csv", "name,email\n"
+                                   f"New Customer,{new_email}\n"
+                                   f"Copy Customer,{new_email}\n"
+                                   f"Old Customer,{existing}\n"
+                                   "No Email,\n"
+                                   "Bad Email,not-an-email\n")
+        rejects_path = os.path.join(self.tmp_dir.name, "rejects.jsonl")
+        report = Importer("customers", batch_size=2, rejects_path=rejects_path).run(customers_csv)
+        self.assertEqual((report.read, report.inserted, report.rejected), (5, 1, 4))
+        self.assertEqual(report.rejected_by_reason["duplicate email"], 2)
+        with open(rejects_path, encoding="utf-8") as handle:
+            self.assertEqual(len(handle.readlines()), 4)
+
+        equipment_jsonl = self.write("equipment.jsonl", "\n".join(json.dumps(r) for r in [
+            {"customer_email": new_email, "type": "Laptop", "serial_number": "IMP-0001"},
+            {"customer_email": "ghost@nowhere.org", "type": "Laptop", "serial_number": "IMP-0002"},
+            {"customer_email": new_email, "type": "Phone", "serial_number": "??"},
+        ]))
+        report = Importer("equipment").run(equipment_jsonl)
+        self.assertEqual((report.inserted, report.rejected), (1, 2))
+        customer = Customer.find_by_email(new_email)
+        self.assertEqual([e.serial_number for e in Equipment.get_by_customer(customer.id)], ["IMP-0001"])
+
+    def test_existing_emails_match_regardless_of_case(self):
+        local = Utils.generate_random_email()
+        mixed = local[0].upper() + local[1:].replace("@", "@Mail.")
+        customer_id = Customer("Mixed Case", mixed).save()
+        path = self.write("case.csv", f"name,email\nSame Customer,{mixed.lower()}\n")
+        report = Importer("customers").run(path)
+        self.assertEqual((report.inserted, report.rejected_by_reason["duplicate email"]), (0, 1))
+
+        path = self.write("case.jsonl", json.dumps(
+            {"customer_email": mixed.upper(), "type": "Laptop", "serial_number": "CASE-0001"}))
+        self.assertEqual(Importer("equipment").run(path).inserted, 1)
+        self.assertEqual([e.serial_number for e in Equipment.get_by_customer(customer_id)], ["CASE-0001"])
+
+    def test_resumes_after_last_committed_batch(self):
+        emails = [Utils.generate_random_email() for _ in range(6)]
+        path = self.write("resume.csv", "name,email\n" + "".join(f"Resume {i},{e}\n" for i, e in enumerate(emails)))
+        with DB().transaction() as db:
+            db.execute("INSERT OR REPLACE INTO import_checkpoints VALUES (?, 4, CURRENT_TIMESTAMP)",
+                       (Importer.checkpoint_key("customers", path),))
+        report = Importer("customers", batch_size=4).run(path)
+        self.assertEqual((report.resumed_from, report.read, report.inserted), (4, 2, 2))
+        self.assertIsNone(Customer.find_by_email(emails[0]))
+        self.assertIsNotNone(Customer.find_by_email(emails[5]))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,128 @@
+# tests/test_intake_queue.py
+import json
+import os
+import sqlite3
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.services.intake_queue import IntakeQueue
+from app.utils.exceptions import IntakeQueueFullException
+from app.utils.utils import Utils
+
+def walk_in(serial, email=None, description="Cracked screen"):
+    return {"name": "Walk In", "email": email or Utils.generate_random_email(), "equipment_type": "Phone",
+            "serial_number": serial, "description": description}
+
+class TestIntakeQueue(DatabaseTestCase):
+    def setUp(self):
+        self.journal = DB.path + ".test-intake.jsonl"
+        self.queue = IntakeQueue(journal_path=self.journal, batch_size=50, max_delay=0.005)
+
+    def tearDown(self):
+        self.queue.stop()
+        if os.path.exists(self.journal):
+            os.remove(self.journal)
+
+    def test_tickets_resolve_to_committed_records(self):
+        email = Utils.generate_random_email()
+        first = self.queue.enqueue(walk_in("WALK-001", email))
+        second = self.queue.enqueue(walk_in("WALK-002", email, description=None))
+        with self.assertRaises(ValueError):
+            self.queue.enqueue({"name": "No Device", "email": email})
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertFalse(self.queue.pending(first))
+
+        first_row, second_row = self.queue.resolve(first), self.queue.resolve(second)
+        self.assertEqual(first_row.customer_id, second_row.customer_id)  # One customer per email
+        self.assertEqual(Customer.find_by_email(email).id, first_row.customer_id)
+        self.assertEqual([e.id for e in Equipment.get_by_customer(first_row.customer_id)],
+                         [first_row.equipment_id, second_row.equipment_id])
+        self.assertEqual(Job.history(first_row.job_id)[0].job_id, first_row.job_id)
+        self.assertIsNone(second_row.job_id)
+        self.assertEqual(os.path.getsize(self.journal), 0)  # Nothing outstanding, journal emptied
+
+    def test_bursts_are_group_committed(self):
+        tickets = [self.queue.enqueue(walk_in(f"BURST-{i:04d}")) for i in range(300)]
+        self.assertTrue(self.queue.flush(timeout=10))
+        stats = self.queue.stats()
+        self.assertEqual((stats["committed"], stats["failed"], stats["queued"]), (300, 0, 0))
+        self.assertLess(stats["batches"], 60)
+        self.assertGreater(stats["records_per_second"], 0)
+        self.assertTrue(all(self.queue.resolve(ticket).error is None for ticket in tickets))
+
+    def test_rejected_record_does_not_sink_its_batch(self):
+        owner = Customer("Owner", Utils.generate_random_email()).save()
+        Equipment(owner, "Phone", "TAKEN-1").save()
+        with DB().transaction():  # Hold the write lock so both records land in one batch
+            taken = self.queue.enqueue(walk_in("taken 1"))
+            fine = self.queue.enqueue(walk_in("FREE-1"))
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertIn("already registered", self.queue.resolve(taken).error)
+        self.assertIsNone(self.queue.resolve(taken).equipment_id)
+        self.assertIsNone(self.queue.resolve(fine).error)
+        self.assertEqual(self.queue.stats()["failed"], 1)
+
+    def test_full_queue_pushes_back(self):
+        self.queue.maxsize = 2
+        with DB().transaction():  # The writer cannot commit while the test holds the lock
+            self.queue.enqueue(walk_in("FULL-1"))
+            self.queue.enqueue(walk_in("FULL-2"))
+            with self.assertRaises(IntakeQueueFullException):
+                self.queue.enqueue(walk_in("FULL-3"), timeout=0.05)
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.queue.enqueue(walk_in("FULL-3"))
+
+    def test_journaled_records_are_replayed_once_after_a_crash(self):
+        done = self.queue.enqueue(walk_in("CRASH-1"))
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.queue.stop()
+        # As if the process died with one record committed and one only journaled.
+        with open(self.journal, "w", encoding="utf-8") as journal:
+            for ticket, record in ((done, walk_in("CRASH-1")), ("lost0000ticket01", walk_in("CRASH-2"))):
+                journal.write(json.dumps({"ticket": ticket, "record": record}) + "\n")
+            journal.write('{"ticket": "torn')
+
+        restarted = IntakeQueue(journal_path=self.journal).start()
+        try:
+            self.assertTrue(restarted.flush(timeout=5))
+            self.assertIsNone(restarted.resolve("lost0000ticket01").error)
+            self.assertEqual(restarted.stats()["committed"], 1)
+        finally:
+            restarted.stop()
+
+    def test_failing_batches_are_recorded_not_retried_forever(self):
+        def fail(batch, error=sqlite3.OperationalError("database is locked")):
+            raise error
+        self.queue._commit = fail
+        self.queue.max_retries = 2
+        locked = self.queue.enqueue(walk_in("LOCKED-1"))
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertIn("locked", self.queue.resolve(locked).error)
+        self.assertEqual((self.queue.stats()["retries"], self.queue.stats()["failed"]), (2, 1))
+
+        self.queue._commit = lambda batch: fail(batch, sqlite3.DatabaseError("malformed row"))
+        broken = self.queue.enqueue(walk_in("BROKEN-1"))
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertEqual(self.queue.resolve(broken).error, "malformed row")
+        self.assertEqual(self.queue.stats()["retries"], 2)  # Permanent errors are not retried
+
+    def test_writer_stops_when_outcomes_cannot_be_recorded(self):
+        with DB().transaction() as db:
+            db.execute("ALTER TABLE intake_tickets RENAME TO intake_tickets_away")
+        ticket = self.queue.enqueue(walk_in("NOTABLE-1"))
+        self.assertFalse(self.queue.flush(timeout=5))
+        self.assertFalse(self.queue.running)
+        with self.assertRaises(RuntimeError):
+            self.queue.enqueue(walk_in("NOTABLE-2"))
+
+        with DB().transaction() as db:
+            db.execute("ALTER TABLE intake_tickets_away RENAME TO intake_tickets")
+        self.queue.start()  # Replays the journaled record
+        self.assertTrue(self.queue.flush(timeout=5))
+        self.assertIsNone(self.queue.resolve(ticket).error)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
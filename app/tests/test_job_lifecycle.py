@@ -0,0 +1,91 @@
+# tests/test_job_lifecycle.py
+import sqlite3
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.db.migrations import MIGRATIONS, Migrator
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.job_status import JobStatus
+from app.models.technician import Technician
+from app.services.metrics_service import MetricsService
+from app.utils.utils import Utils
+
+class TestJobLifecycle(DatabaseTestCase):
+    def setUp(self):
+        customer_id = Customer("Lifecycle Customer", Utils.generate_random_email()).save()
+        self.equipment_id = Equipment(customer_id, "Console", "LIFE-0001").save()
+        self.technician_id = Technician("Lifecycle Tech", Utils.generate_random_email(), "Consoles").save()
+
+    def test_parse_accepts_labels_names_and_numbers(self):
+        for value in ("Job Assessed", "assessed", "2", 2, JobStatus.ASSESSED):
+            self.assertIs(JobStatus.parse(value), JobStatus.ASSESSED)
+        with self.assertRaises(ValueError):
+            JobStatus.parse("Job Cancelled")
+
+    def test_only_legal_transitions_are_applied_and_logged(self):
+        job_id = Job("No picture", technician_id=self.technician_id, equipment_id=self.equipment_id).save()
+        self.assertFalse(Job.update_cost(job_id, 30))  # Created jobs cannot skip assessment
+        self.assertEqual(Job.update_status_for_technician([job_id], self.technician_id, JobStatus.COMPLETED),
+                         ([], [job_id]))
+        self.assertEqual(Job.update_status_for_technician([job_id], self.technician_id), ([job_id], []))
+        self.assertEqual(Job.update_status_for_technician([job_id], self.technician_id), ([], [job_id]))
+        self.assertTrue(Job.update_cost(job_id, 30))
+        self.assertFalse(Job.update_cost(job_id, 99))
+        with self.assertRaises(ValueError):  # Reaches the caller instead of a False return
+            Job.update_status_for_technician([job_id], self.technician_id, "Job Cancelled")
+
+        history = Job.history(job_id)
+        self.assertEqual([event.status for event in history],
+                         [JobStatus.CREATED, JobStatus.ASSESSED, JobStatus.COMPLETED])
+        self.assertEqual(sorted(event.at for event in history), [event.at for event in history])
+        with DB().connection() as db:
+            self.assertEqual(db.execute("SELECT job_cost FROM jobs WHERE id = ?", (job_id,)).fetchone()[0], 30)
+
+    def test_event_log_is_append_only(self):
+        job_id = Job("Disc stuck", technician_id=self.technician_id, equipment_id=self.equipment_id).save()
+        for statement in ("UPDATE job_events SET at = 0 WHERE job_id = ?", "DELETE FROM job_events WHERE job_id = ?"):
+            with self.assertRaises(sqlite3.IntegrityError):
+                with DB().transaction() as db:
+                    db.execute(statement, (job_id,))
+        self.assertEqual(len(Job.history(job_id)), 1)
+
+    def test_turnaround_and_sla_breaches_use_event_times(self):
+        job_ids = Job.save_many([Job("Overheats", technician_id=self.technician_id, equipment_id=self.equipment_id)
+                                 for _ in range(3)])
+        Job.update_status_for_technician(job_ids, self.technician_id)
+        Job.update_cost(job_ids[0], 50)
+        Job.update_cost(job_ids[1], 50)
+        with DB().connection() as db:
+            since = db.execute("SELECT MIN(at) FROM job_events WHERE job_id = ?", (job_ids[0],)).fetchone()[0]
+
+        turnaround = MetricsService.turnaround(since=since)
+        self.assertGreaterEqual(turnaround["jobs"], 2)
+        self.assertLess(turnaround["max_hours"], 1)
+        breaches = {job_id: reached_end for job_id, _, reached_end in MetricsService.sla_breaches(1, now=since + 7200)}
+        self.assertEqual(breaches.get(job_ids[2]), False)
+        self.assertNotIn(job_ids[0], breaches)
+
+    def test_migration_converts_text_statuses(self):
+        connection = sqlite3.connect(":memory:", isolation_level=None)
+        Migrator(connection, [m for m in MIGRATIONS if m.version <= 7]).migrate()
+        connection.execute("INSERT INTO equipment (customer_id, type, serial_number) VALUES (1, 'Radio', 'R-1')")
+        connection.executemany(
+            "INSERT INTO jobs (equipment_id, technician_id, description, status, job_cost, created_at) "
+            "VALUES (1, 1, 'Static', ?, ?, '2025-01-01 10:00:00')",
+            [("Job Created", 0), ("Job Assessed", 0), ("Job Completed", 40)]
+        )
+        Migrator(connection).migrate()
+
+        self.assertEqual(connection.execute("SELECT status FROM jobs ORDER BY id").fetchall(), [(1,), (2,), (3,)])
+        self.assertEqual(connection.execute("SELECT status, jobs, revenue FROM job_status_counts ORDER BY status")
+                         .fetchall(), [(1, 1, 0.0), (2, 1, 0.0), (3, 1, 40.0)])
+        self.assertEqual(connection.execute("SELECT job_id, status FROM job_events ORDER BY id").fetchall(),
+                         [(1, 1), (2, 1), (3, 1), (2, 2), (3, 3)])
+        connection.execute("UPDATE jobs SET status = 2 WHERE id = 1")
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM job_events WHERE job_id = 1").fetchone()[0], 2)
+        self.assertEqual(connection.execute("SELECT jobs FROM job_status_counts WHERE status = 2").fetchone()[0], 2)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
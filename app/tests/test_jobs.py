@@ -1,12 +1,14 @@
 # tests/test_jobs.py
 import unittest
+from app.db.testing import DatabaseTestCase
 from app.models.job import Job
+from app.models.job_status import JobStatus
 from app.models.customer import Customer
 from app.models.technician import Technician
 from app.models.equipment import Equipment
 from app.utils.utils import Utils
 
-class TestJob(unittest.TestCase):
+class TestJob(DatabaseTestCase):
     def test_job_creation(self):
         utils = Utils
         customer = Customer('Guest Customer',utils.generate_random_email())
@@ -20,5 +22,38 @@ class TestJob(unittest.TestCase):
         jobs = Job.get_all()
         self.assertTrue(any(j[3] == "Replace battery" for j in jobs))
 
+    def test_batch_status_update_reports_skipped_jobs(self):
+        utils = Utils
+        customer_id = Customer('Batch Customer',utils.generate_random_email()).save()
+        technician_id = Technician('Batch Technician',utils.generate_random_email(),'tech').save()
+        other_technician_id = Technician('Other Technician',utils.generate_random_email(),'tech').save()
+        equipment_id = Equipment(customer_id=customer_id,type="phone",serial_number="BATCH-1").save()
+        own_ids = Job.save_many(Job("Screen crack","Job Created",technician_id,equipment_id) for _ in range(1200))
+        other_id = Job("Screen crack","Job Created",other_technician_id,equipment_id).save()
+        updated, skipped = Job.update_status_for_technician(own_ids + [other_id, -1], technician_id)
+        self.assertEqual(updated, own_ids)
+        self.assertEqual(skipped, [other_id, -1])
+        statuses = {row.id: row.status for row in Job.get_by_technician(technician_id)}
+        self.assertTrue(all(statuses[job_id] == JobStatus.ASSESSED for job_id in own_ids))
+
+    def test_keyset_pages_cover_every_job_once(self):
+        utils = Utils
+        customer_id = Customer('Paging Customer',utils.generate_random_email()).save()
+        technician_id = Technician('Paging Technician',utils.generate_random_email(),'tech').save()
+        equipment_id = Equipment(customer_id=customer_id,type="tablet",serial_number="PAGE-1").save()
+        job_ids = Job.save_many(Job(f"Issue {i}","Job Created",technician_id,equipment_id) for i in range(45))
+        seen = []
+        after_id = None
+        while True:
+            page, after_id = Job.get_page(after_id=after_id, limit=10, technician_id=technician_id)
+            self.assertLessEqual(len(page), 10)
+            seen.extend(row.id for row in page)
+            if after_id is None:
+                break
+        self.assertEqual(seen, job_ids)
+        streamed = [row.id for row in Job.iter_all(batch_size=7, customer_id=customer_id)]
+        self.assertEqual(streamed, job_ids)
+        self.assertEqual(Job.get_page(limit=5, technician_id=technician_id, created_since="2000-01-01")[0][0].customer_name, 'Paging Customer')
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,48 @@
+# tests/test_metrics.py
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.technician import Technician
+from app.services.metrics_service import MetricsService
+from app.utils.utils import Utils
+
+class TestMetrics(DatabaseTestCase):
+    def setUp(self):
+        customer_id = Customer("Metrics Customer", Utils.generate_random_email()).save()
+        self.equipment_id = Equipment(customer_id, "Tablet", "MET-1001").save()
+        self.technician_id = Technician("Metrics Tech", Utils.generate_random_email(), "Tablets").save()
+
+    def test_summaries_follow_job_writes(self):
+        before = MetricsService.summary()
+        job_ids = Job.save_many([Job("Cracked glass", "Job Created", self.technician_id, self.equipment_id)
+                                 for _ in range(3)])
+        Job.update_status_for_technician(job_ids[:2], self.technician_id)
+        Job.update_cost(job_ids[0], 80.0)
+
+        after = MetricsService.summary()
+        self.assertEqual(after["total_jobs"] - before["total_jobs"], 3)
+        self.assertEqual(after["backlog"] - before["backlog"], 2)
+        self.assertAlmostEqual(after["revenue"] - before["revenue"], 80.0)
+        load = MetricsService.technician_load(self.technician_id)
+        self.assertEqual((load.name, load.open_jobs, load.completed_jobs, load.revenue), ("Metrics Tech", 2, 1, 80.0))
+
+        with DB().transaction() as db:
+            db.execute("DELETE FROM jobs WHERE id = ?", (job_ids[0],))
+        self.assertEqual(MetricsService.technician_load(self.technician_id).completed_jobs, 0)
+        self.assertEqual(MetricsService.verify(), [])
+
+    def test_rebuild_repairs_drift(self):
+        Job("Loose port", "Job Created", self.technician_id, self.equipment_id).save()
+        with DB().transaction() as db:
+            db.execute("UPDATE technician_load SET open_jobs = open_jobs + 5 WHERE technician_id = ?",
+                       (self.technician_id,))
+        self.assertNotEqual(MetricsService.verify(), [])
+        MetricsService.rebuild()
+        self.assertEqual(MetricsService.verify(), [])
+        self.assertEqual(MetricsService.technician_load(self.technician_id).open_jobs, 1)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
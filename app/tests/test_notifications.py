@@ -0,0 +1,98 @@
+# tests/test_notifications.py
+import asyncio
+import sqlite3
+import time
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.technician import Technician
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_transports import Transport
+from app.utils.utils import Utils
+
+class FlakyTransport(Transport):
+    """Fails the first delivery of each message, then records the rest."""
+
+    def __init__(self):
+        self.failed_once = set()
+        self.delivered = []
+
+    async def send(self, recipient, message):
+        if (recipient, message) not in self.failed_once:
+            self.failed_once.add((recipient, message))
+            raise ConnectionError("relay unavailable")
+        self.delivered.append((recipient, message))
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+def outbox_rows(email):
+    with DB().connection() as db:
+        return db.execute(
+            "SELECT status, attempts, message FROM notification_outbox WHERE recipient = ? ORDER BY id", (email,)
+        ).fetchall()
+
+class TestNotificationOutbox(DatabaseTestCase):
+    def test_status_changes_queue_and_dispatch_with_retry(self):
+        email = Utils.generate_random_email()
+        customer_id = Customer("Outbox Customer", email).save()
+        technician_id = Technician("Outbox Technician", Utils.generate_random_email(), "tech").save()
+        equipment_id = Equipment(customer_id, "laptop", "OUTBOX-1").save()
+        job_id = Job("Fan noise", "Job Created", technician_id, equipment_id).save()
+
+        Job.update_status_for_technician([job_id], technician_id)
+        Job.update_status_for_technician([job_id], technician_id)  # Same status again is de-duplicated
+        Job.update_cost(job_id, 80)
+        rows = outbox_rows(email)
+        self.assertEqual(len(rows), 2)
+        self.assertIn("Final cost: 80.00", rows[1][2])
+
+        clock = FakeClock()
+        transport = FlakyTransport()
+        dispatcher = NotificationDispatcher(transport, base_delay=10, clock=clock)
+        asyncio.run(dispatcher.drain())
+        self.assertEqual([row[0] for row in outbox_rows(email)], ["pending", "pending"])
+
+        clock.now += 3600
+        asyncio.run(dispatcher.drain())
+        self.assertEqual([row[:2] for row in outbox_rows(email)], [("sent", 2), ("sent", 2)])
+        self.assertEqual(sum(1 for recipient, _ in transport.delivered if recipient == email), 2)
+        self.assertGreaterEqual(dispatcher.stats()["retried"], 2)
+
+class TestNotificationDispatcher(unittest.TestCase):
+    def test_lease_outlasts_the_slowest_batch(self):
+        dispatcher = NotificationDispatcher(FlakyTransport(), batch_size=100, concurrency=10, send_timeout=30)
+        self.assertGreater(dispatcher.lease, 10 * 30)
+        with self.assertRaises(ValueError):
+            NotificationDispatcher(FlakyTransport(), batch_size=100, concurrency=10, send_timeout=30, lease=60)
+        with self.assertRaises(TypeError):
+            Transport()  # send() is abstract
+
+    def test_run_survives_a_failed_batch(self):
+        dispatcher = NotificationDispatcher(FlakyTransport())
+        outcomes = [sqlite3.OperationalError("database is locked"), 0]
+
+        async def main():
+            stop_event = asyncio.Event()
+
+            async def dispatch_once():
+                outcome = outcomes.pop(0)
+                if isinstance(outcome, Exception):
+                    raise outcome
+                stop_event.set()
+                return outcome
+            dispatcher.dispatch_once = dispatch_once
+            await asyncio.wait_for(dispatcher.run(poll_interval=0.001, stop_event=stop_event), 5)
+
+        asyncio.run(main())
+        self.assertEqual((outcomes, dispatcher.stats()["errors"]), ([], 1))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+# tests/test_parts.py
+import unittest
+from app.db.db import DB
+from app.db.query_plan import QueryRecorder, check_query_plans
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.part import Part
+from app.models.supplier import Supplier
+from app.models.technician import Technician
+from app.services.supplier_manager import SupplierManager
+from app.utils.exceptions import InsufficientStockException
+from app.utils.utils import Utils
+
+class TestPartsCatalog(DatabaseTestCase):
+    def setUp(self):
+        self.north = Supplier("North Parts", "Battery", "Leeds").save()
+        self.south = Supplier("South Parts", "Battery", "Bristol").save()
+        self.battery = Part("BAT-100", "Laptop battery", "Battery", reorder_threshold=5).save()
+        self.screen = Part("SCR-200", "13in panel", "Screen").save()
+        customer_id = Customer("Parts Customer", Utils.generate_random_email()).save()
+        equipment_id = Equipment(customer_id, "Laptop", "PARTS-0001").save()
+        self.technician_id = Technician("Parts Tech", Utils.generate_random_email(), "Laptops").save()
+        self.job_id = Job("Dead battery", technician_id=self.technician_id, equipment_id=equipment_id).save()
+
+    def test_availability_by_part_type_and_location(self):
+        SupplierManager.adjust_stock([(self.battery, self.north, 4), (self.battery, self.south, 9),
+                                      (self.screen, self.north, 2)])
+        stock = SupplierManager.availability(part_type="battery")
+        self.assertEqual([(row.supplier_name, row.available) for row in stock],
+                         [("South Parts", 9), ("North Parts", 4)])
+        stock = SupplierManager.availability(part_type="BATTERY", location="leeds")
+        self.assertEqual([(row.sku, row.on_hand) for row in stock], [("BAT-100", 4)])
+        self.assertEqual([row.name for row in Supplier.find(location="BRISTOL")], ["South Parts"])
+
+    def test_bulk_adjust_applies_thousands_of_movements_at_once(self):
+        movements = [(self.battery, self.north, 3), (self.battery, self.north, -1)] * 2000
+        self.assertEqual(SupplierManager.adjust_stock(movements), 1)
+        self.assertEqual(SupplierManager.availability(sku="BAT-100")[0].on_hand, 4000)
+
+    def test_write_offs_reduce_existing_stock(self):
+        SupplierManager.adjust_stock([(self.battery, self.north, 5)])
+        self.assertEqual(SupplierManager.adjust_stock([(self.battery, self.north, -2)]), 1)
+        self.assertEqual(SupplierManager.availability(sku="BAT-100")[0].on_hand, 3)
+        SupplierManager.adjust_stock([(self.battery, self.north, -3)])
+        self.assertEqual(SupplierManager.availability(sku="BAT-100")[0].on_hand, 0)
+
+    def test_bulk_adjust_is_all_or_nothing(self):
+        SupplierManager.adjust_stock([(self.battery, self.north, 2)])
+        with self.assertRaises(InsufficientStockException) as caught:
+            SupplierManager.adjust_stock([(self.screen, self.north, 10), (self.battery, self.north, -3)])
+        self.assertEqual(caught.exception.shortages, [(self.battery, self.north, 2, 3)])
+        with self.assertRaises(ValueError):
+            SupplierManager.adjust_stock([(self.screen, self.north, 10), (self.screen, -1, 1)])
+        self.assertEqual([(row.sku, row.on_hand) for row in SupplierManager.availability()], [("BAT-100", 2)])
+
+    def test_reservations_hold_stock_until_the_job_completes(self):
+        SupplierManager.adjust_stock([(self.battery, self.north, 3), (self.battery, self.south, 1)])
+        reservation_id = SupplierManager.reserve(self.job_id, self.battery, quantity=2)
+        kept = SupplierManager.reserve(self.job_id, self.battery, quantity=1, location="Bristol")
+        with self.assertRaises(InsufficientStockException):
+            SupplierManager.reserve(self.job_id, self.battery, quantity=2, supplier_id=self.north)
+        with self.assertRaises(InsufficientStockException):
+            SupplierManager.adjust_stock([(self.battery, self.north, -2)])  # Reserved parts stay put
+
+        self.assertTrue(SupplierManager.release(reservation_id))
+        self.assertFalse(SupplierManager.release(reservation_id))
+        self.assertEqual(SupplierManager.availability(location="Leeds")[0].available, 3)
+
+        Job.update_status_for_technician([self.job_id], self.technician_id)
+        self.assertTrue(Job.update_cost(self.job_id, 120))
+        south = SupplierManager.availability(location="Bristol")[0]
+        self.assertEqual((south.on_hand, south.reserved), (0, 0))
+        self.assertIsNotNone(SupplierManager.reservations_for_job(self.job_id)[1].consumed_at)
+        self.assertEqual(SupplierManager.reservations_for_job(self.job_id)[1].id, kept)
+        with self.assertRaises(ValueError):
+            SupplierManager.reserve(self.job_id, self.battery)
+
+    def test_reservations_skip_removed_suppliers_and_other_technicians_jobs(self):
+        SupplierManager.adjust_stock([(self.battery, self.north, 3), (self.battery, self.south, 9)])
+        SupplierManager.adjust_stock([(self.battery, self.south, -9)])  # Its empty stock row stays
+        self.assertEqual(Supplier.remove_suppliers_by_ids([self.south])[0], [self.south])
+        self.assertEqual([row.supplier_name for row in SupplierManager.availability(part_type="Battery")],
+                         ["North Parts"])
+        with self.assertRaises(ValueError):
+            SupplierManager.adjust_stock([(self.battery, self.south, 5)])
+        with self.assertRaises(ValueError):
+            SupplierManager.reserve(self.job_id, self.battery, supplier_id=self.south)
+        reservation_id = SupplierManager.reserve(self.job_id, self.battery, technician_id=self.technician_id)
+        self.assertEqual(SupplierManager.reservations_for_job(self.job_id)[0].supplier_id, self.north)
+
+        other_id = Technician("Other Tech", Utils.generate_random_email(), "Phones").save()
+        with self.assertRaises(ValueError):
+            SupplierManager.reserve(self.job_id, self.battery, technician_id=other_id)
+        self.assertEqual([row.id for row in SupplierManager.reservations_for_job(self.job_id)], [reservation_id])
+
+    def test_parts_below_reorder_threshold(self):
+        SupplierManager.adjust_stock([(self.battery, self.north, 4), (self.screen, self.north, 1)])
+        self.assertEqual([(row.sku, row.available) for row in SupplierManager.below_reorder()], [("BAT-100", 4)])
+        SupplierManager.adjust_stock([(self.battery, self.south, 2)])
+        self.assertEqual(SupplierManager.below_reorder(), [])
+
+    def test_lookups_use_the_indexes(self):
+        with DB().connection() as db:
+            with QueryRecorder(db) as recorder:
+                SupplierManager.availability(part_type="Battery")
+                SupplierManager.availability(location="Leeds")
+                SupplierManager.availability(sku="BAT-100")
+                SupplierManager.reservations_for_job(self.job_id)
+                Part.get_by_type("Screen")
+                Supplier.find(part_type="Battery")
+                Supplier.find(location="Leeds")
+            violations = check_query_plans(db, recorder.statements)
+        self.assertEqual(violations, [])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,35 @@
+# tests/test_profiler.py
+import unittest
+from app.db.testing import DatabaseTestCase
+from app.db.instrumentation import fingerprint, profiler
+from app.models.job import Job
+from app.models.technician import Technician
+
+class TestQueryProfiler(DatabaseTestCase):
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+
+    def test_fingerprint_groups_literals_and_in_lists(self):
+        self.assertEqual(fingerprint("SELECT * FROM jobs WHERE id IN (?, ?, ?) AND status = 'x'"),
+                         fingerprint("SELECT *  FROM jobs WHERE id IN (?) AND status = 'y'"))
+
+    def test_records_call_site_rows_and_slow_queries(self):
+        Technician.get_all()  # Opens the read pool, whose connection PRAGMAs would be counted too
+        profiler.reset()
+        profiler.enable(slow_threshold_ms=0)
+        Technician.get_all()
+        Job.get_by_technician(-1)
+        queries = {q["call_site"]: q for q in profiler.snapshot()["queries"]}
+        self.assertIn("Technician.get_all", queries)
+        self.assertEqual(queries["Job.get_by_technician"]["rows"], 0)
+        self.assertEqual(queries["Technician.get_all"]["rows"], len(Technician.get_all()))
+        self.assertTrue(profiler.slow_queries)
+
+        profiler.disable()
+        profiler.reset()
+        Technician.get_all()
+        self.assertEqual(profiler.snapshot()["queries"], [])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,121 @@
+# tests/test_query_plans.py
+import sqlite3
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.db.migrations import Migrator
+from app.db.query_plan import QueryRecorder, check_query_plans, trigger_statements
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.part import Part
+from app.models.supplier import Supplier
+from app.models.technician import Technician
+from app.services.cost_estimator import CostEstimator
+from app.services.intake_queue import IntakeQueue
+from app.services.metrics_service import MetricsService
+from app.services.scheduler import JobScheduler
+from app.services.search_service import SearchService
+from app.services.serial_registry import serial_registry
+from app.services.supplier_manager import SupplierManager
+from app.utils.utils import Utils
+
+class TestMigrations(unittest.TestCase):
+    def test_migrations_are_versioned_and_idempotent(self):
+        connection = sqlite3.connect(":memory:")
+        migrator = Migrator(connection)
+        applied = migrator.migrate()
+        self.assertEqual(applied[-1], migrator.latest_version())
+        self.assertEqual(migrator.migrate(), [])
+        self.assertEqual(migrator.current_version(), migrator.latest_version())
+        indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn("idx_customers_email", indexes)
+        self.assertIn("idx_jobs_status", indexes)
+        connection.close()
+
+class TestQueryPlans(DatabaseTestCase):
+    def test_model_queries_do_not_scan_whole_tables(self):
+        with DB().connection() as db:
+            with QueryRecorder(db) as recorder:
+                Customer.get_all()
+                Customer.find_by_email("nobody@example.com")
+                Equipment.get_by_customer(-1)
+                Equipment.find_by_serial("SN-0000")
+                Job.get_all()
+                Job.get_page(after_id=1, limit=5)
+                Job.get_page(limit=5, status="Job Created")
+                Job.get_page(limit=5, customer_id=-1)
+                Job.get_page(limit=5, technician_id=-1)
+                Job.get_page(limit=5, created_since="2000-01-01", created_before="2000-02-01")
+                Job.get_by_technician(-1)
+                Job.get_assessed_jobs()
+                Job.update_status_for_technician([-1], -1)
+                Job.update_cost(-1, 0)
+                Technician.get_all()
+                Technician.find_by_email("nobody@example.com")
+                Technician.get_by_id(-1)
+                Supplier.get_all()
+                Supplier.remove_suppliers_by_ids([-1])
+                SearchService.search("battery", kinds=("supplier",))
+                SearchService.search_jobs("battery")
+                JobScheduler().assign_backlog(limit=0)
+            violations = check_query_plans(db, recorder.statements)
+        self.assertEqual(violations, [])
+
+    def test_parts_and_supplier_queries_do_not_scan_whole_tables(self):
+        supplier_id = Supplier("Plan Parts", "Battery", "Leeds").save()
+        part_id = Part("PLAN-1", "Plan battery", "Battery").save()
+        customer_id = Customer("Plan Customer", Utils.generate_random_email()).save()
+        technician_id = Technician("Plan Tech", Utils.generate_random_email(), "Laptops").save()
+        job_id = Job("Plan battery swap", technician_id=technician_id,
+                     equipment_id=Equipment(customer_id, "Laptop", "PLAN-0001").save()).save()
+        with DB().connection() as db:
+            with QueryRecorder(db) as recorder:
+                Part.find_by_sku("PLAN-1")
+                Part.get_by_type("Battery")
+                Part.set_reorder_threshold(part_id, 1)
+                SupplierManager.adjust_stock([(part_id, supplier_id, 3)])
+                SupplierManager.availability(part_type="Battery", location="Leeds")
+                SupplierManager.availability(sku="PLAN-1")
+                SupplierManager.release(SupplierManager.reserve(job_id, part_id, location="Leeds",
+                                                                technician_id=technician_id))
+                SupplierManager.reserve(job_id, part_id, supplier_id=supplier_id)
+                SupplierManager.reservations_for_job(job_id)
+                SupplierManager.below_reorder()
+                Job.update_status_for_technician([job_id], technician_id)
+                Job.update_cost(job_id, 90)  # Completes the job: the consumption trigger runs
+                SupplierManager.adjust_stock([(part_id, supplier_id, -2)])
+                Supplier.remove_suppliers_by_ids([supplier_id])
+                Supplier.purge_deleted()
+                Supplier.remove_suppliers_by_ids([Supplier("Plan Spare", "Fans", "Hull").save()], soft=False)
+            statements = recorder.statements + trigger_statements(db, "jobs")
+            violations = check_query_plans(db, statements)
+        self.assertEqual(violations, [])
+
+    def test_reporting_and_intake_queries_do_not_scan_whole_tables(self):
+        estimator = CostEstimator()
+        serial_registry.sync()  # Loading every serial once is a scan by design; later syncs are not
+        with DB().connection() as db:
+            with QueryRecorder(db) as recorder:
+                MetricsService.summary()
+                MetricsService.revenue(None)
+                MetricsService.technician_load()
+                MetricsService.technician_load(-1)
+                MetricsService.verify()
+                MetricsService.turnaround(since=0)
+                MetricsService.sla_breaches(24)
+                Job.history(-1)
+                estimator.sync()  # First use rebuilds
+                estimator.sync()
+                estimator.estimate_jobs([-1])
+                IntakeQueue._apply({"name": "Plan Intake", "email": Utils.generate_random_email(),
+                                    "equipment_type": "Phone", "serial_number": "PLAN-INTAKE-1",
+                                    "description": "Cracked screen"})
+                IntakeQueue().resolve("no-such-ticket")
+            statements = recorder.statements + trigger_statements(db, "jobs")
+            # The dashboard tables hold one row per status or per technician.
+            violations = check_query_plans(db, statements, small_tables=("job_status_counts", "technician_load"))
+        self.assertEqual(violations, [])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,44 @@
+# tests/test_read_replica.py
+import os
+import tempfile
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.supplier import Supplier
+from app.utils.utils import Utils
+
+class TestReadReplica(DatabaseTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        DB.use_snapshot(None)
+        self.tmp_dir.cleanup()
+
+    def test_reports_use_the_read_only_pool(self):
+        email = Utils.generate_random_email()
+        Customer("Replica Reader", email).save()
+        checkouts = DB.read_pool_stats().get("checkouts", 0)
+        self.assertIn(email, [row.email for row in Customer.get_all()])
+        self.assertEqual(DB.read_pool_stats()["checkouts"], checkouts + 1)
+        self.assertEqual(DB.read_pool_stats()["in_use"], 0)
+
+    def test_reads_inside_a_transaction_see_its_writes(self):
+        with DB().transaction():
+            supplier_id = Supplier("Pending Parts", "Fans", "Dock 4").save()
+            self.assertIn(supplier_id, [row.id for row in Supplier.get_all()])
+        Supplier.remove_suppliers_by_ids([supplier_id])
+
+    def test_snapshot_lags_until_refreshed(self):
+        snapshot = os.path.join(self.tmp_dir.name, "reports.db")
+        DB.use_snapshot(snapshot, max_age=3600)
+        before = len(Customer.get_all())  # The first report takes the snapshot
+        self.assertTrue(os.path.exists(snapshot))
+        Customer("Late Arrival", Utils.generate_random_email()).save()
+        self.assertEqual(len(Customer.get_all()), before)
+        DB.refresh_snapshot()
+        self.assertEqual(len(Customer.get_all()), before + 1)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
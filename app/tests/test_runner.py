@@ -0,0 +1,35 @@
+# tests/test_runner.py
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase, isolated_database
+from app.models.supplier import Supplier
+from app.tests.runner import discover_modules, run_module
+
+class TestIsolatedDatabases(DatabaseTestCase):
+    def test_each_test_starts_from_the_empty_template(self):
+        self.assertEqual(Supplier.get_all(), [])
+        Supplier("Isolated Parts", "Screws", "Bay 1").save()
+        outer = DB.path
+        with isolated_database() as inner:
+            self.assertNotEqual(inner, outer)
+            self.assertEqual(Supplier.get_all(), [])
+        self.assertEqual(DB.path, outer)
+        self.assertEqual(len(Supplier.get_all()), 1)
+
+class TestRunner(unittest.TestCase):
+    def test_discovers_modules_and_times_each_test(self):
+        modules = discover_modules()
+        self.assertIn("app.tests.test_runner", modules)
+        self.assertNotIn("app.tests.runner", modules)
+        records = run_module("app.tests.test_data_generator")
+        self.assertEqual({record["outcome"] for record in records}, {"ok"})
+        self.assertEqual(len(records), 2)
+        self.assertTrue(all(record["seconds"] >= 0 for record in records))
+
+    def test_import_errors_are_reported_not_raised(self):
+        [record] = run_module("app.tests.no_such_module")
+        self.assertEqual(record["outcome"], "ERROR")
+        self.assertIn("no_such_module", record["details"])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
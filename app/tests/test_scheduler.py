@@ -0,0 +1,63 @@
+# tests/test_scheduler.py
+import random
+import string
+import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.technician import Technician
+from app.services.scheduler import JobScheduler, keywords
+from app.utils.utils import Utils
+
+class TestJobScheduler(DatabaseTestCase):
+    def setUp(self):
+        # Fresh made-up device words keep earlier runs' technicians from matching. The fixed
+        # last letter keeps keywords() from stemming "{device}" and "{device}s" differently.
+        self.device = "zylo" + "".join(random.choices(string.ascii_lowercase, k=8)) + "x"
+        self.meter = "quartz" + "".join(random.choices(string.ascii_lowercase, k=8))
+        customer_id = Customer("Scheduler Customer", Utils.generate_random_email()).save()
+        self.scope_id = Equipment(customer_id, self.device, "SCH-0001").save()
+        self.meter_id = Equipment(customer_id, "Bench unit", "SCH-0002").save()
+        self.first, self.second, self.meter_tech = Technician.save_many([
+            Technician("Scope One", Utils.generate_random_email(), f"{self.device} calibration"),
+            Technician("Scope Two", Utils.generate_random_email(), f"{self.device}s"),
+            Technician("Meter Tech", Utils.generate_random_email(), f"{self.meter} repair"),
+        ])
+        self.scheduler = JobScheduler()
+
+    def test_keywords_normalize_expertise(self):
+        self.assertEqual(keywords("Smartphone screens"), {"smartphone", "screen"})
+        self.assertEqual(keywords("Networking and repair"), {"network"})
+
+    def test_matches_expertise_and_balances_open_jobs(self):
+        picks = [self.scheduler.create_job("Display drifts", self.scope_id)[1] for _ in range(4)]
+        self.assertEqual(sorted(picks), [self.first, self.first, self.second, self.second])
+        self.assertEqual(self.scheduler.create_job(f"{self.meter} reads high", self.meter_id)[1], self.meter_tech)
+
+        # Completing the first technician's jobs elsewhere shows up after a sync.
+        job_ids = [job.id for job in Job.get_by_technician(self.first)]
+        Job.update_status_for_technician(job_ids, self.first)
+        for job_id in job_ids:
+            self.assertTrue(Job.update_cost(job_id, 10))
+        self.scheduler.sync()
+        self.assertEqual(self.scheduler.choose(f"{self.device} noise"), self.first)
+
+    def test_assigns_backlog_in_one_batch(self):
+        job_ids = Job.save_many([Job(f"{self.device} will not boot", equipment_id=self.meter_id) for _ in range(6)])
+        assignments = dict(self.scheduler.assign_backlog())
+        self.assertEqual(sorted(assignments[job_id] for job_id in job_ids),
+                         [self.first] * 3 + [self.second] * 3)
+        with DB().connection() as db:
+            stored = dict(db.execute(
+                f"SELECT id, technician_id FROM jobs WHERE id IN ({', '.join('?' * len(job_ids))})", job_ids))
+        self.assertEqual(stored, {job_id: assignments[job_id] for job_id in job_ids})
+        self.assertEqual(self.scheduler.assign_backlog(), [])
+
+    def test_unknown_equipment_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.create_job("Anything", -1)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,29 @@
+# tests/test_search.py
+import unittest
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.supplier import Supplier
+from app.services.search_service import SearchService
+from app.utils.utils import Utils
+
+class TestSearch(DatabaseTestCase):
+    def test_search_finds_jobs_by_issue_customer_and_serial(self):
+        customer_id = Customer("Quillon Farthingale", Utils.generate_random_email()).save()
+        equipment_id = Equipment(customer_id, "laptop", "QX-778812").save()
+        job_id = Job("Hinge snapped after drop", equipment_id=equipment_id).save()
+
+        for text in ("hinge snap", "farthing", "QX-7788"):
+            self.assertIn(job_id, [job.id for job in SearchService.search_jobs(text)], text)
+
+        supplier_id = Supplier("Zephyrine Parts", "hinges", "Leeds").save()
+        results = SearchService.search("zephyr", kinds=("supplier",))
+        self.assertEqual([(r.kind, r.ref_id) for r in results], [("supplier", supplier_id)])
+
+    def test_user_input_is_never_fts_syntax(self):
+        self.assertEqual(SearchService.build_query('AND "x" OR-y*'), '"and"* "x"* "or"* "y"*')
+        self.assertEqual(SearchService.search('" * ( )'), [])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,121 @@
+# tests/test_serial_registry.py
+import sqlite3
+import unittest
+from app.db.db import DB
+from app.db.migrations import MIGRATIONS, Migrator
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.services.serial_registry import SerialRegistry
+from app.utils.bloom import BloomFilter
+from app.utils.exceptions import DuplicateSerialException
+from app.utils.utils import Utils
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f"SN{i}")
+        self.assertTrue(all(f"SN{i}" in bloom for i in range(2000)))
+        false_positives = sum(f"OTHER{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+        self.assertFalse(bloom.full)
+
+class TestSerialRegistry(DatabaseTestCase):
+    def setUp(self):
+        self.owner_id = Customer("Serial Owner", Utils.generate_random_email()).save()
+        self.registry = SerialRegistry()
+
+    def test_serial_keys_ignore_case_and_punctuation(self):
+        self.assertEqual(Utils.normalize_serial(" sn-12 ab/3 "), "SN12AB3")
+        self.assertIsNone(Utils.normalize_serial("--"))
+
+    def test_resubmitted_device_keeps_one_record_and_its_history(self):
+        equipment_id, history = self.registry.register(self.owner_id, "Laptop", "LT-5501-X")
+        self.assertIsNone(history)
+        job_id = Job("Fan noise", equipment_id=equipment_id).save()
+
+        again_id, history = self.registry.register(self.owner_id, "Laptop", "lt 5501 x")
+        self.assertEqual(again_id, equipment_id)
+        self.assertEqual((history.customer_id, history.customer_name), (self.owner_id, "Serial Owner"))
+        self.assertEqual([job.id for job in history.jobs], [job_id])
+        self.assertEqual(Equipment(self.owner_id, "Laptop", "LT5501X").save(), equipment_id)
+        self.assertEqual(len(Equipment.get_by_customer(self.owner_id)), 1)
+
+        other_id = Customer("Someone Else", Utils.generate_random_email()).save()
+        with self.assertRaises(DuplicateSerialException):
+            self.registry.register(other_id, "Laptop", "LT-5501-X")
+        with self.assertRaises(DuplicateSerialException):
+            Equipment(other_id, "Laptop", "LT-5501-X").save()
+
+    def test_new_serials_skip_the_database(self):
+        self.registry.register(self.owner_id, "Phone", "PH-1")
+        self.assertIsNone(self.registry.lookup("PH-2"))
+        self.assertIsNotNone(self.registry.lookup("ph1"))
+        stats = self.registry.stats()
+        self.assertEqual((stats["lookups"], stats["serials"]), (3, 1))
+        self.assertGreaterEqual(stats["skipped_queries"], 2)  # The first registration and PH-2
+
+        # Serials saved elsewhere are picked up on the next sync.
+        Equipment(self.owner_id, "Tablet", "TB-9").save()
+        self.registry.sync()
+        self.assertTrue(self.registry.seen("TB-9"))
+
+    def test_migration_merges_duplicate_devices(self):
+        connection = sqlite3.connect(":memory:")
+        Migrator(connection, [m for m in MIGRATIONS if m.version <= 9]).migrate()
+        connection.execute("INSERT INTO customers (name, email) VALUES ('Repeat', 'repeat@example.com')")
+        connection.executemany("INSERT INTO equipment (customer_id, type, serial_number) VALUES (1, 'Phone', ?)",
+                               [("AB-1",), ("ab 1",), ("CD-2",)])
+        connection.executemany("INSERT INTO jobs (equipment_id, description) VALUES (?, 'Repair')",
+                               [(1,), (2,), (3,)])
+        connection.commit()
+        Migrator(connection).migrate()
+
+        self.assertEqual(connection.execute("SELECT id, serial_key FROM equipment ORDER BY id").fetchall(),
+                         [(1, "AB1"), (3, "CD2")])
+        self.assertEqual(connection.execute("SELECT equipment_id FROM jobs ORDER BY id").fetchall(),
+                         [(1,), (1,), (3,)])
+        with self.assertRaises(sqlite3.IntegrityError):
+            connection.execute("INSERT INTO equipment (customer_id, type, serial_number, serial_key) "
+                               "VALUES (1, 'Phone', 'A-B-1', 'AB1')")
+        connection.close()
+
+    def test_migration_keeps_devices_of_different_owners_apart(self):
+        connection = sqlite3.connect(":memory:")
+        Migrator(connection, [m for m in MIGRATIONS if m.version <= 9]).migrate()
+        connection.executemany("INSERT INTO customers (name, email) VALUES (?, ?)",
+                               [("First", "first@example.com"), ("Second", "second@example.com")])
+        connection.executemany("INSERT INTO equipment (customer_id, type, serial_number) VALUES (?, 'Phone', '12345')",
+                               [(None,), (1,), (2,), (2,), (1,)])
+        connection.executemany("INSERT INTO jobs (equipment_id, description) VALUES (?, 'Repair')",
+                               [(1,), (2,), (3,), (4,), (5,)])
+        connection.commit()
+        Migrator(connection).migrate()
+
+        self.assertEqual(connection.execute("SELECT id, customer_id, serial_key FROM equipment ORDER BY id").fetchall(),
+                         [(1, None, "12345#"), (2, 1, "12345"), (3, 2, "12345#2")])
+        self.assertEqual(connection.execute("SELECT equipment_id FROM jobs ORDER BY id").fetchall(),
+                         [(1,), (2,), (3,), (3,), (2,)])
+        connection.close()
+
+    def test_owners_kept_apart_by_the_migration_can_resubmit(self):
+        other_id = Customer("Later Owner", Utils.generate_random_email()).save()
+        first_id = Equipment(self.owner_id, "Phone", "PH-777").save()
+        with DB().transaction() as db:  # As migration 10 leaves a serial two customers had registered
+            later_id = db.execute("INSERT INTO equipment (customer_id, type, serial_number, serial_key) "
+                                  "VALUES (?, 'Phone', 'PH-777', 'PH777#' || ?)", (other_id, other_id)).lastrowid
+        job_id = Job("Cracked screen", equipment_id=later_id).save()
+
+        self.assertEqual(Equipment(other_id, "Phone", "ph 777").save(), later_id)
+        equipment_id, history = self.registry.register(other_id, "Phone", "PH-777")
+        self.assertEqual((equipment_id, history.customer_id), (later_id, other_id))
+        self.assertEqual([job.id for job in history.jobs], [job_id])
+        self.assertEqual(self.registry.register(self.owner_id, "Phone", "PH-777")[0], first_id)
+        stranger_id = Customer("Stranger", Utils.generate_random_email()).save()
+        with self.assertRaises(DuplicateSerialException):
+            self.registry.register(stranger_id, "Phone", "PH-777")
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
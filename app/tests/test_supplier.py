@@ -1,13 +1,76 @@
 # tests/test_supplier.py
 import unittest
+from app.db.db import DB
+from app.db.testing import DatabaseTestCase
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.part import Part
 from app.models.supplier import Supplier
+from app.services.search_service import SearchService
+from app.services.supplier_manager import SupplierManager
+from app.utils.utils import Utils
+
+class TestSupplier(DatabaseTestCase):
+    def reservation_suppliers(self, supplier_ids):
+        with DB().connection() as db:
+            return [row[0] for row in db.execute(
+                "SELECT supplier_id FROM part_reservations WHERE supplier_id IN (%s)" % ", ".join("?" * len(supplier_ids)),
+                supplier_ids
+            )]
+
+    def released_reservation(self, supplier_id, part_id):
+        """Stocks ``supplier_id``, reserves a part for a new job, releases it and empties the shelf."""
+        customer_id = Customer("Parts Customer", Utils.generate_random_email()).save()
+        equipment_id = Equipment(customer_id, "Laptop", f"SUP-{supplier_id}").save()
+        job_id = Job("Needs a part", equipment_id=equipment_id).save()
+        SupplierManager.adjust_stock([(part_id, supplier_id, 1)])
+        SupplierManager.release(SupplierManager.reserve(job_id, part_id, supplier_id=supplier_id))
+        SupplierManager.adjust_stock([(part_id, supplier_id, -1)])
 
-class TestJob(unittest.TestCase):
     def test_supplier_creation(self):
         supplier = Supplier("Test Supplier","Test parts","Test Location")
         supplier.save()
         suppliers = Supplier.get_all()
         self.assertTrue(any(s[1] == "Test Supplier" for s in suppliers))
 
+    def test_removal_reports_removed_missing_and_in_use_ids(self):
+        idle = Supplier("Idle Parts", "Cables", "Hull").save()
+        stocked = Supplier("Stocked Parts", "Cables", "York").save()
+        part_id = Part("CAB-1", "USB-C cable", "Cables").save()
+        SupplierManager.adjust_stock([(part_id, stocked, 5)])
+
+        self.assertEqual(Supplier.remove_suppliers_by_ids([idle, stocked, -1, idle]), ([idle], [-1], [stocked]))
+        self.assertEqual(Supplier.remove_suppliers_by_ids([idle]), ([], [idle], []))
+        self.assertNotIn(idle, [row.id for row in Supplier.get_all()])
+        self.assertEqual([row.id for row in Supplier.find(part_type="cables")], [stocked])
+        self.assertEqual(SearchService.search("Idle Parts", kinds=("supplier",)), [])
+        with self.assertRaises(ValueError):
+            SupplierManager.adjust_stock([(part_id, idle, 1)])  # Removed suppliers take no stock
+
+        SupplierManager.adjust_stock([(part_id, stocked, -5)])
+        self.released_reservation(stocked, part_id)
+        self.assertEqual(Supplier.remove_suppliers_by_ids([stocked], soft=False), ([stocked], [], []))
+        self.assertEqual(SupplierManager.availability(sku="CAB-1"), [])
+        self.assertEqual(self.reservation_suppliers([stocked]), [])
+
+    def test_purge_compacts_tombstones_in_batches(self):
+        ids = Supplier.save_many(Supplier(f"Old Supplier {i}", "Fans", "Derby") for i in range(25))
+        part_id = Part("FAN-1", "Cooling fan", "Fans").save()
+        for supplier_id in (ids[0], ids[19], ids[20]):
+            self.released_reservation(supplier_id, part_id)
+        self.assertEqual(Supplier.remove_suppliers_by_ids(ids[:20])[0], ids[:20])
+        self.assertEqual(Supplier.purge_deleted(older_than=3600), 0)  # Too recent
+        self.assertEqual(Supplier.purge_deleted(batch_size=6), 20)
+        with DB().connection() as db:
+            remaining = [row[0] for row in db.execute("SELECT id FROM suppliers WHERE id IN (%s)" % ", ".join("?" * 25), ids)]
+        self.assertEqual(remaining, ids[20:])
+        self.assertEqual(self.reservation_suppliers(ids), [ids[20]])
+
+    def test_purge_batches_larger_than_the_bound_parameter_limit(self):
+        ids = Supplier.save_many(Supplier(f"Bulk Supplier {i}", "Fans", "Derby") for i in range(1200))
+        Supplier.remove_suppliers_by_ids(ids)
+        self.assertEqual(Supplier.purge_deleted(batch_size=DB.max_bound_parameters + 101), 1200)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
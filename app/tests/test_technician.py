@@ -1,9 +1,10 @@
 # tests/test_customer.py
 import unittest
+from app.db.testing import DatabaseTestCase
 from app.models.technician import Technician
 from app.utils.utils import Utils
 
-class TestJob(unittest.TestCase):
+class TestJob(DatabaseTestCase):
     def test_technician_creation(self):
         utils = Utils
         technician = Technician("Test Technician",utils.generate_random_email(),"Test")
@@ -0,0 +1,43 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Set membership in about ``-ln(error_rate) / ln(2)**2`` bits per item.
+
+    ``item in bloom`` is never wrong when it says no; it says yes for an item that was
+    never added with probability ``error_rate`` while at most ``capacity`` items are held.
+    Items are strings.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("Bloom filter capacity must be positive and error_rate between 0 and 1.")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Two halves of one digest generate every position (Kirsch-Mitzenmacher).
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def full(self):
+        """True once more items were added than it was sized for; the error rate climbs."""
+        return self.count > self.capacity
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()  # Distinguishes "not cached" from a cached None
+
+_caches = {}
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with an optional time-to-live per entry.
+
+    Only this process sees invalidations, so ``ttl`` bounds how long another process's
+    writes can go unnoticed.
+
+    Read-through callers take ``generation()`` before querying and pass it to ``set()``:
+    if the key was invalidated in between (a save committed while the query ran), the
+    possibly stale result is not cached.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=300.0, clock=time.monotonic):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._invalidated = OrderedDict()  # key -> generation of its latest invalidation
+        self._forgotten = 0  # Newest generation dropped from _invalidated
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        _caches[name] = self
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self):
+        """A token for ``set()``, taken before reading the value to cache."""
+        with self._lock:
+            return self._generation
+
+    def set(self, key, value, generation=None):
+        """Caches ``value``; returns False (caching nothing) if ``key`` was invalidated
+        after ``generation`` was taken."""
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and self._invalidated.get(key, self._forgotten) > generation:
+                return False
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+                self._generation += 1
+                self._invalidated[key] = self._generation
+                self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self.maxsize:
+                # Forgetting a key's stamp makes it look just invalidated: safe, only slower.
+                _, self._forgotten = self._invalidated.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+            self._invalidated.clear()
+            self._forgotten = self._generation
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def cache_stats():
+    """Returns the counters of every cache created in this process, keyed by name."""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def clear_caches():
+    for cache in _caches.values():
+        cache.clear()
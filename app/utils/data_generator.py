@@ -0,0 +1,80 @@
+import random
+
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.job_status import JobStatus
+from app.models.supplier import Supplier
+from app.models.technician import Technician
+from app.utils.utils import Utils
+
+FIRST_NAMES = ["Ada", "Bola", "Chen", "Dara", "Emeka", "Farah", "Goran", "Hana", "Ines", "Jomo",
+               "Kiri", "Lena", "Mateo", "Nia", "Omar", "Priya", "Quinn", "Rosa", "Sanjay", "Tove"]
+LAST_NAMES = ["Adeyemi", "Brandt", "Costa", "Duarte", "Eriksen", "Fischer", "Garcia", "Haddad",
+              "Ivanova", "Jensen", "Kowalski", "Lindqvist", "Moreau", "Nakamura", "Okafor", "Patel"]
+EQUIPMENT_TYPES = ["Laptop", "Smartphone", "Tablet", "Desktop", "Printer", "Monitor", "Router", "Smartwatch"]
+ISSUES = ["Cracked screen", "Battery not charging", "Will not power on", "Overheating under load",
+          "Water damage", "Keyboard keys unresponsive", "No network connection", "Fan noise",
+          "Hinge snapped", "Speaker distorted", "Stuck in boot loop", "Touchscreen ghost input"]
+EXPERTISE = ["Laptop repair", "Smartphone screens", "Board-level soldering", "Printers",
+             "Networking", "Battery replacement", "Data recovery"]
+PART_TYPES = ["Screens", "Batteries", "Keyboards", "Hinges", "Fans", "Chargers", "Logic boards"]
+LOCATIONS = ["Leeds", "Manchester", "Bristol", "Glasgow", "Cardiff", "Belfast", "London"]
+STATUSES = list(JobStatus)
+
+
+class SyntheticDataGenerator:
+    """Builds deterministic synthetic records; the same seed always yields the same data."""
+
+    def __init__(self, seed=42):
+        self.rng = random.Random(seed)
+        self._serial = 0
+
+    def _name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def _unique_email(self, index):
+        # A counter suffix keeps emails unique (technicians.email is UNIQUE) yet reproducible.
+        local, domain = Utils.generate_random_email(rng=self.rng).split("@", 1)
+        return f"{local}.{index}@{domain}"
+
+    def customers(self, count):
+        return [Customer(self._name(), self._unique_email(i)) for i in range(count)]
+
+    def technicians(self, count):
+        return [Technician(self._name(), self._unique_email(i), self.rng.choice(EXPERTISE))
+                for i in range(count)]
+
+    def equipment(self, customer_ids, per_customer=1):
+        devices = []
+        for customer_id in customer_ids:
+            for _ in range(per_customer):
+                self._serial += 1
+                devices.append(Equipment(customer_id, self.rng.choice(EQUIPMENT_TYPES),
+                                         f"SN{self.rng.randrange(16 ** 4):04X}-{self._serial:07d}"))
+        return devices
+
+    def jobs(self, equipment_ids, technician_ids, count):
+        return [Job(self.rng.choice(ISSUES), self.rng.choice(STATUSES),
+                    self.rng.choice(technician_ids), self.rng.choice(equipment_ids))
+                for _ in range(count)]
+
+    def suppliers(self, count):
+        return [Supplier(f"{self.rng.choice(LAST_NAMES)} Components {i}", self.rng.choice(PART_TYPES),
+                         self.rng.choice(LOCATIONS))
+                for i in range(count)]
+
+    def seed_database(self, customers, technicians, jobs, suppliers, equipment_per_customer=1):
+        """Inserts a full data set through the models' bulk APIs; returns the new ids by table."""
+        customer_ids = Customer.save_many(self.customers(customers))
+        technician_ids = Technician.save_many(self.technicians(technicians))
+        equipment_ids = Equipment.save_many(self.equipment(customer_ids, equipment_per_customer))
+        job_ids = Job.save_many(self.jobs(equipment_ids, technician_ids, jobs))
+        supplier_ids = Supplier.save_many(self.suppliers(suppliers))
+        return {
+            "customers": customer_ids,
+            "technicians": technician_ids,
+            "equipment": equipment_ids,
+            "jobs": job_ids,
+            "suppliers": supplier_ids,
+        }
@@ -1,4 +1,35 @@
 
 # utils/exceptions.py
 class CustomerNotFoundException(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class PoolExhaustedException(Exception):
+    pass
+
+
+class IntakeQueueFullException(Exception):
+    """The intake queue stayed at capacity for longer than the caller would wait."""
+
+
+class DuplicateSerialException(Exception):
+    """A serial number is already registered to another customer."""
+
+    def __init__(self, serial_number, owner_id):
+        super().__init__(f"Serial number '{serial_number}' is already registered to another customer.")
+        self.serial_number = serial_number
+        self.owner_id = owner_id
+
+
+class InsufficientStockException(Exception):
+    """Stock movements or a reservation would take more parts than are available.
+
+    ``shortages`` holds ``(part_id, supplier_id, available, requested)`` for each
+    part and supplier that came up short.
+    """
+
+    def __init__(self, shortages):
+        details = "; ".join(f"part {part_id} at supplier {supplier_id} has {available} available, {requested} needed"
+                            for part_id, supplier_id, available, requested in shortages)
+        super().__init__(f"Not enough stock: {details}.")
+        self.shortages = shortages
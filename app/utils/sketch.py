@@ -0,0 +1,65 @@
+import math
+
+
+class QuantileSketch:
+    """Streaming quantiles of positive values with relative error ``relative_accuracy``.
+
+    Values fall into logarithmic buckets (the DDSketch layout): bucket ``i`` holds
+    ``(gamma**(i-1), gamma**i]``, so any quantile is reported within ``relative_accuracy``
+    of a value actually seen, whatever the distribution. Memory grows with the log of
+    the value range, not with the number of values (costs from 1 to 100,000 at 1% need
+    under 600 buckets). Values <= 0 are counted in a separate zero bucket.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1.")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def key(self, value):
+        """The bucket ``value`` falls into (None for the zero bucket)."""
+        return math.ceil(math.log(value) / self._log_gamma) if value > 0 else None
+
+    def add(self, value, count=1):
+        """Adds ``value``, ``count`` times."""
+        key = self.key(value)
+        if key is None:
+            self.zeros += count
+        else:
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += count
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Only sketches with the same relative accuracy can be merged.")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantiles(self, fractions):
+        """Values at each fraction in ``fractions`` (0 to 1, ascending) in one pass."""
+        if not self.count:
+            return [None] * len(fractions)
+        ranks = [fraction * (self.count - 1) for fraction in fractions]
+        results = []
+        seen = self.zeros
+        position = 0
+        while position < len(ranks) and ranks[position] < seen:
+            results.append(0.0)
+            position += 1
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            while position < len(ranks) and ranks[position] < seen:
+                # The bucket's midpoint (in relative terms) is within the error bound.
+                results.append(2 * self.gamma ** key / (self.gamma + 1))
+                position += 1
+        return results
+
+    def quantile(self, fraction):
+        return self.quantiles([fraction])[0]
@@ -1,20 +1,47 @@
 import random
+import re
 import string
+from itertools import islice
+
+_SERIAL_NOISE = re.compile(r"[^0-9A-Z]")
 
 class Utils:
 
     @staticmethod
-    def generate_random_email(domains=None, tlds=None):
+    def normalize_serial(serial_number):
+        """Registry key for a serial number: case, spaces and punctuation are ignored,
+        so "sn-12 ab" and "SN12AB" are the same device. None if nothing is left."""
+        return _SERIAL_NOISE.sub("", str(serial_number or "").upper()) or None
+
+    @staticmethod
+    def owner_serial_key(serial_key, customer_id):
+        """Key of a device whose serial another customer registered first (see migration 10):
+        "<key>#<customer id>", or "<key>#" for a device with no owner."""
+        return f"{serial_key}#{'' if customer_id is None else customer_id}"
+
+    @staticmethod
+    def chunked(iterable, size):
+        """Yields lists of at most ``size`` items from ``iterable``."""
+        iterator = iter(iterable)
+        while True:
+            chunk = list(islice(iterator, size))
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def generate_random_email(domains=None, tlds=None, rng=None):
+        rng = rng or random  # Pass a seeded random.Random for reproducible output
         if domains is None:
             domains = ["gmail.com", "yahoo.com", "outlook.com", "example.com"]
         if tlds is None:
             tlds = ["com", "net", "org", "co.uk"]
-        
-            username_length = random.randint(4, 15)
-            username_characters = string.ascii_lowercase + string.digits
-            username = ''.join(random.choice(username_characters) for _ in range(username_length))
-            
-            domain = random.choice(domains)
-            tld = random.choice(tlds)
-        
+
+        username_length = rng.randint(4, 15)
+        username_characters = string.ascii_lowercase + string.digits
+        username = ''.join(rng.choice(username_characters) for _ in range(username_length))
+
+        domain = rng.choice(domains)
+        tld = rng.choice(tlds)
+
         return f"{username}@{domain}.{tld}"
\ No newline at end of file
@@ -0,0 +1,163 @@
+# benchmarks/api_load_test.py
+# Drives the HTTP API with many concurrent keep-alive clients and reports throughput.
+#
+#   python -m benchmarks.api_load_test --clients 50 --requests 200
+#   python -m benchmarks.api_load_test --url http://127.0.0.1:8080 --clients 50
+#
+# Without --url an in-process server is started against a freshly seeded temp database.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from app.api.server import ApiServer
+from app.db.db import DB
+from app.utils.data_generator import SyntheticDataGenerator
+
+
+class KeepAliveClient:
+    """One persistent HTTP/1.1 connection issuing requests back to back."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length)) if length else None
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def request_mix(ids, rng):
+    """Weighted mix of reads and writes resembling several operators at once."""
+    technician_id = rng.choice(ids["technicians"])
+    choice = rng.random()
+    if choice < 0.35:
+        return "GET", f"/jobs?limit=20&after_id={rng.choice(ids['jobs'])}", None
+    if choice < 0.55:
+        return "GET", f"/technicians/{technician_id}/jobs", None
+    if choice < 0.65:
+        return "GET", "/metrics", None
+    if choice < 0.75:
+        return "GET", "/search?q=battery", None
+    if choice < 0.85:
+        return "POST", "/jobs", {"equipment_id": rng.choice(ids["equipment"]), "technician_id": technician_id,
+                                 "description": "Load test job"}
+    if choice < 0.95:
+        return "POST", f"/technicians/{technician_id}/jobs/status", {"job_ids": rng.sample(ids["jobs"], 5)}
+    return "POST", f"/jobs/{rng.choice(ids['jobs'])}/cost", {"cost": round(rng.uniform(20, 400), 2)}
+
+
+async def run_client(host, port, ids, requests, seed, latencies, statuses):
+    rng = random.Random(seed)
+    client = KeepAliveClient(host, port)
+    await client.connect()
+    try:
+        for _ in range(requests):
+            method, path, payload = request_mix(ids, rng)
+            started = time.perf_counter()
+            status, _ = await client.request(method, path, payload)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        await client.close()
+
+
+async def load_test(host, port, ids, clients, requests):
+    latencies, statuses = [], {}
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, ids, requests, seed, latencies, statuses)
+                           for seed in range(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "elapsed_seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "median_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))],
+        "max_ms": latencies[-1],
+        "statuses": statuses,
+    }
+
+
+async def main_async(args):
+    if args.url:
+        url = urlsplit(args.url)
+        async def fetch_ids():
+            client = KeepAliveClient(url.hostname, url.port or 80)
+            await client.connect()
+            _, page = await client.request("GET", "/jobs?limit=500")
+            await client.close()
+            jobs = page["jobs"]
+            return {"jobs": [job["id"] for job in jobs],
+                    "technicians": sorted({job["technician_id"] for job in jobs if job["technician_id"]}),
+                    "equipment": sorted({job["equipment_id"] for job in jobs})}
+        return await load_test(url.hostname, url.port or 80, await fetch_ids(), args.clients, args.requests)
+
+    server = ApiServer(port=0, workers=args.workers)
+    await server.start()
+    try:
+        return await load_test(server.host, server.port, args.ids, args.clients, args.requests)
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the EDD HTTP API.")
+    parser.add_argument("--url", help="Target a running server instead of an in-process one.")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per client.")
+    parser.add_argument("--size", type=int, default=2000, help="Customers to seed for the in-process server.")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args(argv)
+
+    original_path = DB.path
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            if not args.url:
+                DB.configure(path=os.path.join(tmp_dir, "api_load.db"), pool_size=args.workers or DB.pool_size)
+                args.ids = SyntheticDataGenerator(7).seed_database(
+                    customers=args.size, technicians=max(5, args.size // 100), jobs=args.size * 2,
+                    suppliers=20
+                )
+            result = asyncio.run(main_async(args))
+        finally:
+            DB.configure(path=original_path)
+    print(json.dumps(result, indent=2))
+    return 0 if set(result["statuses"]) <= {200, 201} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# benchmarks/cold_start.py
+# Measures cold start: fresh interpreters timing each step from launch to first query.
+#
+#   python -m benchmarks.cold_start --repeat 10
+#
+# Every case runs in a new process against a temp database chosen with EDD_DB_PATH, so
+# nothing is cached in memory between runs. "interpreter" is a bare `python -c pass` for
+# reference; the other figures include it.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "interpreter": "pass",
+    "import_app_actions": "import app.actions.app_actions",
+    "main_menu_ready": "from app.actions.app_actions import AppAction; AppAction()",
+    "first_query": "from app.models.customer import Customer; Customer.find_by_email('nobody@example.com')",
+}
+
+
+def time_process(code, environ):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=environ, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def summarize(samples):
+    samples.sort()
+    return {"median_ms": statistics.median(samples), "min_ms": samples[0], "max_ms": samples[-1]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure application cold start.")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        environ = dict(os.environ, EDD_DB_PATH=os.path.join(tmp_dir, "cold_start.db"))
+        time_process(CASES["first_query"], environ)  # Migrate once; later runs find it current
+        for name, code in CASES.items():
+            results[name] = summarize([time_process(code, environ) for _ in range(args.repeat)])
+
+        # A brand new database pays for every migration on its first query.
+        samples = []
+        for i in range(args.repeat):
+            fresh = dict(environ, EDD_DB_PATH=os.path.join(tmp_dir, f"fresh_{i}.db"))
+            samples.append(time_process(CASES["first_query"], fresh))
+        results["first_query_new_database"] = summarize(samples)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
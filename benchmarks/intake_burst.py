@@ -0,0 +1,117 @@
+# benchmarks/intake_burst.py
+# Measures the intake desk during a walk-in rush, with and without the write-behind queue.
+#
+#   python -m benchmarks.intake_burst --walk-ins 2000 --desks 4
+#
+# Each phase runs on a fresh temp database while a background thread keeps committing
+# technician status updates. "synchronous" saves every walk-in (customer, device and job)
+# in its own transaction; "queued" hands it to the intake queue, whose writer thread
+# group-commits. desk_* figures are what the person at the desk waits per walk-in;
+# drain_seconds is how long until every record is committed.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from app.db.db import DB
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.technician import Technician
+from app.services.intake_queue import IntakeQueue
+
+
+def walk_in(desk, i):
+    return {"name": f"Walk In {desk}-{i}", "email": f"walkin{desk}x{i}@example.com", "equipment_type": "Phone",
+            "serial_number": f"RUSH-{desk}-{i:06d}", "description": "Cracked screen"}
+
+
+def save_synchronously(record):
+    with DB().transaction():
+        customer_id = Customer(record["name"], record["email"]).save()
+        equipment_id = Equipment(customer_id, record["equipment_type"], record["serial_number"]).save()
+        Job(record["description"], equipment_id=equipment_id).save()
+
+
+def technician_updates(stop):
+    """Keeps the write lock busy the way assessing technicians do."""
+    technician_id = Technician("Busy Tech", "busy.tech@example.com", "Phones").save()
+    equipment_id = Equipment(Customer("Bench", "bench@example.com").save(), "Phone", "BENCH-0").save()
+    updates = 0
+    while not stop.is_set():
+        job_id = Job("Bench job", technician_id=technician_id, equipment_id=equipment_id).save()
+        Job.update_status_for_technician([job_id], technician_id)
+        updates += 1
+    return updates
+
+
+def run_phase(walk_ins, desks, submit, drain):
+    stop = threading.Event()
+    updates = []
+    background = threading.Thread(target=lambda: updates.append(technician_updates(stop)), daemon=True)
+    background.start()
+    latencies = [[] for _ in range(desks)]
+
+    def desk(number):
+        for i in range(walk_ins // desks):
+            started = time.perf_counter()
+            submit(walk_in(number, i))
+            latencies[number].append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=desk, args=(number,)) for number in range(desks)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    desk_seconds = time.perf_counter() - started
+    drain()
+    drain_seconds = time.perf_counter() - started
+    stop.set()
+    background.join()
+    samples = sorted(sample for desk_samples in latencies for sample in desk_samples)
+    return {
+        "walk_ins": len(samples),
+        "desk_median_ms": statistics.median(samples),
+        "desk_p95_ms": samples[int(0.95 * (len(samples) - 1))],
+        "desk_max_ms": samples[-1],
+        "desk_seconds": desk_seconds,
+        "drain_seconds": drain_seconds,
+        "walk_ins_per_second": len(samples) / drain_seconds,
+        "technician_updates": updates[0] if updates else 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Intake desk latency during a walk-in rush.")
+    parser.add_argument("--walk-ins", type=int, default=2000)
+    parser.add_argument("--desks", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-delay-ms", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    original_path = DB.path
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            DB.configure(path=os.path.join(tmp_dir, "synchronous.db"))
+            results["synchronous"] = run_phase(args.walk_ins, args.desks, save_synchronously, lambda: None)
+
+            DB.configure(path=os.path.join(tmp_dir, "queued.db"))
+            intake = IntakeQueue(batch_size=args.batch_size, max_delay=args.max_delay_ms / 1000)
+            results["queued"] = run_phase(args.walk_ins, args.desks, intake.enqueue, intake.flush)
+            results["queued"]["queue"] = intake.stats()
+            intake.stop()
+        finally:
+            DB.configure(path=original_path)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
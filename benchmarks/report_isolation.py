@@ -0,0 +1,90 @@
+# benchmarks/report_isolation.py
+# Measures intake-desk write latency while report threads stream every job.
+#
+#   python -m benchmarks.report_isolation --jobs 50000 --readers 3 --seconds 5
+#
+# Runs three phases against a freshly seeded temp database: writes alone, writes while
+# reports read the live file through the read-only pool, and writes while reports read a
+# backup snapshot. Flat p95/max across the phases means reports are not blocking writers.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from app.db.db import DB
+from app.models.job import Job
+from app.utils.data_generator import SyntheticDataGenerator
+
+
+def write_latencies(equipment_id, seconds):
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        Job("Benchmark intake", equipment_id=equipment_id).save()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "writes": len(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[int(0.95 * (len(samples) - 1))],
+        "max_ms": samples[-1],
+    }
+
+
+def run_phase(equipment_id, readers, seconds):
+    stop = threading.Event()
+    reports = [0]
+
+    def report():
+        while not stop.is_set():
+            sum(1 for _ in Job.iter_all())
+            reports[0] += 1
+
+    threads = [threading.Thread(target=report, daemon=True) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    try:
+        result = write_latencies(equipment_id, seconds)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    result["reports"] = reports[0]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Writer latency while reports run.")
+    parser.add_argument("--jobs", type=int, default=50000)
+    parser.add_argument("--readers", type=int, default=DB.read_pool_size)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    original_path = DB.path
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            DB.configure(path=os.path.join(tmp_dir, "reports.db"))
+            ids = SyntheticDataGenerator(11).seed_database(
+                customers=args.jobs // 5, technicians=50, jobs=args.jobs, suppliers=10
+            )
+            equipment_id = ids["equipment"][0]
+            results["writes_alone"] = run_phase(equipment_id, 0, args.seconds)
+            results["reports_on_live_file"] = run_phase(equipment_id, args.readers, args.seconds)
+            DB.use_snapshot(os.path.join(tmp_dir, "reports_snapshot.db"), max_age=args.seconds / 2)
+            results["reports_on_snapshot"] = run_phase(equipment_id, args.readers, args.seconds)
+        finally:
+            DB.use_snapshot(None)
+            DB.configure(path=original_path)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
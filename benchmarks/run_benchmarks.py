@@ -0,0 +1,180 @@
+# benchmarks/run_benchmarks.py
+# Times the public model methods against freshly seeded databases of several sizes.
+#
+#   python -m benchmarks.run_benchmarks --sizes 1000,10000 --output bench.json
+#   python -m benchmarks.run_benchmarks --compare bench.json
+#
+# Results are JSON so runs can be diffed; --compare exits non-zero on regressions.
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from app.db.db import DB
+from app.models.customer import Customer
+from app.models.equipment import Equipment
+from app.models.job import Job
+from app.models.job_status import JobStatus
+from app.models.supplier import Supplier
+from app.models.technician import Technician
+from app.services.search_service import SearchService
+from app.utils.cache import clear_caches
+from app.utils.data_generator import SyntheticDataGenerator
+
+
+def measure(fn, repeat):
+    """Runs ``fn`` ``repeat`` times; returns timings in milliseconds."""
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": samples[0],
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(0.95 * len(samples)))],
+        "max_ms": samples[-1],
+    }
+
+
+def cold(fn):
+    """Drops the lookup caches first so the timing includes the database round trip."""
+    def run(i):
+        clear_caches()
+        fn(i)
+    return run
+
+
+def benchmark_cases(ids, generator, size):
+    customers = ids["customers"]
+    technicians = ids["technicians"]
+    equipment = ids["equipment"]
+    jobs = ids["jobs"]
+    emails = [row.email for row in Customer.get_all()[:100]]
+    tech_emails = [row.email for row in Technician.get_all()[:100]]
+    batch = max(1, min(1000, size // 10))
+
+    return {
+        "Customer.save": lambda i: generator.customers(1)[0].save(),
+        "Customer.save_many": lambda i: Customer.save_many(generator.customers(batch)),
+        "Customer.get_all": lambda i: Customer.get_all(),
+        "Customer.find_by_email[cold]": cold(lambda i: Customer.find_by_email(emails[i % len(emails)])),
+        "Customer.find_by_email[warm]": lambda i: Customer.find_by_email(emails[i % len(emails)]),
+        "Equipment.save": lambda i: generator.equipment([customers[i % len(customers)]])[0].save(),
+        "Equipment.save_many": lambda i: Equipment.save_many(generator.equipment(customers[:batch])),
+        "Equipment.get_by_customer[cold]": cold(lambda i: Equipment.get_by_customer(customers[i % len(customers)])),
+        "Job.save": lambda i: generator.jobs(equipment, technicians, 1)[0].save(),
+        "Job.save_many": lambda i: Job.save_many(generator.jobs(equipment, technicians, batch)),
+        "Job.get_all": lambda i: Job.get_all(),
+        "Job.iter_all": lambda i: sum(1 for _ in Job.iter_all()),
+        "Job.get_page[deep]": lambda i: Job.get_page(after_id=jobs[-50], limit=50),
+        "Job.get_page[status]": lambda i: Job.get_page(limit=50, status=JobStatus.ASSESSED),
+        "Job.get_by_technician": lambda i: Job.get_by_technician(technicians[i % len(technicians)]),
+        "Job.get_assessed_jobs": lambda i: Job.get_assessed_jobs(),
+        "Job.update_status_for_technician[bulk]": lambda i: Job.update_status_for_technician(
+            jobs[:batch], technicians[i % len(technicians)]),
+        "Job.update_cost": lambda i: Job.update_cost(jobs[i % len(jobs)], 99.5),
+        "Technician.save_many": lambda i: Technician.save_many(generator.technicians(batch)),
+        "Technician.get_all": lambda i: Technician.get_all(),
+        "Technician.find_by_email[cold]": cold(lambda i: Technician.find_by_email(tech_emails[i % len(tech_emails)])),
+        "Supplier.save_many": lambda i: Supplier.save_many(generator.suppliers(batch)),
+        "Supplier.get_all": lambda i: Supplier.get_all(),
+        "SearchService.search_jobs": lambda i: SearchService.search_jobs("battery charging"),
+    }
+
+
+def run_size(size, repeat, seed, only=None):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        DB.configure(path=os.path.join(tmp_dir, f"bench_{size}.db"))
+        try:
+            generator = SyntheticDataGenerator(seed)
+            started = time.perf_counter()
+            ids = generator.seed_database(
+                customers=size, technicians=max(5, size // 100), jobs=size * 2,
+                suppliers=max(5, size // 50)
+            )
+            seed_seconds = time.perf_counter() - started
+
+            results = {}
+            for name, fn in benchmark_cases(ids, generator, size).items():
+                if only and not any(part in name for part in only):
+                    continue
+                results[name] = measure(fn, repeat)
+                print(f"  {name:<42} median {results[name]['median_ms']:9.3f} ms")
+            return {"seed_seconds": seed_seconds, "results": results}
+        finally:
+            DB.configure()  # Close the pool before the temp directory goes away
+
+
+def compare(current, baseline, threshold):
+    """Returns (size, name, baseline_ms, current_ms) for medians slower than ``threshold``."""
+    regressions = []
+    for size, run in current["sizes"].items():
+        base_run = baseline.get("sizes", {}).get(size)
+        if not base_run:
+            continue
+        for name, timing in run["results"].items():
+            base = base_run["results"].get(name)
+            if base and timing["median_ms"] > base["median_ms"] * (1 + threshold):
+                regressions.append((size, name, base["median_ms"], timing["median_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the EDD model layer.")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated customer counts to seed.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", default="", help="Comma-separated substrings of benchmark names to run.")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="Earlier results file to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging (0.25 = 25%%).")
+    args = parser.parse_args(argv)
+
+    original_path = DB.path
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    only = [part.strip() for part in args.only.split(",") if part.strip()]
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "sizes": {},
+    }
+    try:
+        for size in sizes:
+            print(f"Seeding and benchmarking with {size} customers...")
+            report["sizes"][str(size)] = run_size(size, args.repeat, args.seed, only)
+    finally:
+        DB.configure(path=original_path)
+
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(report, baseline, args.threshold)
+        for size, name, before, after in regressions:
+            print(f"REGRESSION size={size} {name}: {before:.3f} ms -> {after:.3f} ms")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())